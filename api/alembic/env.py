@@ -24,8 +24,10 @@ if config.config_file_name is not None:
 
 from models.clans import ClanWars, Clans, ClanInvite
 from models.lobby import Lobby
+from models.matches import Match, MatchRound
 from models.locations import Locations
-from models.user import User
+from models.user import User, Ban
+from models.reports import Reports
 from database.base import Base
 
 target_metadata = Base.metadata
@@ -64,5 +66,8 @@ def do_run_migrations(connection):
 
 if context.is_offline_mode():
     run_migrations_offline()
+elif config.attributes.get("connection") is not None:
+    # tests pass in their own connection so the schema is rolled back with it
+    do_run_migrations(config.attributes["connection"])
 else:
     asyncio.run(run_migrations_online())
@@ -0,0 +1,152 @@
+"""initial schema
+
+Revision ID: 0001_initial
+Revises:
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_initial'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # databases built by the old create_all startup already have these tables,
+    # they are adopted as-is so later revisions apply on top. only tables that
+    # predate the migrations belong here, anything newer gets its own revision
+    if not op.get_context().as_sql and "user" in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table('clan_invites',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('clan_id', sa.Integer(), nullable=False),
+    sa.Column('inviter_id', sa.Integer(), nullable=False),
+    sa.Column('invitee_id', sa.Integer(), nullable=True),
+    sa.Column('code', sa.String(length=32), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.Column('responded_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('code')
+    )
+    op.create_table('clan_wars',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('clan_1_id', sa.Integer(), nullable=False),
+    sa.Column('clan_2_id', sa.Integer(), nullable=False),
+    sa.Column('rounds', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('clan_1_score', sa.Integer(), nullable=False),
+    sa.Column('clan_2_score', sa.Integer(), nullable=False),
+    sa.Column('winner_clan_id', sa.Integer(), nullable=False),
+    sa.Column('participants', sa.JSON(), nullable=False),
+    sa.Column('round_results', sa.JSON(), nullable=False),
+    sa.Column('xp_awarded_clan_1', sa.Integer(), nullable=False),
+    sa.Column('xp_awarded_clan_2', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('created_by_user_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('clans',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=15), nullable=False),
+    sa.Column('tag', sa.String(length=5), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('members', sa.JSON(), nullable=False),
+    sa.Column('member_count', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.String(), nullable=False),
+    sa.Column('xp', sa.Integer(), nullable=False),
+    sa.Column('reputation', sa.Integer(), nullable=False),
+    sa.Column('description', sa.String(length=150), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('wars_won', sa.Integer(), nullable=False),
+    sa.Column('wars_lost', sa.Integer(), nullable=False),
+    sa.Column('wars_total', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name'),
+    sa.UniqueConstraint('tag')
+    )
+    op.create_table('lobby',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('invite_code', sa.String(), nullable=False),
+    sa.Column('host_id', sa.Integer(), nullable=False),
+    sa.Column('timer', sa.Integer(), nullable=False),
+    sa.Column('users', postgresql.ARRAY(sa.Integer()), nullable=False),
+    sa.Column('locations', sa.JSON(), nullable=False),
+    sa.Column('mode', sa.String(), nullable=True),
+    sa.Column('war_id', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('invite_code')
+    )
+    op.create_table('locations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('lat', sa.Double(), nullable=False),
+    sa.Column('lon', sa.Double(), nullable=False),
+    sa.Column('region', sa.String(), nullable=False),
+    sa.Column('country', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('reports',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('suspect_id', sa.Integer(), nullable=False),
+    sa.Column('reporter_id', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(length=255), nullable=False),
+    sa.Column('demo', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('user',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=50), nullable=False),
+    sa.Column('google_id', sa.String(length=255), nullable=False),
+    sa.Column('name', sa.String(length=20), nullable=False),
+    sa.Column('avatar', sa.String(), nullable=False),
+    sa.Column('mmr', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.String(), nullable=False),
+    sa.Column('role', sa.String(), nullable=False),
+    sa.Column('telegram', sa.String(), nullable=False),
+    sa.Column('games_played', sa.Integer(), nullable=False),
+    sa.Column('games_won', sa.Integer(), nullable=False),
+    sa.Column('games_lost', sa.Integer(), nullable=False),
+    sa.Column('refresh_token', sa.String(length=255), nullable=True),
+    sa.Column('clan_id', sa.Integer(), nullable=False),
+    sa.Column('clan_role', sa.String(), nullable=False),
+    sa.Column('clan_join_date', sa.DateTime(), nullable=True),
+    sa.Column('country_stats', sa.JSON(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('google_id')
+    )
+    op.create_index(op.f('ix_user_username'), 'user', ['username'], unique=True)
+    op.create_table('ban',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(length=255), nullable=False),
+    sa.Column('baned_at', sa.DateTime(), nullable=False),
+    sa.Column('banned_until', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('ban')
+    op.drop_index(op.f('ix_user_username'), table_name='user')
+    op.drop_table('user')
+    op.drop_table('reports')
+    op.drop_table('locations')
+    op.drop_table('lobby')
+    op.drop_table('clans')
+    op.drop_table('clan_wars')
+    op.drop_table('clan_invites')
@@ -0,0 +1,31 @@
+"""gin index on lobby.users
+
+Revision ID: 0002_lobby_users_gin
+Revises: 0001_initial
+Create Date: 2026-10-19 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_lobby_users_gin'
+down_revision: Union[str, Sequence[str], None] = '0001_initial'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # "lobbies containing user" is users @> ARRAY[id], which a gin index answers
+    op.create_index(
+        'ix_lobby_users', 'lobby', ['users'], unique=False, postgresql_using='gin', if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_lobby_users', table_name='lobby', postgresql_using='gin')
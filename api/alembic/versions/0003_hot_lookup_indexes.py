@@ -0,0 +1,49 @@
+"""indexes for hot lookup columns
+
+Revision ID: 0003_hot_lookup_indexes
+Revises: 0002_lobby_users_gin
+Create Date: 2026-10-19 12:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_hot_lookup_indexes'
+down_revision: Union[str, Sequence[str], None] = '0002_lobby_users_gin'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# lobby.id and clan_invites.code are already covered by the primary key and unique constraint
+INDEXES = [
+    ('ix_user_telegram', 'user', ['telegram']),
+    ('ix_user_mmr', 'user', ['mmr']),
+    ('ix_clan_wars_clan_1_id', 'clan_wars', ['clan_1_id']),
+    ('ix_clan_wars_clan_2_id', 'clan_wars', ['clan_2_id']),
+    ('ix_reports_suspect_id', 'reports', ['suspect_id']),
+    ('ix_ban_user_id', 'ban', ['user_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+    op.create_index(
+        'ix_ban_active_until',
+        'ban',
+        ['banned_until'],
+        unique=False,
+        postgresql_where=sa.text('banned_until IS NOT NULL'),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ban_active_until', table_name='ban')
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
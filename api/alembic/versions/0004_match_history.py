@@ -0,0 +1,62 @@
+"""match history tables
+
+Revision ID: 0004_match_history
+Revises: 0003_hot_lookup_indexes
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_match_history'
+down_revision: Union[str, Sequence[str], None] = '0003_hot_lookup_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # a create_all database may or may not have these already, depending on when it was built
+    op.create_table('matches',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('invite_code', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('opponent_id', sa.Integer(), nullable=True),
+    sa.Column('mode', sa.String(), nullable=True),
+    sa.Column('won', sa.Boolean(), nullable=False),
+    sa.Column('mmr_delta', sa.Integer(), nullable=False),
+    sa.Column('rounds_played', sa.Integer(), nullable=False),
+    sa.Column('total_points', sa.Integer(), nullable=False),
+    sa.Column('total_distance', sa.Double(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('ended_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True,
+    )
+    op.create_index('ix_matches_user_id_ended_at', 'matches', ['user_id', 'ended_at'], unique=False, if_not_exists=True)
+    op.create_table('match_rounds',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('match_id', sa.Integer(), nullable=False),
+    sa.Column('round', sa.Integer(), nullable=False),
+    sa.Column('distance', sa.Double(), nullable=False),
+    sa.Column('points', sa.Integer(), nullable=False),
+    sa.Column('lat', sa.Double(), nullable=True),
+    sa.Column('lon', sa.Double(), nullable=True),
+    sa.Column('country', sa.String(length=50), nullable=True),
+    sa.ForeignKeyConstraint(['match_id'], ['matches.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True,
+    )
+    op.create_index(op.f('ix_match_rounds_match_id'), 'match_rounds', ['match_id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_match_rounds_match_id'), table_name='match_rounds')
+    op.drop_table('match_rounds')
+    op.drop_index('ix_matches_user_id_ended_at', table_name='matches')
+    op.drop_table('matches')
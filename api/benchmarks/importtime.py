@@ -0,0 +1,56 @@
+# Cold import cost of `import main` per worker role, parsed from `python -X importtime`.
+#   cd api && python -m benchmarks.importtime --runs 5 --top 10
+# Before routers were imported per role every worker paid ~1.25 s, ~630 ms of it
+# routers.authorization_router and ~130 ms sentry; now ~1.05-1.1 s, mostly fastapi and sqlalchemy.
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+def profile(role: str) -> tuple[int, dict[str, int]]:
+    # cumulative us for main, and {module: cumulative us} for what main imports directly
+    env = {**os.environ, "WORKER_ROLE": role}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total, imports = 0, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        # importtime indents each nesting level by two spaces
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0 and name.strip() == "main":
+            total = int(cumulative)
+        elif depth == 1:
+            imports[name.strip()] = int(cumulative)
+    return total, imports
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--roles", nargs="+", default=["all", "game", "spectator"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    for role in args.roles:
+        runs = [profile(role) for _ in range(args.runs)]
+        total = statistics.median(run[0] for run in runs)
+        print(f"WORKER_ROLE={role}: {total / 1000:.0f} ms to import (median of {args.runs})")
+
+        heaviest = sorted(runs[-1][1].items(), key=lambda item: item[1], reverse=True)[: args.top]
+        for name, us in heaviest:
+            print(f"  {us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
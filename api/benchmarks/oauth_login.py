@@ -0,0 +1,68 @@
+# Login throughput against the local stub OAuth server.
+#   cd api && python -m benchmarks.oauth_login --logins 500 --concurrency 50
+import argparse
+import asyncio
+import time
+
+import httpx
+import uvicorn
+
+from config import config
+from providers.google import GoogleOAuthProvider
+from providers.http_client import oauth_http
+from tests.oauth_stub import stub
+
+
+async def per_call_login(code: str):
+    # what the provider did before the shared client: two fresh clients per login
+    async with httpx.AsyncClient() as client:
+        tokens = (await client.post(config.GOOGLE_TOKEN_URL, data={"code": code})).json()
+    async with httpx.AsyncClient() as client:
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        (await client.get(config.GOOGLE_USERINFO_URL, headers=headers)).json()
+
+
+async def shared_login(code: str):
+    provider = GoogleOAuthProvider()
+    access_token = await provider.exchange_code(code)
+    await provider.get_user_data(access_token)
+
+
+async def run(name, login, logins: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            await login(f"user{i}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(logins)))
+    elapsed = time.perf_counter() - started
+    print(f"{name:>9}: {logins / elapsed:8.1f} logins/s  ({elapsed * 1000 / logins:.2f} ms/login)")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    config.GOOGLE_TOKEN_URL = f"http://127.0.0.1:{args.port}/token"
+    config.GOOGLE_USERINFO_URL = f"http://127.0.0.1:{args.port}/userinfo"
+
+    server = uvicorn.Server(uvicorn.Config(stub, port=args.port, log_level="warning"))
+    serve = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    await run("per-call", per_call_login, args.logins, args.concurrency)
+    await run("shared", shared_login, args.logins, args.concurrency)
+
+    await oauth_http.close()
+    server.should_exit = True
+    await serve
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+# Per-message CPU of the websocket/redis serializer, stdlib json vs orjson.
+#   cd api && python -m benchmarks.serializer --players 2 --spectators 20
+import argparse
+import json
+import time
+
+import orjson
+
+from utils.serializer import JsonSerializer, OrjsonSerializer
+
+
+def game_state(players: int, rounds: int = 5) -> dict:
+    ids = list(range(1000, 1000 + players))
+    return {
+        "locations": [{"lat": 48.85 + i, "lon": 2.35 + i, "country": "FR"} for i in range(rounds)],
+        "CurrentRound": rounds - 1,
+        "RoundsStartTime": 1760000000000,
+        "guesses": {
+            str(r): [
+                {"player": p, "lat": 48.0, "lon": 2.0, "distance": 12345.6, "points": 4321, "time": 8123}
+                for p in ids
+            ]
+            for r in range(rounds)
+        },
+        "hp": {p: 6000 - 250 * rounds for p in ids},
+        "started_at": 1760000000000,
+    }
+
+
+def camera_frame() -> dict:
+    return {"type": "spectate", "heading": 123.45, "pitch": -3.2, "zoom": 1.5, "num_player": 1000, "lat": 48.8566, "lng": 2.3522}
+
+
+def per_op(fn, n: int) -> float:
+    start = time.process_time()
+    for _ in range(n):
+        fn()
+    return (time.process_time() - start) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--spectators", type=int, default=20)
+    parser.add_argument("-n", type=int, default=20000)
+    args = parser.parse_args()
+
+    state = game_state(args.players)
+    frame = camera_frame()
+    stored = json.dumps(state)
+
+    rows = []
+    for name, s in (("json", JsonSerializer), ("orjson", OrjsonSerializer)):
+        rows.append(
+            (
+                name,
+                per_op(lambda: s.loads(stored), args.n),
+                per_op(lambda: s.dumps(state), args.n),
+                per_op(lambda: s.dumps(frame), args.n),
+            )
+        )
+
+    print(f"{'':>8} {'game load':>11} {'game save':>11} {'camera frame':>13}   (us/op, cpu time)")
+    for name, load, save, camera in rows:
+        print(f"{name:>8} {load:11.2f} {save:11.2f} {camera:13.2f}")
+
+    # spectate fan-out: send_json encoded once per socket, now encoded once per frame
+    before = per_op(lambda: [json.dumps(frame, separators=(",", ":"), ensure_ascii=False) for _ in range(args.spectators)], args.n // 10)
+    after = per_op(lambda: orjson.dumps(frame).decode(), args.n)
+    print(f"camera fan-out to {args.spectators} spectators: {before:.2f} us -> {after:.2f} us per frame")
+
+
+if __name__ == "__main__":
+    main()
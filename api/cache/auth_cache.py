@@ -0,0 +1,82 @@
+from cache.redis import r
+from config import config
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = "auth:invalidate"
+
+
+class Principal:
+    __slots__ = ("id", "username", "name", "role")
+
+    def __init__(self, id: int, username: str, name: str, role: str):
+        self.id = id
+        self.username = username
+        self.name = name
+        self.role = role
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            name=user.name,
+            role=user.role,
+        )
+
+
+class AuthCache:
+    def __init__(self, ttl: float, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # (user_id, token iat): (expires_at, principal)
+        self.entries: dict[tuple[int, int], tuple[float, Principal]] = {}
+
+    def get(self, user_id: int, issued: int) -> Principal | None:
+        entry = self.entries.get((user_id, issued))
+        if not entry:
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            self.entries.pop((user_id, issued), None)
+            return None
+        return principal
+
+    def set(self, user_id: int, issued: int, principal: Principal) -> None:
+        now = time.monotonic()
+        if len(self.entries) >= self.max_entries:
+            self.entries = {k: v for k, v in self.entries.items() if v[0] > now}
+        self.entries[(user_id, issued)] = (now + self.ttl, principal)
+
+    def invalidate_local(self, user_id: int) -> None:
+        for key in [k for k in self.entries if k[0] == user_id]:
+            self.entries.pop(key, None)
+
+    async def invalidate(self, user_id: int) -> None:
+        self.invalidate_local(user_id)
+        try:
+            await r.publish(INVALIDATE_CHANNEL, str(user_id))
+        except Exception as e:
+            logger.error(f"Failed to publish auth invalidation for {user_id}: {e}")
+
+    async def listen(self) -> None:
+        # other workers drop their cached principal on ban/unban/role change
+        while True:
+            try:
+                pubsub = r.pubsub()
+                await pubsub.subscribe(INVALIDATE_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.invalidate_local(int(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Auth invalidation listener error: {e}")
+                self.entries.clear()
+                await asyncio.sleep(1)
+
+
+auth_cache = AuthCache(ttl=config.AUTH_CACHE_TTL)
@@ -0,0 +1,173 @@
+from cache.redis import r
+from datetime import datetime
+from sqlalchemy import select, delete, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.database import asyncsession
+from models.user import Ban
+from redis.exceptions import WatchError
+import asyncio
+import json
+import logging
+import secrets
+
+logger = logging.getLogger(__name__)
+
+BANS_KEY = "bans"
+EXPIRY_KEY = "bans:expiry"
+VERSION_KEY = "bans:version"
+SEED_LOCK_KEY = "bans:seed_lock"
+SWEEP_LOCK_KEY = "bans:sweeper"
+
+
+class BanRegistry:
+    def __init__(self, sync_interval: float = 1.0):
+        self.sync_interval = sync_interval
+        # identifies this worker as holder of the sweeper lease
+        self.token = secrets.token_hex(8)
+        self.version: str | None = None
+        # user_id: (reason, banned_until); users not in here are not banned
+        self.bans: dict[int, tuple[str, datetime | None]] = {}
+
+    def get(self, user_id: int) -> tuple[str, datetime | None] | None:
+        ban = self.bans.get(user_id)
+        if not ban:
+            return None
+        reason, banned_until = ban
+        if banned_until and banned_until < datetime.now():
+            # the sweeper removes it for good, just stop enforcing it here
+            return None
+        return ban
+
+    async def add(self, user_id: int, reason: str, banned_until: datetime | None) -> None:
+        payload = json.dumps(
+            {"reason": reason, "banned_until": banned_until.isoformat() if banned_until else None}
+        )
+        async with r.pipeline(transaction=True) as pipe:
+            pipe.hset(BANS_KEY, str(user_id), payload)
+            if banned_until:
+                pipe.zadd(EXPIRY_KEY, {str(user_id): banned_until.timestamp()})
+            else:
+                pipe.zrem(EXPIRY_KEY, str(user_id))
+            pipe.incr(VERSION_KEY)
+            await pipe.execute()
+        self.bans[user_id] = (reason, banned_until)
+
+    async def remove(self, user_id: int) -> None:
+        async with r.pipeline(transaction=True) as pipe:
+            pipe.hdel(BANS_KEY, str(user_id))
+            pipe.zrem(EXPIRY_KEY, str(user_id))
+            pipe.incr(VERSION_KEY)
+            await pipe.execute()
+        self.bans.pop(user_id, None)
+
+    async def load(self, db: AsyncSession) -> bool:
+        # seeds redis from the db once, when it has no registry yet (first boot, flushed redis).
+        # add/remove bump the version, so a ban or unban landing mid-seed aborts the seed
+        # instead of being overwritten by the older db snapshot
+        if await r.exists(VERSION_KEY):
+            return False
+        if not await r.set(SEED_LOCK_KEY, self.token, nx=True, ex=30):
+            return False
+
+        try:
+            async with r.pipeline(transaction=True) as pipe:
+                await pipe.watch(VERSION_KEY)
+                if await pipe.exists(VERSION_KEY):
+                    return False
+
+                # expired bans are the sweeper's job, only active ones are published
+                result = await db.execute(
+                    select(Ban).where(or_(Ban.banned_until.is_(None), Ban.banned_until > datetime.now()))
+                )
+                bans = result.scalars().all()
+
+                pipe.multi()
+                for ban in bans:
+                    pipe.hset(
+                        BANS_KEY,
+                        str(ban.user_id),
+                        json.dumps(
+                            {
+                                "reason": ban.reason,
+                                "banned_until": ban.banned_until.isoformat() if ban.banned_until else None,
+                            }
+                        ),
+                    )
+                    if ban.banned_until:
+                        pipe.zadd(EXPIRY_KEY, {str(ban.user_id): ban.banned_until.timestamp()})
+                pipe.incr(VERSION_KEY)
+                await pipe.execute()
+        except WatchError:
+            # a live add/remove created the registry first, it is already authoritative
+            logger.info("Ban registry seeded concurrently, keeping live state")
+            return False
+        finally:
+            await r.delete(SEED_LOCK_KEY)
+
+        logger.info(f"Ban registry seeded with {len(bans)} bans")
+        return True
+
+    async def sync(self) -> None:
+        version = await r.get(VERSION_KEY)
+        if version == self.version:
+            return
+
+        raw = await r.hgetall(BANS_KEY)
+        bans = {}
+        for user_id, payload in raw.items():
+            data = json.loads(payload)
+            banned_until = data["banned_until"]
+            bans[int(user_id)] = (
+                data["reason"],
+                datetime.fromisoformat(banned_until) if banned_until else None,
+            )
+        self.bans = bans
+        self.version = version
+
+    async def is_sweeper(self) -> bool:
+        # one worker at a time holds the lease and clears expired bans
+        ttl = max(int(self.sync_interval * 5), 5)
+        if await r.set(SWEEP_LOCK_KEY, self.token, nx=True, ex=ttl):
+            return True
+        if await r.get(SWEEP_LOCK_KEY) == self.token:
+            await r.expire(SWEEP_LOCK_KEY, ttl)
+            return True
+        return False
+
+    async def expired(self) -> list[str]:
+        return await r.zrangebyscore(EXPIRY_KEY, "-inf", datetime.now().timestamp())
+
+    async def sweep(self, db: AsyncSession, expired: list[str]) -> None:
+        user_ids = [int(user_id) for user_id in expired]
+        await db.execute(delete(Ban).where(Ban.user_id.in_(user_ids)))
+        await db.commit()
+
+        async with r.pipeline(transaction=True) as pipe:
+            pipe.hdel(BANS_KEY, *expired)
+            pipe.zrem(EXPIRY_KEY, *expired)
+            pipe.incr(VERSION_KEY)
+            await pipe.execute()
+        logger.info(f"Expired bans removed for {user_ids}")
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.sync()
+                if self.version is None:
+                    # nothing in redis yet, or it was flushed
+                    async with asyncsession() as db:
+                        await self.load(db)
+                # the db is only touched by the lease holder, and only when something expired
+                if await self.is_sweeper():
+                    expired = await self.expired()
+                    if expired:
+                        async with asyncsession() as db:
+                            await self.sweep(db, expired)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ban registry sync failed: {e}")
+            await asyncio.sleep(self.sync_interval)
+
+
+ban_registry = BanRegistry()
@@ -0,0 +1,130 @@
+from cache.redis import r
+from config import config
+from utils.serializer import dumps_text, loads
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = "lobby:invalidate"
+
+
+class LobbyMeta:
+    # id is None for lobbies that only live in redis
+    __slots__ = ("invite_code", "host_id", "timer", "users", "mode", "war_id", "id")
+
+    def __init__(
+        self,
+        invite_code: str,
+        host_id: int,
+        timer: int,
+        users: list[int],
+        mode: str | None = None,
+        war_id: int | None = None,
+        id: int | None = None,
+    ):
+        self.invite_code = invite_code
+        self.host_id = host_id
+        self.timer = timer
+        self.users = users
+        self.mode = mode
+        self.war_id = war_id
+        self.id = id
+
+    @classmethod
+    def from_lobby(cls, lobby) -> "LobbyMeta":
+        return cls(
+            invite_code=lobby.invite_code,
+            host_id=lobby.host_id,
+            timer=lobby.timer,
+            users=list(lobby.users or []),
+            mode=lobby.mode,
+            war_id=lobby.war_id,
+            id=lobby.id,
+        )
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class LobbyCache:
+    def __init__(self, ttl: float, redis_ttl: int = 3600, max_entries: int = 10000):
+        self.ttl = ttl
+        self.redis_ttl = redis_ttl
+        self.max_entries = max_entries
+        # invite_code: (expires_at, meta)
+        self.entries: dict[str, tuple[float, LobbyMeta]] = {}
+
+    def _remember(self, meta: LobbyMeta) -> None:
+        now = time.monotonic()
+        if len(self.entries) >= self.max_entries:
+            self.entries = {k: v for k, v in self.entries.items() if v[0] > now}
+        self.entries[meta.invite_code] = (now + self.ttl, meta)
+
+    async def get(self, invite_code: str) -> LobbyMeta | None:
+        entry = self.entries.get(invite_code)
+        if entry:
+            expires_at, meta = entry
+            if expires_at > time.monotonic():
+                return meta
+            self.entries.pop(invite_code, None)
+
+        try:
+            data = await r.get(f"lobby_meta:{invite_code}")
+        except Exception as e:
+            logger.error(f"Lobby cache read failed for {invite_code}: {e}")
+            return None
+        if not data:
+            return None
+        meta = LobbyMeta(**loads(data))
+        self._remember(meta)
+        return meta
+
+    async def fill(self, lobby) -> LobbyMeta:
+        # a miss loaded from the db, nothing changed so peers keep their copy
+        meta = LobbyMeta.from_lobby(lobby)
+        self._remember(meta)
+        try:
+            await r.setex(f"lobby_meta:{meta.invite_code}", self.redis_ttl, dumps_text(meta.to_dict()))
+        except Exception as e:
+            logger.error(f"Lobby cache write failed for {meta.invite_code}: {e}")
+        return meta
+
+    async def set(self, lobby) -> LobbyMeta:
+        meta = await self.fill(lobby)
+        await self._publish(meta.invite_code)
+        return meta
+
+    async def invalidate(self, invite_code: str) -> None:
+        self.entries.pop(invite_code, None)
+        try:
+            await r.delete(f"lobby_meta:{invite_code}")
+        except Exception as e:
+            logger.error(f"Lobby cache delete failed for {invite_code}: {e}")
+        await self._publish(invite_code)
+
+    async def _publish(self, invite_code: str) -> None:
+        try:
+            await r.publish(INVALIDATE_CHANNEL, invite_code)
+        except Exception as e:
+            logger.error(f"Failed to publish lobby invalidation for {invite_code}: {e}")
+
+    async def listen(self) -> None:
+        # other workers reread a lobby from redis after add_user/remove_user/delete
+        while True:
+            try:
+                pubsub = r.pubsub()
+                await pubsub.subscribe(INVALIDATE_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.entries.pop(message["data"], None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Lobby invalidation listener error: {e}")
+                self.entries.clear()
+                await asyncio.sleep(1)
+
+
+lobby_cache = LobbyCache(ttl=config.LOBBY_CACHE_TTL)
@@ -1,4 +1,58 @@
 import redis.asyncio as redis
-import os
-redis_host = os.getenv("REDIS_HOST", "redis")
-r = redis.Redis(host=redis_host, port=6379, db=0, decode_responses=True)
\ No newline at end of file
+from redis.asyncio.client import Pipeline
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, TimeoutError
+from core.metrics import redis_command_duration
+from config import config
+import time
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        # the whole batch is one round trip, so it is timed as one
+        start = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            redis_command_duration.labels("MULTI" if self.is_transaction else "PIPELINE").observe(
+                time.perf_counter() - start
+            )
+
+
+class InstrumentedRedis(redis.Redis):
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            redis_command_duration.labels(str(args[0]).upper()).observe(time.perf_counter() - start)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> InstrumentedPipeline:
+        # batch multi-command sequences: transaction=True wraps them in MULTI/EXEC
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+def make_client(decode_responses: bool, max_connections: int) -> InstrumentedRedis:
+    pool = redis.BlockingConnectionPool(
+        host=config.REDIS_HOST,
+        port=config.REDIS_PORT,
+        db=0,
+        decode_responses=decode_responses,
+        max_connections=max_connections,
+        # wait for a free connection instead of failing when the pool is exhausted
+        timeout=config.REDIS_CONNECT_TIMEOUT,
+        socket_connect_timeout=config.REDIS_CONNECT_TIMEOUT,
+        socket_keepalive=True,
+        health_check_interval=config.REDIS_HEALTH_CHECK_INTERVAL,
+        retry=Retry(ExponentialBackoff(cap=1, base=0.05), 3),
+        retry_on_error=[ConnectionError, TimeoutError],
+    )
+    return InstrumentedRedis(connection_pool=pool)
+
+
+r = make_client(decode_responses=True, max_connections=config.REDIS_MAX_CONNECTIONS)
+# raw bytes client for binary payloads (demo segments)
+r_bin = make_client(decode_responses=False, max_connections=max(config.REDIS_MAX_CONNECTIONS // 4, 10))
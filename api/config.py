@@ -16,11 +16,28 @@ class Config:
     REDIRECT_URI = os.getenv("REDIRECT_URI")
 
     DATABASE_URL = os.getenv("DATABASE_URL")
+    # readiness probe on boot: attempts, first delay and cap of the exponential backoff
+    DB_READY_ATTEMPTS = int(os.getenv("DB_READY_ATTEMPTS", "8"))
+    DB_READY_BACKOFF = float(os.getenv("DB_READY_BACKOFF", "0.25"))
+    DB_READY_MAX_DELAY = float(os.getenv("DB_READY_MAX_DELAY", "5"))
 
-    GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
-    GOOGLE_USERINFO_URL = "https://www.googleapis.com/oauth2/v2/userinfo"
+    REDIS_HOST = os.getenv("REDIS_HOST", "redis")
+    REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+    REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "100"))
+    REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "2"))
+    REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+
+    GOOGLE_TOKEN_URL = os.getenv("GOOGLE_TOKEN_URL", "https://oauth2.googleapis.com/token")
+    GOOGLE_USERINFO_URL = os.getenv("GOOGLE_USERINFO_URL", "https://www.googleapis.com/oauth2/v2/userinfo")
     GOOGLE_AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
 
+    OAUTH_TIMEOUT = float(os.getenv("OAUTH_TIMEOUT", "10"))
+    OAUTH_CONNECT_TIMEOUT = float(os.getenv("OAUTH_CONNECT_TIMEOUT", "3"))
+    OAUTH_MAX_CONNECTIONS = int(os.getenv("OAUTH_MAX_CONNECTIONS", "50"))
+    OAUTH_RETRIES = int(os.getenv("OAUTH_RETRIES", "2"))
+    OAUTH_BACKOFF = float(os.getenv("OAUTH_BACKOFF", "0.2"))
+    OAUTH_HTTP2 = os.getenv("OAUTH_HTTP2", "true").lower() == "true"
+
     TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
     TELEGRAM_BOT_USERNAME = os.getenv("TELEGRAM_BOT_USERNAME")
 
@@ -47,9 +64,35 @@ class Config:
 ]
 
 
+    SERIALIZER = os.getenv("SERIALIZER", "orjson")
+    WS_PAYLOAD_BUDGET = int(os.getenv("WS_PAYLOAD_BUDGET", "4096"))
+    WS_REPLAY_BUFFER = int(os.getenv("WS_REPLAY_BUFFER", "256"))
+    WS_PING_INTERVAL = float(os.getenv("WS_PING_INTERVAL", "20"))
+    WS_PING_TIMEOUT = float(os.getenv("WS_PING_TIMEOUT", "60"))
+    # all: one process does everything, game: no spectator sockets, spectator: relay only
+    WORKER_ROLE = os.getenv("WORKER_ROLE", "all")
+    # comma separated router names, overrides the role's default set
+    WORKER_ROUTERS = [name for name in os.getenv("WORKER_ROUTERS", "").split(",") if name]
+    # seconds spectators lag behind the players
+    SPECTATOR_DELAY = float(os.getenv("SPECTATOR_DELAY", "0"))
+
     DSN = os.getenv("DSN")
 
     BOT_SECRET = os.getenv("BOT_SECRET")
 
+    WS_MESSAGE_RATE = int(os.getenv("WS_MESSAGE_RATE", "60"))
+    WS_MESSAGE_BURST = int(os.getenv("WS_MESSAGE_BURST", "120"))
+    # per connection, messages per second
+    WS_CAMERA_RATE = float(os.getenv("WS_CAMERA_RATE", "20"))
+    WS_PREVIEW_RATE = float(os.getenv("WS_PREVIEW_RATE", "10"))
+    WS_BROADCAST_RATE = float(os.getenv("WS_BROADCAST_RATE", "1"))
+    WS_CONTROL_RATE = float(os.getenv("WS_CONTROL_RATE", "1"))
+
+    AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "30"))
+    LOBBY_CACHE_TTL = float(os.getenv("LOBBY_CACHE_TTL", "30"))
+
+    DEMO_SEGMENT_FRAMES = int(os.getenv("DEMO_SEGMENT_FRAMES", "200"))
+    DEMO_WINDOW_SECONDS = int(os.getenv("DEMO_WINDOW_SECONDS", "600"))
+
 
 config = Config()
@@ -1,3 +1,57 @@
-from prometheus_client import Gauge
+from prometheus_client import Counter, Gauge, Histogram
 
-active_websockets = Gauge('active_websockets', 'Active websockets connections')
\ No newline at end of file
+active_websockets = Gauge('active_websockets', 'Active websockets connections')
+
+redis_command_duration = Histogram(
+    'redis_command_duration_seconds',
+    'Redis round trip latency per command, pipelines counted once',
+    ['command'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+
+ws_messages_dropped = Counter(
+    'ws_messages_dropped_total',
+    'Websocket messages dropped for going over the per connection budget',
+    ['type'],
+)
+
+ws_messages_coalesced = Counter(
+    'ws_messages_coalesced_total',
+    'Websocket messages replaced by a newer message of the same type before delivery',
+    ['type'],
+)
+
+ws_payload_bytes = Histogram(
+    'ws_payload_bytes',
+    'Encoded size of outgoing websocket messages, once per message not per recipient',
+    ['type'],
+    buckets=(64, 256, 1024, 4096, 16384, 65536, 262144),
+)
+
+ws_payload_oversized = Counter(
+    'ws_payload_oversized_total',
+    'Outgoing websocket messages over their payload budget',
+    ['type'],
+)
+
+ws_live_sockets = Gauge(
+    'ws_live_sockets',
+    'Websockets tracked by the heartbeat',
+    ['kind'],
+)
+
+ws_reaped_sockets = Counter(
+    'ws_reaped_sockets_total',
+    'Websockets evicted for missing pongs or failed sends',
+    ['kind'],
+)
+
+worker_time_to_ready = Gauge(
+    'worker_time_to_ready_seconds',
+    'Seconds from process start until the worker could reach the database',
+)
+
+db_ready_attempts = Gauge(
+    'db_ready_attempts',
+    'Readiness probes the worker needed before the database answered',
+)
@@ -1,3 +1,4 @@
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
 from config import config
@@ -9,4 +10,8 @@ asyncsession = async_sessionmaker(engine,class_=AsyncSession, expire_on_commit=F
 async def get_db():
     async with asyncsession() as session:
         yield session
-    
\ No newline at end of file
+
+
+async def ping():
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
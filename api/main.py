@@ -1,23 +1,24 @@
+import time
+
+# time-to-ready is measured from here, before the heavy imports below
+started_at = time.monotonic()
+
 from fastapi import FastAPI, requests
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
-from routers.authorization_router import router as auth
-from routers.lobby_router import router as lobby_router
-from routers.websocket_router import router as websocket
-from routers.profile_router import router as profile
-from routers.admin_router import router as admin
-from routers.telegram_router import router as telegram
-from routers.clans_router import router as clans
-from routers.matchmaking_router import router as matchmaking
+import importlib
 import logging
-from services.matchmaking_service import matchmaking_instance
-from database.database import engine
-from database.base import Base
+from database.database import ping
+from config import config
+from core.metrics import worker_time_to_ready, db_ready_attempts
 import asyncio
+import random
 from models.user import User
 from models.locations import Locations
 from models.lobby import Lobby
-from core.monitoring import init_sentry
+from models.matches import Match, MatchRound
+from utils.serializer import serializer
 
 logging.basicConfig(
     level=logging.INFO,
@@ -27,8 +28,14 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-init_sentry()
-app = FastAPI()
+if config.DSN:
+    from core.monitoring import init_sentry
+
+    init_sentry()
+
+app = FastAPI(
+    default_response_class=ORJSONResponse if serializer.name == "orjson" else JSONResponse
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -45,27 +52,40 @@ app.add_middleware(
 
 @app.on_event("startup")
 async def startup_event():
-    max_retries = 5
-    for attempt in range(max_retries):
+    # the schema belongs to `alembic upgrade head`, a worker only waits until the db answers
+    for attempt in range(1, config.DB_READY_ATTEMPTS + 1):
         try:
-            async with engine.begin() as conn:
-                await conn.run_sync(Base.metadata.create_all)
-            logger.info("database connected")
+            await ping()
             break
         except Exception as e:
-            if attempt < max_retries - 1:
-                logger.warning(
-                    f"database not ready (attempt {attempt + 1}/{max_retries}), retrying"
-                )
-                await asyncio.sleep(2)
-            else:
-                logger.error(
-                    f"failed to connect to database after {max_retries} attempts"
-                )
+            if attempt == config.DB_READY_ATTEMPTS:
+                logger.error(f"database not ready after {attempt} attempts: {e}")
                 raise
+            delay = min(config.DB_READY_BACKOFF * 2 ** (attempt - 1), config.DB_READY_MAX_DELAY)
+            logger.warning(f"database not ready (attempt {attempt}/{config.DB_READY_ATTEMPTS}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+    db_ready_attempts.set(attempt)
+    worker_time_to_ready.set(time.monotonic() - started_at)
+    app.state.ready = True
+    logger.info(f"database connected, worker ready in {time.monotonic() - started_at:.2f}s")
+
+    if "matchmaking" in routers:
+        from services.matchmaking_service import matchmaking_instance
 
-    logger.info("Matchmaking queue started")
-    asyncio.create_task(matchmaking_instance.matchmaking_loop())
+        logger.info("Matchmaking queue started")
+        asyncio.create_task(matchmaking_instance.matchmaking_loop())
+    for name in ROLE_TASKS[config.WORKER_ROLE]:
+        module, attribute, method = TASKS[name]
+        asyncio.create_task(getattr(getattr(importlib.import_module(module), attribute), method)())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if "auth" in routers:
+        from providers.http_client import oauth_http
+
+        await oauth_http.close()
 
 
 @app.get("/")
@@ -78,20 +98,60 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def ready():
+    if not getattr(app.state, "ready", False):
+        return JSONResponse({"status": "starting"}, status_code=503)
+    return {"status": "ready"}
+
+
 @app.get("/sentry-debug")
 async def trigger_error():
     division_by_zero = 1 / 0
 
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
-app.include_router(telegram, prefix="/telegram", tags=["telegram"])
-app.include_router(matchmaking, prefix="/matchmaking", tags=["matchmaking"])
-app.include_router(clans, prefix="/clans", tags=["clans"])
-app.include_router(admin, prefix="/admin", tags=["admin"])
-app.include_router(auth, prefix="/auth", tags=["auth"])
-app.include_router(lobby_router, prefix="/lobbies", tags=["lobbies"])
-app.include_router(websocket, tags=["ws"])
-app.include_router(profile, prefix="/profile", tags=["profile"])
+
+# name: (module, prefix); a router's module and what it pulls in are only imported when mounted
+ROUTERS = {
+    "telegram": ("routers.telegram_router", "/telegram"),
+    "matchmaking": ("routers.matchmaking_router", "/matchmaking"),
+    "clans": ("routers.clans_router", "/clans"),
+    "admin": ("routers.admin_router", "/admin"),
+    "auth": ("routers.authorization_router", "/auth"),
+    "lobbies": ("routers.lobby_router", "/lobbies"),
+    "ws": ("routers.websocket_router", ""),
+    "profile": ("routers.profile_router", "/profile"),
+}
+
+# game workers skip admin, telegram and the oauth providers, relays only serve sockets
+ROLE_ROUTERS = {
+    "all": list(ROUTERS),
+    "game": ["matchmaking", "clans", "lobbies", "ws", "profile"],
+    "spectator": ["ws"],
+}
+
+# name: (module, instance, coroutine method) of a background loop, imported like the routers
+TASKS = {
+    "auth_cache": ("cache.auth_cache", "auth_cache", "listen"),
+    "lobby_cache": ("cache.lobby_cache", "lobby_cache", "listen"),
+    "ban_registry": ("cache.ban_registry", "ban_registry", "run"),
+    "heartbeat": ("services.heartbeat", "heartbeat", "run"),
+    "spectator_hub": ("services.spectator_relay", "spectator_hub", "run"),
+}
+
+# relays never check bans and only ask whether a lobby exists, their cached
+# principals and lobby meta just age out of the short cache ttls
+ROLE_TASKS = {
+    "all": list(TASKS),
+    "game": list(TASKS),
+    "spectator": ["heartbeat", "spectator_hub"],
+}
+
+routers = config.WORKER_ROUTERS or ROLE_ROUTERS[config.WORKER_ROLE]
+for name in routers:
+    module, prefix = ROUTERS[name]
+    app.include_router(importlib.import_module(module).router, prefix=prefix, tags=[name])
 
 
 # prometheus
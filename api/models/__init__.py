@@ -2,5 +2,6 @@ from .clans import Clans, ClanWars, ClanInvite
 from .user import User, Ban
 from .locations import Locations
 from .lobby import Lobby
+from .matches import Match, MatchRound
 
-__all__ = ["Clans", "ClanWars", "ClanInvite", "User", "Ban", "Locations", "Lobby"]
+__all__ = ["Clans", "ClanWars", "ClanInvite", "User", "Ban", "Locations", "Lobby", "Match", "MatchRound"]
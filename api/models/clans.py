@@ -28,8 +28,8 @@ class ClanWars(Base):
     __tablename__ = "clan_wars"
     
     id: Mapped[int] = mapped_column(primary_key=True)
-    clan_1_id: Mapped[int] = mapped_column(nullable=False)
-    clan_2_id: Mapped[int] = mapped_column(nullable=False)
+    clan_1_id: Mapped[int] = mapped_column(nullable=False, index=True)
+    clan_2_id: Mapped[int] = mapped_column(nullable=False, index=True)
     rounds: Mapped[int] = mapped_column(default=5, nullable=False)
     status: Mapped[str] = mapped_column(
         default="pending", nullable=False
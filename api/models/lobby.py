@@ -1,5 +1,5 @@
 from typing import Optional
-from sqlalchemy import JSON, Integer
+from sqlalchemy import JSON, Integer, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from database.base import Base
 from sqlalchemy.dialects.postgresql import ARRAY
@@ -17,3 +17,5 @@ class Lobby(Base):
     mode: Mapped[Optional[str]] = mapped_column(default=None)
     war_id: Mapped[Optional[int]] = mapped_column(default=None)
 
+    __table_args__ = (Index("ix_lobby_users", "users", postgresql_using="gin"),)
+
@@ -0,0 +1,38 @@
+from sqlalchemy import String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from database.base import Base
+from datetime import datetime
+
+
+class Match(Base):
+    __tablename__ = "matches"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    invite_code: Mapped[str] = mapped_column(String(32), nullable=False)
+    user_id: Mapped[int] = mapped_column(nullable=False)
+    opponent_id: Mapped[int | None] = mapped_column(nullable=True)
+    mode: Mapped[str | None] = mapped_column(default=None)
+    won: Mapped[bool] = mapped_column(default=False, nullable=False)
+    mmr_delta: Mapped[int] = mapped_column(default=0, nullable=False)
+    rounds_played: Mapped[int] = mapped_column(default=0, nullable=False)
+    total_points: Mapped[int] = mapped_column(default=0, nullable=False)
+    total_distance: Mapped[float] = mapped_column(default=0, nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    ended_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, nullable=False)
+
+    __table_args__ = (Index("ix_matches_user_id_ended_at", "user_id", "ended_at"),)
+
+
+class MatchRound(Base):
+    __tablename__ = "match_rounds"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    match_id: Mapped[int] = mapped_column(
+        ForeignKey("matches.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    round: Mapped[int] = mapped_column(nullable=False)
+    distance: Mapped[float] = mapped_column(nullable=False)
+    points: Mapped[int] = mapped_column(default=0, nullable=False)
+    lat: Mapped[float | None] = mapped_column(nullable=True)
+    lon: Mapped[float | None] = mapped_column(nullable=True)
+    country: Mapped[str | None] = mapped_column(String(50), nullable=True)
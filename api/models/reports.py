@@ -8,7 +8,7 @@ class Reports(Base):
     __tablename__ = "reports"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    suspect_id: Mapped[int] = mapped_column(nullable=False)
+    suspect_id: Mapped[int] = mapped_column(nullable=False, index=True)
     reporter_id: Mapped[int] = mapped_column(nullable=False)
     reason: Mapped[str] = mapped_column(String(255), nullable=False)
     demo: Mapped[str] = mapped_column(JSONB, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import String, DateTime, JSON, Integer, ForeignKey
+from sqlalchemy import String, DateTime, JSON, Integer, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from database.base import Base
 from datetime import datetime
@@ -8,11 +8,16 @@ class Ban(Base):
     __tablename__ = "ban"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False, index=True)
     reason: Mapped[str] = mapped_column(String(255), nullable=False)
     baned_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
     banned_until: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
+    # temporary bans only, permanent ones (banned_until NULL) never expire
+    __table_args__ = (
+        Index("ix_ban_active_until", "banned_until", postgresql_where=banned_until.isnot(None)),
+    )
+
 
 class User(Base):
     __tablename__ = "user"
@@ -24,10 +29,10 @@ class User(Base):
     google_id: Mapped[str] = mapped_column(String(255), unique=True)
     name: Mapped[str] = mapped_column(String(20), default="Player")
     avatar: Mapped[str] = mapped_column(default="")
-    mmr: Mapped[int] = mapped_column(default=1500)
+    mmr: Mapped[int] = mapped_column(default=1500, index=True)
     rank: Mapped[str] = mapped_column(default="Ashborn")
     role: Mapped[str] = mapped_column(default="user")
-    telegram: Mapped[str] = mapped_column(default="null")
+    telegram: Mapped[str] = mapped_column(default="null", index=True)
     games_played: Mapped[int] = mapped_column(default=0)
     games_won: Mapped[int] = mapped_column(default=0)
     games_lost: Mapped[int] = mapped_column(default=0)
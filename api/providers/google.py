@@ -1,7 +1,7 @@
 from providers.base import IOAuthProvider
 from config import config
 from fastapi import HTTPException
-import httpx
+from providers.http_client import oauth_http
 import logging
 import urllib.parse
 logger = logging.getLogger(__name__)
@@ -15,9 +15,8 @@ class GoogleOAuthProvider(IOAuthProvider):
             "redirect_uri": config.REDIRECT_URI,
             "grant_type": "authorization_code",
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(config.GOOGLE_TOKEN_URL, data=data)
-            tokens = response.json()
+        response = await oauth_http.request("POST", config.GOOGLE_TOKEN_URL, data=data)
+        tokens = response.json()
 
         if "error" in tokens:
             raise HTTPException(status_code=400, detail=f"Google OAuth error: {tokens}")
@@ -32,9 +31,8 @@ class GoogleOAuthProvider(IOAuthProvider):
     async def get_user_data(self, access_token: str) -> dict:
         headers = {"Authorization": f"Bearer {access_token}"}
 
-        async with httpx.AsyncClient() as client:
-            user_data = await client.get(config.GOOGLE_USERINFO_URL, headers=headers)
-            user_data = user_data.json()
+        response = await oauth_http.request("GET", config.GOOGLE_USERINFO_URL, headers=headers)
+        user_data = response.json()
 
         logger.info(f"Google userinfo response: {user_data}")
 
@@ -0,0 +1,75 @@
+from config import config
+import asyncio
+import httpx
+import logging
+import random
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class OAuthHttpClient:
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        self._client: httpx.AsyncClient | None = None
+        self._transport = transport
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # one pool per process, so logins reuse warm TCP/TLS connections
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=config.OAUTH_HTTP2 and HTTP2_AVAILABLE,
+                timeout=httpx.Timeout(config.OAUTH_TIMEOUT, connect=config.OAUTH_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=config.OAUTH_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.OAUTH_MAX_CONNECTIONS,
+                    keepalive_expiry=60,
+                ),
+                transport=self._transport,
+            )
+        return self._client
+
+    def use_transport(self, transport: httpx.AsyncBaseTransport | None) -> None:
+        self._transport = transport
+        self._client = None
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        # a POST is only retried when it never reached the server (auth codes are single use)
+        idempotent = method.upper() == "GET"
+
+        for attempt in range(config.OAUTH_RETRIES + 1):
+            last_attempt = attempt == config.OAUTH_RETRIES
+            try:
+                response = await self.client.request(method, url, **kwargs)
+                if response.status_code not in RETRY_STATUSES or not idempotent or last_attempt:
+                    return response
+                logger.warning(f"OAuth {method} {url} returned {response.status_code}, retrying")
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                if last_attempt:
+                    raise
+                logger.warning(f"OAuth {method} {url} connect failed: {e}, retrying")
+            except httpx.TransportError as e:
+                if not idempotent or last_attempt:
+                    raise
+                logger.warning(f"OAuth {method} {url} failed: {e}, retrying")
+
+            delay = config.OAUTH_BACKOFF * (2**attempt)
+            await asyncio.sleep(delay + random.uniform(0, delay))
+
+        raise RuntimeError("unreachable")
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+oauth_http = OAuthHttpClient()
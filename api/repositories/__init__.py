@@ -3,6 +3,7 @@ from .location_repository import LocationRepository
 from .lobby_repository import LobbyRepository
 from .user_repository import UserRepository
 from .report_repository import ReportRepository
+from .match_repository import MatchRepository
 
 __all__ = [
     "ClanRepository",
@@ -10,4 +11,5 @@ __all__ = [
     "LobbyRepository",
     "UserRepository",
     "ReportRepository",
+    "MatchRepository",
 ]
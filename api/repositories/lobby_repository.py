@@ -4,6 +4,7 @@ from models.lobby import Lobby
 from sqlalchemy.exc import IntegrityError
 import secrets
 from repositories.location_repository import LocationRepository
+from cache.lobby_cache import lobby_cache, LobbyMeta
 TIMER = 240
 class LobbyRepository:
     
@@ -20,6 +21,7 @@ class LobbyRepository:
         db.add(lobby)
         await db.commit()
         await db.refresh(lobby)
+        await lobby_cache.fill(lobby)
         return lobby
     
 
@@ -28,6 +30,17 @@ class LobbyRepository:
     async def get_by_code(db: AsyncSession, lobby_code: str):
         result = await db.execute(select(Lobby).filter(Lobby.invite_code == lobby_code))
         return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_meta(db: AsyncSession, lobby_code: str) -> LobbyMeta | None:
+        # host, timer, users, mode and war_id without touching postgres on a hit
+        meta = await lobby_cache.get(lobby_code)
+        if meta:
+            return meta
+        lobby = await LobbyRepository.get_by_code(db, lobby_code)
+        if not lobby:
+            return None
+        return await lobby_cache.fill(lobby)
     
     @staticmethod
     async def add_user(db: AsyncSession, lobby_code: str, user_id: int):
@@ -47,6 +60,7 @@ class LobbyRepository:
         lobby.users = lobby.users + [user_id]
         await db.commit()
         await db.refresh(lobby)
+        await lobby_cache.set(lobby)
         return lobby
     
     @staticmethod
@@ -62,6 +76,7 @@ class LobbyRepository:
         lobby.users = [uid for uid in lobby.users if uid != user_id]
         await db.commit()
         await db.refresh(lobby)
+        await lobby_cache.set(lobby)
         return lobby
     
     @staticmethod
@@ -73,6 +88,7 @@ class LobbyRepository:
         
         await db.delete(lobby)
         await db.commit()
+        await lobby_cache.invalidate(lobby_code)
         return lobby
     
     @staticmethod
@@ -86,8 +102,9 @@ class LobbyRepository:
         return result.scalar_one()
     
     @staticmethod
-    async def get_by_user_id(db: AsyncSession, users_id: list[int]):
+    async def get_by_user_id(db: AsyncSession, user_id: int):
+        # users @> ARRAY[user_id], answered by the ix_lobby_users gin index
         result = await db.execute(
-            select(Lobby).where(Lobby.users.overlap([users_id]))
+            select(Lobby).where(Lobby.users.contains([user_id]))
         )
         return result.scalars().all()
\ No newline at end of file
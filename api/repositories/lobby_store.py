@@ -0,0 +1,285 @@
+from cache.redis import r
+from cache.lobby_cache import LobbyMeta
+from repositories.lobby_repository import LobbyRepository, TIMER
+from repositories.location_repository import LocationRepository
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.serializer import dumps_text, loads
+from abc import ABC, abstractmethod
+import secrets
+import time
+
+LOBBY_TTL = 3600
+LOBBY_SIZE = 2
+INDEX_KEY = "lobbies"
+
+# {-1 no lobby, 0 full, 1 member}; the user index key is per user so it's passed in KEYS
+ADD_USER = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+if redis.call('ZSCORE', KEYS[2], ARGV[1]) then
+    return 1
+end
+if redis.call('ZCARD', KEYS[2]) >= tonumber(ARGV[2]) then
+    return 0
+end
+local t = redis.call('TIME')
+redis.call('ZADD', KEYS[2], tonumber(t[1]) * 1000000 + tonumber(t[2]), ARGV[1])
+redis.call('SADD', KEYS[3], ARGV[3])
+for i = 1, 3 do
+    redis.call('EXPIRE', KEYS[i], ARGV[4])
+end
+return 1
+"""
+
+
+class StoredLobby:
+    # plain attributes so it reads like a Lobby row and serializes the same way
+    def __init__(
+        self,
+        invite_code: str,
+        host_id: int,
+        timer: int,
+        users: list[int],
+        locations: list[dict],
+        mode: str | None = None,
+        war_id: int | None = None,
+    ):
+        self.id = None
+        self.invite_code = invite_code
+        self.host_id = host_id
+        self.timer = timer
+        self.users = users
+        self.locations = locations
+        self.mode = mode
+        self.war_id = war_id
+
+
+class LobbyStore(ABC):
+    @abstractmethod
+    async def create(self, db: AsyncSession, host_id: int, mode: str | None = None, war_id: int | None = None, user_2: int | None = None): ...
+
+    @abstractmethod
+    async def get_by_code(self, db: AsyncSession, lobby_code: str): ...
+
+    @abstractmethod
+    async def get_meta(self, db: AsyncSession, lobby_code: str) -> LobbyMeta | None: ...
+
+    @abstractmethod
+    async def add_user(self, db: AsyncSession, lobby_code: str, user_id: int): ...
+
+    @abstractmethod
+    async def remove_user(self, db: AsyncSession, user_id: int, lobby_code: str): ...
+
+    @abstractmethod
+    async def delete(self, db: AsyncSession, lobby_code: str): ...
+
+    @abstractmethod
+    async def get_by_user_id(self, db: AsyncSession, user_id: int) -> list: ...
+
+    @abstractmethod
+    async def get_paginated(self, db: AsyncSession, offset: int, limit: int) -> list: ...
+
+    @abstractmethod
+    async def count_all(self, db: AsyncSession) -> int: ...
+
+
+class RedisLobbyStore(LobbyStore):
+    # hash lobby:{code} for the settings, zset lobby:{code}:users in join order,
+    # set lobby:user:{id} for "lobbies of a user", zset lobbies by creation for the admin list
+
+    def __init__(self, ttl: int = LOBBY_TTL):
+        self.ttl = ttl
+        self.add_script = r.register_script(ADD_USER)
+
+    async def exists(self, lobby_code: str) -> bool:
+        return bool(await r.exists(f"lobby:{lobby_code}"))
+
+    async def create(self, db, host_id, mode=None, war_id=None, user_2=None):
+        locations_objs = await LocationRepository.get_random_location(db, 13)
+        locations = [{"lat": loc.lat, "lon": loc.lon, "region": loc.region, "url": f"https://www.google.com/maps/@{loc.lat},{loc.lon},17z", "country": loc.country} for loc in locations_objs]
+        users = [host_id, user_2] if user_2 is not None else [host_id]
+        lobby = StoredLobby(secrets.token_urlsafe(6), host_id, TIMER, users, locations, mode, war_id)
+
+        key = f"lobby:{lobby.invite_code}"
+        now = time.time()
+        settings = {"host_id": host_id, "timer": TIMER, "locations": dumps_text(locations)}
+        if mode:
+            settings["mode"] = mode
+        if war_id is not None:
+            settings["war_id"] = war_id
+
+        async with r.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=settings)
+            pipe.zadd(f"{key}:users", {str(user_id): now + i for i, user_id in enumerate(users)})
+            for user_id in users:
+                pipe.sadd(f"lobby:user:{user_id}", lobby.invite_code)
+                pipe.expire(f"lobby:user:{user_id}", self.ttl)
+            pipe.expire(key, self.ttl)
+            pipe.expire(f"{key}:users", self.ttl)
+            pipe.zadd(INDEX_KEY, {lobby.invite_code: now})
+            pipe.zremrangebyscore(INDEX_KEY, "-inf", now - self.ttl)
+            await pipe.execute()
+        return lobby
+
+    async def _read(self, lobby_code: str, fields: list[str]):
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.hmget(f"lobby:{lobby_code}", fields)
+            pipe.zrange(f"lobby:{lobby_code}:users", 0, -1)
+            values, users = await pipe.execute()
+        if values[0] is None:
+            return None, None
+        settings = dict(zip(fields, values))
+        settings["host_id"] = int(settings["host_id"])
+        settings["timer"] = int(settings["timer"])
+        if settings.get("war_id") is not None:
+            settings["war_id"] = int(settings["war_id"])
+        return settings, [int(user_id) for user_id in users]
+
+    async def get_by_code(self, db, lobby_code):
+        settings, users = await self._read(lobby_code, ["host_id", "timer", "mode", "war_id", "locations"])
+        if settings is None:
+            return None
+        return StoredLobby(
+            lobby_code,
+            settings["host_id"],
+            settings["timer"],
+            users,
+            loads(settings["locations"]),
+            settings["mode"],
+            settings["war_id"],
+        )
+
+    async def get_meta(self, db, lobby_code):
+        # everything but the locations, which only GameStart needs
+        settings, users = await self._read(lobby_code, ["host_id", "timer", "mode", "war_id"])
+        if settings is None:
+            return None
+        return LobbyMeta(invite_code=lobby_code, users=users, **settings)
+
+    async def add_user(self, db, lobby_code, user_id):
+        result = await self.add_script(
+            keys=[f"lobby:{lobby_code}", f"lobby:{lobby_code}:users", f"lobby:user:{user_id}"],
+            args=[user_id, LOBBY_SIZE, lobby_code, self.ttl],
+            client=r,
+        )
+        if result == -1:
+            return None
+        if result == 0:
+            return {"message": "Lobby is full"}
+        return await self.get_meta(db, lobby_code)
+
+    async def remove_user(self, db, user_id, lobby_code):
+        async with r.pipeline(transaction=True) as pipe:
+            pipe.zrem(f"lobby:{lobby_code}:users", str(user_id))
+            pipe.srem(f"lobby:user:{user_id}", lobby_code)
+            removed, _ = await pipe.execute()
+        if not removed:
+            return None
+        return await self.get_meta(db, lobby_code)
+
+    async def delete(self, db, lobby_code):
+        lobby = await self.get_meta(db, lobby_code)
+        if not lobby:
+            return None
+        async with r.pipeline(transaction=True) as pipe:
+            pipe.delete(f"lobby:{lobby_code}", f"lobby:{lobby_code}:users")
+            for user_id in lobby.users:
+                pipe.srem(f"lobby:user:{user_id}", lobby_code)
+            pipe.zrem(INDEX_KEY, lobby_code)
+            await pipe.execute()
+        return lobby
+
+    async def get_by_user_id(self, db, user_id):
+        codes = await r.smembers(f"lobby:user:{user_id}")
+        lobbies = [await self.get_meta(db, code) for code in sorted(codes)]
+        return [lobby for lobby in lobbies if lobby and user_id in lobby.users]
+
+    async def count_all(self, db):
+        await r.zremrangebyscore(INDEX_KEY, "-inf", time.time() - self.ttl)
+        return await r.zcard(INDEX_KEY)
+
+    async def get_paginated(self, db, offset, limit):
+        codes = await r.zrevrange(INDEX_KEY, offset, offset + limit - 1)
+        lobbies = [await self.get_meta(db, code) for code in codes]
+        return [lobby for lobby in lobbies if lobby]
+
+
+class PostgresLobbyStore(LobbyStore):
+    # clan-war lobbies outlive a worker restart and are referenced by ClanWars, so they stay rows
+
+    async def create(self, db, host_id, mode=None, war_id=None, user_2=None):
+        return await LobbyRepository.create(db=db, host_id=host_id, mode=mode, war_id=war_id, user_2=user_2)
+
+    async def get_by_code(self, db, lobby_code):
+        return await LobbyRepository.get_by_code(db, lobby_code)
+
+    async def get_meta(self, db, lobby_code):
+        return await LobbyRepository.get_meta(db, lobby_code)
+
+    async def add_user(self, db, lobby_code, user_id):
+        return await LobbyRepository.add_user(db, lobby_code, user_id)
+
+    async def remove_user(self, db, user_id, lobby_code):
+        return await LobbyRepository.remove_user(db, user_id, lobby_code)
+
+    async def delete(self, db, lobby_code):
+        return await LobbyRepository.delete(db, lobby_code)
+
+    async def get_by_user_id(self, db, user_id):
+        return await LobbyRepository.get_by_user_id(db, user_id)
+
+    async def get_paginated(self, db, offset, limit):
+        return await LobbyRepository.get_paginated(db, offset, limit)
+
+    async def count_all(self, db):
+        return await LobbyRepository.count_all(db)
+
+
+class RoutedLobbyStore(LobbyStore):
+    # new lobbies go to redis unless they need durability; lookups try redis first
+    DURABLE_MODES = {"clan_wars"}
+
+    def __init__(self, ephemeral: RedisLobbyStore, durable: PostgresLobbyStore):
+        self.ephemeral = ephemeral
+        self.durable = durable
+
+    async def _store(self, lobby_code: str) -> LobbyStore:
+        return self.ephemeral if await self.ephemeral.exists(lobby_code) else self.durable
+
+    async def create(self, db, host_id, mode=None, war_id=None, user_2=None):
+        store = self.durable if mode in self.DURABLE_MODES else self.ephemeral
+        return await store.create(db, host_id, mode=mode, war_id=war_id, user_2=user_2)
+
+    async def get_by_code(self, db, lobby_code):
+        return await self.ephemeral.get_by_code(db, lobby_code) or await self.durable.get_by_code(db, lobby_code)
+
+    async def get_meta(self, db, lobby_code):
+        return await self.ephemeral.get_meta(db, lobby_code) or await self.durable.get_meta(db, lobby_code)
+
+    async def add_user(self, db, lobby_code, user_id):
+        return await (await self._store(lobby_code)).add_user(db, lobby_code, user_id)
+
+    async def remove_user(self, db, user_id, lobby_code):
+        return await (await self._store(lobby_code)).remove_user(db, user_id, lobby_code)
+
+    async def delete(self, db, lobby_code):
+        return await (await self._store(lobby_code)).delete(db, lobby_code)
+
+    async def get_by_user_id(self, db, user_id):
+        return await self.ephemeral.get_by_user_id(db, user_id) + list(
+            await self.durable.get_by_user_id(db, user_id)
+        )
+
+    async def get_paginated(self, db, offset, limit):
+        # redis lobbies first, then the durable ones
+        total = await self.ephemeral.count_all(db)
+        lobbies = await self.ephemeral.get_paginated(db, offset, limit) if offset < total else []
+        if len(lobbies) < limit:
+            lobbies += await self.durable.get_paginated(db, max(offset - total, 0), limit - len(lobbies))
+        return lobbies
+
+    async def count_all(self, db):
+        return await self.ephemeral.count_all(db) + await self.durable.count_all(db)
+
+lobby_store = RoutedLobbyStore(RedisLobbyStore(), PostgresLobbyStore())
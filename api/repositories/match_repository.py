@@ -0,0 +1,60 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, insert
+from models.matches import Match, MatchRound
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MatchRepository:
+    @staticmethod
+    async def create_many(db: AsyncSession, matches: list[dict]):
+        # one row per player, rounds inserted in a single executemany.
+        # the caller commits, so the rows land with the game end stats
+        if not matches:
+            return []
+
+        rows = [{k: v for k, v in m.items() if k != "rounds"} for m in matches]
+        result = await db.execute(insert(Match).returning(Match.id, sort_by_parameter_order=True), rows)
+        match_ids = list(result.scalars().all())
+
+        rounds = [
+            {**round_data, "match_id": match_id}
+            for match_id, m in zip(match_ids, matches)
+            for round_data in m.get("rounds", [])
+        ]
+        if rounds:
+            await db.execute(insert(MatchRound), rounds)
+        return match_ids
+
+    @staticmethod
+    async def get_by_user(db: AsyncSession, user_id: int, offset: int, limit: int):
+        result = await db.execute(
+            select(Match)
+            .where(Match.user_id == user_id)
+            .order_by(Match.ended_at.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    async def count_by_user(db: AsyncSession, user_id: int):
+        result = await db.execute(
+            select(func.count(Match.id)).where(Match.user_id == user_id)
+        )
+        return result.scalar_one()
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, match_id: int):
+        result = await db.execute(select(Match).filter(Match.id == match_id))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_rounds(db: AsyncSession, match_id: int):
+        result = await db.execute(
+            select(MatchRound)
+            .where(MatchRound.match_id == match_id)
+            .order_by(MatchRound.round)
+        )
+        return result.scalars().all()
@@ -1,6 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, defer
 from models.reports import Reports
 from sqlalchemy.exc import IntegrityError
 import logging
@@ -8,7 +8,7 @@ logger = logging.getLogger(__name__)
 
 class ReportRepository:
     @staticmethod
-    async def create(db: AsyncSession, suspect_id: int, reporter_id: int, reason: str, demo: list):
+    async def create(db: AsyncSession, suspect_id: int, reporter_id: int, reason: str, demo: list | dict):
         report = Reports(suspect_id=suspect_id, reporter_id=reporter_id, reason=reason, demo=demo)
         db.add(report)
         await db.commit()
@@ -17,7 +17,9 @@ class ReportRepository:
     
     @staticmethod
     async def get_paginated(db: AsyncSession, offset:int, limit: int):
-        result = await db.execute(select(Reports).offset(offset).limit(limit))
+        result = await db.execute(
+            select(Reports).options(defer(Reports.demo)).offset(offset).limit(limit)
+        )
         return result.scalars().all()
     
     @staticmethod
@@ -39,4 +41,9 @@ class ReportRepository:
     @staticmethod
     async def count_all(db: AsyncSession):
         result = await db.execute(select(func.count(Reports.id)))
-        return result.scalar_one()
\ No newline at end of file
+        return result.scalar_one()
+
+    @staticmethod
+    async def get_demo(db: AsyncSession, report_id: int):
+        result = await db.execute(select(Reports.demo).filter(Reports.id == report_id))
+        return result.scalar_one_or_none()
@@ -7,6 +7,8 @@ from sqlalchemy.exc import IntegrityError
 import logging
 from datetime import datetime
 from models import Ban
+from cache.auth_cache import auth_cache
+from cache.ban_registry import ban_registry
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +39,15 @@ class UserRepository:
         result = await db.execute(select(User).filter(User.id.in_(user_ids)).options(selectinload(User.ban)))
         return result.scalars().all()
 
+    @staticmethod
+    async def get_with_clan_tags(db: AsyncSession, user_ids: list[int]):
+        result = await db.execute(
+            select(User, Clans.tag)
+            .outerjoin(Clans, Clans.id == User.clan_id)
+            .filter(User.id.in_(user_ids))
+        )
+        return result.all()
+
     @staticmethod
     async def get_clan_tag(db: AsyncSession, user: User) -> str | None:
         if not user.clan_id:
@@ -123,6 +134,8 @@ class UserRepository:
         db.add(ban)
         await db.commit()
         await db.refresh(ban)
+        await ban_registry.add(user_id, reason, banned_until)
+        await auth_cache.invalidate(user_id)
         return ban
     
     @staticmethod
@@ -134,4 +147,6 @@ class UserRepository:
         
         await db.delete(ban)
         await db.commit()
+        await ban_registry.remove(user_id)
+        await auth_cache.invalidate(user_id)
         return ban
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from fastapi.responses import StreamingResponse
 from services.admin_service import Admin_Panel
 from utils.rate_limiter import rate_limit
 from schemas.admin_schema import (
@@ -12,6 +13,7 @@ from utils.dependencies import Dependies
 from database.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from models import User
+from services.demo_service import DemoPlayback
 import json
 router = APIRouter()
 admin_panel = Admin_Panel()
@@ -60,6 +62,21 @@ async def get_reports(
 ) -> dict:
     return await admin_panel.Get_reports(db, limit, page)
 
+@router.get("/suspects")
+async def get_suspects(
+    limit: int = Query(ge=10),
+    page: int = Query(ge=1),
+    _: dict = Depends(require_admin),
+) -> dict:
+    return await admin_panel.Get_suspects(limit, page)
+
+@router.delete("/suspects/{user_id}")
+async def dismiss_suspect(
+    user_id: int,
+    token: User = Depends(require_admin),
+):
+    return await admin_panel.Dismiss_Suspect(admin_login=token.username, user_id=user_id)
+
 @router.get("/reports/{report_id}")
 async def get_report(
     report_id: int,
@@ -74,9 +91,45 @@ async def get_report(
         "suspect_id": report.suspect_id,
         "reporter_id": report.reporter_id,
         "reason": report.reason,
-        "demo": report.demo,
+        # headers only, frames come from /demo in windows
+        "demo": DemoPlayback.summary(report.demo),
     }
 
+@router.get("/reports/{report_id}/demo/index")
+async def get_report_demo_index(
+    report_id: int,
+    db: AsyncSession = Depends(get_db),
+    _: dict = Depends(require_admin),
+) -> dict:
+    demo = await ReportRepository.get_demo(db, report_id)
+    if demo is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return DemoPlayback.summary(demo)
+
+@router.get("/reports/{report_id}/demo")
+async def stream_report_demo(
+    report_id: int,
+    start: int = Query(default=0, ge=0),
+    window: int | None = Query(default=None, ge=1),
+    num_player: int | None = Query(default=None),
+    format: str = Query(default="ndjson", pattern="^(ndjson|binary)$"),
+    db: AsyncSession = Depends(get_db),
+    _: dict = Depends(require_admin),
+):
+    demo = await ReportRepository.get_demo(db, report_id)
+    if demo is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+
+    if format == "binary":
+        return StreamingResponse(
+            DemoPlayback.binary(demo, start, window, num_player),
+            media_type="application/octet-stream",
+        )
+    return StreamingResponse(
+        DemoPlayback.ndjson(demo, start, window, num_player),
+        media_type="application/x-ndjson",
+    )
+
 @router.delete("/reports/{report_id}")
 async def delete_report(
     report_id: int,
@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Body, Depends, Request, HTTPException
 from services.lobby_service import LobbyService
-from services.authorization import AuthService
 from utils.LocationService import LocationService
 from utils.dependencies import Dependies
 from utils.rate_limiter import rate_limit
@@ -7,6 +7,8 @@ from database.database import get_db
 from repositories.user_repository import UserRepository
 from repositories.lobby_repository import LobbyRepository
 from database.database import asyncsession
+from services.heartbeat import heartbeat
+from services.spectator_relay import spectator_hub
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
@@ -15,6 +17,10 @@ router = APIRouter()
 @router.websocket("/")
 async def matchmaking_route(websocket: WebSocket):
     await websocket.accept()
+
+    if spectator_hub.role == "spectator":
+        await websocket.close(code=1013, reason="Spectator relay only")
+        return
  
     token = websocket.query_params.get("token")
     
@@ -43,9 +49,11 @@ async def matchmaking_route(websocket: WebSocket):
     
     try:
         await matchmaking_instance.join_queue(user_id, websocket, mmr)
+        heartbeat.track(websocket, "matchmaking", lambda: matchmaking_instance.drop_socket(websocket))
         
         while True:
             message = await websocket.receive_json()
+            heartbeat.seen(websocket)
             
             if message["type"] == "stop_matchmaking":
                 await matchmaking_instance.leave_queue(user_id, websocket, mmr)
@@ -58,6 +66,7 @@ async def matchmaking_route(websocket: WebSocket):
         logger.error(f"Matchmaking error: {str(e)}")
     
     finally:
+        heartbeat.forget(websocket)
 
         try:
             await matchmaking_instance.leave_queue(user_id, websocket, mmr)
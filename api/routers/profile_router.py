@@ -1,5 +1,4 @@
-from fastapi import APIRouter, Depends, File, UploadFile, Request
-from services.authorization import AuthService, TokenManager
+from fastapi import APIRouter, Depends, File, UploadFile, Request, Query
 from services.profile_service import Profile
 from schemas.profile_schema import EditName, Leaderboard
 from utils.dependencies import Dependies
@@ -44,6 +43,23 @@ async def avatar_get(request: Request, token: User = Depends(dependies.get_curre
 async def me(token: User = Depends(dependies.get_current_user), db: AsyncSession = Depends(get_db)):
     return await profile.get_me(db, token.id)
 
+@router.get("/matches")
+async def matches(
+    limit: int = Query(default=10, ge=1, le=50),
+    page: int = Query(default=1, ge=1),
+    token: User = Depends(dependies.get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await profile.get_matches(db, token.id, limit, page)
+
+@router.get("/matches/{match_id}")
+async def match_detail(
+    match_id: int,
+    token: User = Depends(dependies.get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await profile.get_match(db, token.id, match_id)
+
 @router.get("/leaderboard",response_model=list[Leaderboard],)
 async def leaderboard(db: AsyncSession = Depends(get_db)):
     cached = await r.get("leaderboard:top5")
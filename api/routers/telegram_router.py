@@ -1,9 +1,9 @@
 from utils.dependencies import Dependies
 from fastapi import APIRouter, Depends, Header, HTTPException
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from database.database import get_db
-from models.user import User
+from repositories.user_repository import UserRepository
+from repositories.match_repository import MatchRepository
 router = APIRouter()
 dependies = Dependies()
 @router.get("/{telegram_id}/stats")
@@ -12,12 +12,10 @@ async def get_telegram_stats(
     db: AsyncSession = Depends(get_db),
     _: bool = Depends(dependies.verify_bot_secret)
 ):
-    user = await db.execute(
-        select(User).where(User.telegram == telegram_id)
-    )
-    user = user.scalars().first()
+    user = await UserRepository.get_by_telegram(db, telegram_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    recent = await MatchRepository.get_by_user(db, user.id, 0, 5)
     return {
         "name": user.name,
         "username": user.username,
@@ -27,4 +25,8 @@ async def get_telegram_stats(
         "games_played": user.games_played,
         "games_won": user.games_won,
         "games_lost": user.games_lost,
+        "recent_matches": [
+            {"won": m.won, "mmr_delta": m.mmr_delta, "total_points": m.total_points}
+            for m in recent
+        ],
     }
@@ -1,4 +1,7 @@
 from services.websocket_service import ws_service
+from services.lobby_events import lobby_events
+from services.heartbeat import heartbeat
+from services.spectator_relay import spectator_hub
 from fastapi import APIRouter, WebSocket, HTTPException, WebSocketDisconnect, Depends
 from utils.token_manager import TokenManager
 import asyncio
@@ -6,12 +9,18 @@ import time
 import logging
 from cache.redis import r
 from utils.dependencies import Dependies
-from services.authorization import AuthService
 from database.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
-from repositories.lobby_repository import LobbyRepository
+from repositories.lobby_store import lobby_store
 from database.database import asyncsession
 from starlette.websockets import WebSocketState
+from utils.rate_limiter import MessageThrottle
+from utils.serializer import (
+    send_message,
+    receive_message,
+    negotiate_protocol,
+    MSGPACK_PROTOCOL,
+)
 
 
 dependies = Dependies()
@@ -25,6 +34,10 @@ async def GameStart(
 ):
     await websocket.accept()
 
+    if spectator_hub.role == "spectator":
+        await websocket.close(code=1013, reason="Spectator relay only")
+        return
+
     token = websocket.query_params.get("token")
 
     if not token:
@@ -33,7 +46,7 @@ async def GameStart(
 
     try:
         async with asyncsession() as db:
-            lobby = await LobbyRepository.get_by_code(db, lobby_code)
+            lobby = await lobby_store.get_meta(db, lobby_code)
             if not lobby:
                 await websocket.close(code=1008, reason="Lobby not found")
                 return
@@ -41,7 +54,10 @@ async def GameStart(
             token_data = await TokenManager.verifyToken(db, token)
             user_id = token_data["user_id"]
 
-            await ws_service.player_joined(db, user_id, lobby_code, websocket)
+            last_seq = websocket.query_params.get("last_seq")
+            await ws_service.player_joined(
+                db, user_id, lobby_code, websocket, int(last_seq) if last_seq and last_seq.isdigit() else None
+            )
             
             if websocket.client_state != WebSocketState.CONNECTED:
                 return
@@ -56,25 +72,45 @@ async def GameStart(
         # players
         "player_joined": lambda db, data: ws_service.player_joined(db,user_id,lobby_code,websocket),
         "player_left": lambda db, data: ws_service.player_left(db,user_id,lobby_code,websocket),
-        "player_reconnect": lambda db,data: ws_service.reconect(db,user_id,lobby_code,websocket),
+        "player_reconnect": lambda db,data: ws_service.reconect(db,user_id,lobby_code,websocket,data.get("last_seq")),
         "broadcast": lambda db, data:ws_service.broadcast(db,user_id,lobby_code, data["message"]),
         # rounds
         "round_start": lambda db, data: ws_service.RoundStarted(db,lobby_code),
         "round_end": lambda db, data: ws_service.RoundEnded(db,lobby_code),
         # spectator
-        "spectate": lambda db, data: ws_service.camera_update(lobby_code, data, data["num_player"]),
-        "guess_preview": lambda db, data: ws_service.guess_preview(data, lobby_code),
+        # frames are attributed to the authenticated sender, never to a client-supplied id
+        "spectate": lambda db, data: ws_service.camera_update(lobby_code, data, user_id),
+        "guess_preview": lambda db, data: ws_service.guess_preview(data, lobby_code, user_id),
         # anticheat
         "tab_visibility": lambda db, data: ws_service.tab_visibility(db, lobby_code, user_id, data.get("visible", True), websocket),
         # report
         "report": lambda db, data: ws_service.report(db, {**data, "reporter_id": user_id}),
     }
+    heartbeat.track(
+        websocket,
+        "game",
+        lambda: ws_service.connections.remove(lobby_code, websocket),
+        record=ws_service.connections.get(lobby_code, user_id),
+    )
+    # the connection lives on this worker, so its budgets are checked locally
+    throttle = MessageThrottle(f"ws:{user_id}:{id(websocket)}")
+
+    async def send_held(data: dict):
+        # only coalesced types are held back and their handlers don't touch the db
+        await handlers[data["type"]](None, data)
+
     try:
         while True:
-            data = await websocket.receive_json()
+            data = await receive_message(websocket)
+
+            heartbeat.seen(websocket)
+            message_type = data.get("type")
+            if message_type == "pong":
+                continue
+            if not throttle.allow(message_type, data, send_held):
+                continue
 
             async with asyncsession() as db:
-                message_type = data.get("type")
                 handler = handlers.get(message_type)
                 if handler:
                     try:
@@ -89,24 +125,21 @@ async def GameStart(
         if lobby_code not in ws_service.connections:
             return
 
-        ws_service.connections[lobby_code] = [
-            (uid, ws) for uid, ws in ws_service.connections[lobby_code] if ws != websocket
-        ]
+        ws_service.connections.remove(lobby_code, websocket)
 
-        still_connected = any(
-            uid == user_id for uid, _ in ws_service.connections.get(lobby_code, [])
-        )
-        if still_connected:
+        # a newer socket of the same user already took this one's place
+        if ws_service.connections.get(lobby_code, user_id):
             logger.info(f"User {user_id} stale WS closed but still connected to {lobby_code}")
             return
 
         await r.setex(f"disconnect:{lobby_code}:{user_id}", 180, str(time.time()))
 
         if lobby_code in ws_service.connections:
-            for player_id, ws in ws_service.connections[lobby_code]:
+            message = lobby_events.stamp(lobby_code, {"type": "player_disconnected", "player": user_id})
+            for player_id, ws in ws_service.connections.items(lobby_code):
                 if player_id != user_id:
                     try:
-                        await ws.send_json({"type": "player_disconnected", "player": user_id})
+                        await send_message(ws, message)
                     except Exception as e:
                         logger.error(f"failed to send disconnect {user_id}: {e}")
 
@@ -122,10 +155,18 @@ async def GameStart(
 
         async with asyncsession() as db:
             await ws_service.player_left(db, user_id, lobby_code, websocket)
+    finally:
+        throttle.close()
+        heartbeat.forget(websocket)
 
 @router.websocket("/ws/{lobby_code}/spectate")
 async def spectate(websocket: WebSocket, lobby_code: str):
-    await websocket.accept()
+    protocol = negotiate_protocol(websocket, (MSGPACK_PROTOCOL,))
+    await websocket.accept(subprotocol=protocol)
+
+    if not spectator_hub.serves_spectators:
+        await websocket.close(code=1013, reason="Spectators are served by the relay")
+        return
 
     token = websocket.query_params.get("token")
 
@@ -134,12 +175,14 @@ async def spectate(websocket: WebSocket, lobby_code: str):
         return
 
     try:
+        # a lobby somebody joined always has a snapshot, the db is only asked otherwise
+        snapshot = await ws_service.spectator_snapshot(lobby_code, spectator_hub.delay)
         async with asyncsession() as db:
-
-            lobby = await LobbyRepository.get_by_code(db, lobby_code)
-            if not lobby:
-                await websocket.close(code=1008, reason="Lobby not found")
-                return
+            if snapshot is None:
+                lobby = await lobby_store.get_meta(db, lobby_code)
+                if not lobby:
+                    await websocket.close(code=1008, reason="Lobby not found")
+                    return
 
             await TokenManager.verifyToken(db, token)
           
@@ -149,40 +192,27 @@ async def spectate(websocket: WebSocket, lobby_code: str):
         await websocket.close(code=1008, reason="Invalid token")
         return
     
-    if lobby_code not in ws_service.spectators:
-        ws_service.spectators[lobby_code] = []
-    ws_service.spectators[lobby_code].append(websocket)
+    await spectator_hub.add(lobby_code, websocket, compact=protocol == MSGPACK_PROTOCOL)
+    heartbeat.track(websocket, "spectator", lambda: spectator_hub.remove(lobby_code, websocket))
 
 
     try:
-        game = await ws_service._get_game(lobby_code)
-        if game:
-            current_index = game["current_location_index"]
-            current_location = game["locations"][current_index]
-            await websocket.send_json({
-                "type": "round_started",
-                "lat": current_location["lat"],
-                "lon": current_location["lon"],
-                "hp": game.get("hp", {}),
-            })
-        async with asyncsession() as db:
-            lobby_obj = await LobbyRepository.get_by_code(db, lobby_code)
-            if lobby_obj:
-                players_info = [await ws_service.user_GetInfo(db, uid) for uid in lobby_obj.users]
-                await websocket.send_json({"type": "player_joined", "players": players_info})
+        if snapshot:
+            await send_message(websocket, snapshot)
     except Exception as e:
         logger.error(f"Failed to send initial spectator state: {e}")
 
     try:
         while True:
             data = await websocket.receive_text()
+            heartbeat.seen(websocket)
     except WebSocketDisconnect:
-        if lobby_code in ws_service.spectators and websocket in ws_service.spectators[lobby_code]:
-            ws_service.spectators[lobby_code].remove(websocket)
+        pass
     except Exception as e:
         logger.error(f"Spectator WS error: {e}")
-        if lobby_code in ws_service.spectators and websocket in ws_service.spectators[lobby_code]:
-            ws_service.spectators[lobby_code].remove(websocket)
+    finally:
+        spectator_hub.remove(lobby_code, websocket)
+        heartbeat.forget(websocket)
     
 
 
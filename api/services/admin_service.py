@@ -4,7 +4,10 @@ import asyncio
 from config import config
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession
-from repositories import UserRepository, LobbyRepository, LocationRepository, ReportRepository
+from repositories import UserRepository, LocationRepository, ReportRepository
+from repositories.lobby_store import lobby_store
+from services.anticheat_service import anticheat
+from cache.auth_cache import auth_cache
 
 auth = AuthService
 logger = logging.getLogger(__name__)
@@ -63,8 +66,8 @@ class Admin_Panel:
     async def Get_lobbies(db: AsyncSession, limit: int, page: int):
         offset = (page - 1) * limit
         lobbies, total_lobbies = await asyncio.gather(
-            LobbyRepository.get_paginated(db, offset, limit),
-            LobbyRepository.count_all(db),
+            lobby_store.get_paginated(db, offset, limit),
+            lobby_store.count_all(db),
         )
         return {
             "data_lobby": [
@@ -93,6 +96,25 @@ class Admin_Panel:
             "limit": limit,
         }
     
+    @staticmethod
+    async def Get_suspects(limit: int, page: int):
+        offset = (page - 1) * limit
+        suspects, total_suspects = await anticheat.get_queue(offset, limit)
+        return {
+            "data_suspect": suspects,
+            "total_suspects": total_suspects,
+            "page": page,
+            "limit": limit,
+        }
+
+    @staticmethod
+    async def Dismiss_Suspect(admin_login: str, user_id: int):
+        if not await anticheat.dismiss(user_id):
+            raise HTTPException(status_code=404, detail="Suspect not found")
+
+        logger.warning(f"Admin {admin_login} dismissed anticheat case for user {user_id}")
+        return
+
     @staticmethod
     async def Delete_Report(db: AsyncSession, admin_login: str, id: int):
         report = await ReportRepository.delete(db, id)
@@ -145,5 +167,6 @@ class Admin_Panel:
         if user.role == "admin":
             raise HTTPException(status_code=409, detail="User is already admin")
         await UserRepository.update(db, id, {"role": "admin"})
+        await auth_cache.invalidate(id)
 
         logging.warning(f"Admin {admin_login} changed role of user {user.name}[{user.id}] to admin")
@@ -0,0 +1,177 @@
+from cache.redis import r
+from services.demo_service import demo_recorder
+from utils.demo_codec import decode_segment
+import numpy as np
+import asyncio
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "anticheat:queue"
+
+FEATURES = [
+    "median_guess_time",
+    "perfect_rate",
+    "fast_precise_rate",
+    "points_per_second",
+    "camera_entropy",
+    "camera_frames_per_round",
+]
+
+# weights over normalized features, positive = more suspicious
+WEIGHTS = np.array([0.15, 0.25, 0.3, 0.1, 0.15, 0.05])
+
+PERFECT_POINTS = 4950
+FAST_GUESS_MS = 8000
+PRECISE_POINTS = 4500
+HEADING_BINS = 36
+
+
+class AntiCheat:
+
+    @staticmethod
+    def camera_features(frames: list[dict], rounds: int) -> tuple[float, float]:
+        if not frames:
+            return 0.0, 0.0
+
+        headings = np.fromiter((f["heading"] for f in frames), dtype=np.float64, count=len(frames))
+        hist, _ = np.histogram(headings, bins=HEADING_BINS, range=(0, 360))
+        p = hist[hist > 0] / len(headings)
+        entropy = float(-(p * np.log(p)).sum() / np.log(HEADING_BINS))
+        return entropy, len(frames) / max(rounds, 1)
+
+    @staticmethod
+    def features(guesses: dict[int, list[dict]], frames: dict[int, list[dict]]):
+        players = sorted(guesses)
+        matrix = np.zeros((len(players), len(FEATURES)))
+
+        for row, player in enumerate(players):
+            player_guesses = guesses[player]
+            if not player_guesses:
+                continue
+
+            distances = np.array([g["distance"] for g in player_guesses], dtype=np.float64)
+            # same curve as LocationService.calculate_points, for every guess at once
+            points = np.rint(5000 * np.power(0.998036, distances / 1000))
+            times = np.array([g.get("time") or 0 for g in player_guesses], dtype=np.float64)
+            timed = times > 0
+
+            median_time = float(np.median(times[timed])) if timed.any() else 0.0
+            fast_precise = timed & (times < FAST_GUESS_MS) & (points >= PRECISE_POINTS)
+            entropy, frames_per_round = AntiCheat.camera_features(
+                frames.get(player, []), len(player_guesses)
+            )
+
+            matrix[row] = [
+                median_time,
+                (points >= PERFECT_POINTS).mean(),
+                fast_precise.mean(),
+                float(np.median(points[timed] / (times[timed] / 1000))) if timed.any() else 0.0,
+                entropy,
+                frames_per_round,
+            ]
+        return players, matrix
+
+    @staticmethod
+    def score(matrix: np.ndarray) -> np.ndarray:
+        if not len(matrix):
+            return np.zeros(0)
+
+        normalized = np.column_stack(
+            [
+                # fast guesses are suspicious, 60s+ is not
+                1 - np.clip(matrix[:, 0] / 60000, 0, 1),
+                matrix[:, 1],
+                matrix[:, 2],
+                np.clip(matrix[:, 3] / 1000, 0, 1),
+                # barely looking around before a precise guess
+                1 - matrix[:, 4],
+                1 - np.clip(matrix[:, 5] / 100, 0, 1),
+            ]
+        )
+        # no timing or camera info means nothing to compare against
+        normalized[matrix[:, 0] == 0, 0] = 0
+        normalized[matrix[:, 5] == 0, 4:] = 0
+        return normalized @ WEIGHTS
+
+    @staticmethod
+    def _analyze(guesses: dict[int, list[dict]], segments: dict[int, list[bytes]]):
+        frames = {
+            player: [frame for segment in player_segments for frame in decode_segment(segment)]
+            for player, player_segments in segments.items()
+        }
+        players, matrix = AntiCheat.features(guesses, frames)
+        return players, matrix, AntiCheat.score(matrix)
+
+    @staticmethod
+    async def analyze_match(InviteCode: str, game: dict):
+        guesses: dict[int, list[dict]] = {int(player_id): [] for player_id in game.get("hp", {})}
+        for round_guesses in game.get("guesses", {}).values():
+            for guess in round_guesses:
+                guesses.setdefault(guess["player"], []).append(guess)
+
+        segments = {
+            player: await demo_recorder.segments(InviteCode, player) for player in guesses
+        }
+
+        # decoding and scoring is cpu bound, keep it off the event loop
+        players, matrix, scores = await asyncio.to_thread(AntiCheat._analyze, guesses, segments)
+
+        current = await r.zmscore(QUEUE_KEY, [str(player) for player in players]) if players else []
+
+        async with r.pipeline(transaction=False) as pipe:
+            for player, features, score, previous in zip(players, matrix, scores, current):
+                pipe.hset(
+                    f"anticheat:match:{player}:{InviteCode}",
+                    mapping={
+                        "score": float(score),
+                        "features": json.dumps(dict(zip(FEATURES, features.tolist()))),
+                        "analyzed_at": int(time.time()),
+                    },
+                )
+                pipe.expire(f"anticheat:match:{player}:{InviteCode}", 7 * 24 * 3600)
+                # the queue keeps each player's worst match
+                if previous is None or score >= previous:
+                    pipe.zadd(QUEUE_KEY, {str(player): float(score)})
+                    pipe.hset("anticheat:worst_match", str(player), InviteCode)
+            await pipe.execute()
+
+        logger.info(f"Anticheat scored {InviteCode}: {dict(zip(players, scores.round(3).tolist()))}")
+        return dict(zip(players, scores.tolist()))
+
+    @staticmethod
+    async def get_queue(offset: int, limit: int):
+        entries = await r.zrevrange(QUEUE_KEY, offset, offset + limit - 1, withscores=True)
+        total = await r.zcard(QUEUE_KEY)
+
+        if not entries:
+            return [], total
+
+        invite_codes = await r.hmget("anticheat:worst_match", [user_id for user_id, _ in entries])
+        async with r.pipeline(transaction=False) as pipe:
+            for (user_id, _), invite_code in zip(entries, invite_codes):
+                pipe.hgetall(f"anticheat:match:{user_id}:{invite_code}")
+            all_details = await pipe.execute()
+
+        suspects = []
+        for (user_id, score), invite_code, details in zip(entries, invite_codes, all_details):
+            suspects.append(
+                {
+                    "user_id": int(user_id),
+                    "score": round(score, 4),
+                    "lobby_code": invite_code,
+                    "features": json.loads(details["features"]) if details.get("features") else None,
+                }
+            )
+        return suspects, total
+
+    @staticmethod
+    async def dismiss(user_id: int):
+        removed = await r.zrem(QUEUE_KEY, str(user_id))
+        await r.hdel("anticheat:worst_match", str(user_id))
+        return bool(removed)
+
+
+anticheat = AntiCheat()
@@ -1,11 +1,9 @@
 import logging
 import urllib.parse
-import requests
 from fastapi import APIRouter, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
-from dotenv import load_dotenv
 from config import config
 from repositories import user_repository
 from utils.token_manager import TokenManager
@@ -17,8 +15,6 @@ from providers.telegram import TelegramOAuthProvider
 
 logger = logging.getLogger(__name__)
 
-load_dotenv()
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 router = APIRouter()
@@ -0,0 +1,87 @@
+from fastapi import WebSocket
+import time
+
+
+class Connection:
+    __slots__ = ("user_id", "lobby_code", "ws", "role", "joined_at", "last_seen")
+
+    def __init__(self, user_id: int, lobby_code: str, ws: WebSocket, role: str = "player"):
+        self.user_id = user_id
+        self.lobby_code = lobby_code
+        self.ws = ws
+        self.role = role
+        self.joined_at = time.time()
+        self.last_seen = self.joined_at
+
+
+class ConnectionRegistry:
+    def __init__(self):
+        # lobby_code: {user_id: connection}, one live socket per user per lobby
+        self.lobbies: dict[str, dict[int, Connection]] = {}
+        # user_id: lobby codes they are connected to on this worker
+        self.users: dict[int, set[str]] = {}
+
+    def __contains__(self, lobby_code: str) -> bool:
+        return lobby_code in self.lobbies
+
+    def add(self, lobby_code: str, user_id: int, ws: WebSocket, role: str = "player") -> Connection:
+        # a newer socket for the same user replaces the old one, the same socket keeps its record
+        connection = self.lobbies.get(lobby_code, {}).get(user_id)
+        if connection is not None and connection.ws is ws:
+            connection.role = role
+            return connection
+
+        connection = Connection(user_id, lobby_code, ws, role)
+        self.lobbies.setdefault(lobby_code, {})[user_id] = connection
+        self.users.setdefault(user_id, set()).add(lobby_code)
+        return connection
+
+    def remove(self, lobby_code: str, ws: WebSocket) -> Connection | None:
+        members = self.lobbies.get(lobby_code)
+        if not members:
+            return None
+        for user_id, connection in members.items():
+            if connection.ws is ws:
+                return self._discard(lobby_code, user_id)
+        return None
+
+    def remove_user(self, lobby_code: str, user_id: int) -> Connection | None:
+        if user_id not in self.lobbies.get(lobby_code, {}):
+            return None
+        return self._discard(lobby_code, user_id)
+
+    def _discard(self, lobby_code: str, user_id: int) -> Connection:
+        connection = self.lobbies[lobby_code].pop(user_id)
+        lobbies = self.users.get(user_id)
+        if lobbies is not None:
+            lobbies.discard(lobby_code)
+            if not lobbies:
+                del self.users[user_id]
+        return connection
+
+    def drop_lobby(self, lobby_code: str) -> None:
+        for user_id in self.lobbies.pop(lobby_code, {}):
+            lobbies = self.users.get(user_id)
+            if lobbies is not None:
+                lobbies.discard(lobby_code)
+                if not lobbies:
+                    del self.users[user_id]
+
+    def get(self, lobby_code: str, user_id: int) -> Connection | None:
+        return self.lobbies.get(lobby_code, {}).get(user_id)
+
+    def count(self, lobby_code: str) -> int:
+        return len(self.lobbies.get(lobby_code, {}))
+
+    def lobbies_of(self, user_id: int) -> set[str]:
+        return self.users.get(user_id, set())
+
+    # the helpers below return copies, so sending can await while members change
+    def sockets(self, lobby_code: str) -> list[WebSocket]:
+        return [connection.ws for connection in self.lobbies.get(lobby_code, {}).values()]
+
+    def user_ids(self, lobby_code: str) -> list[int]:
+        return list(self.lobbies.get(lobby_code, {}))
+
+    def items(self, lobby_code: str) -> list[tuple[int, WebSocket]]:
+        return [(user_id, connection.ws) for user_id, connection in self.lobbies.get(lobby_code, {}).items()]
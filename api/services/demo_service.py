@@ -0,0 +1,185 @@
+from cache.redis import r_bin
+from config import config
+from utils.demo_codec import DemoEncoder, decode_segment, read_header, demo_segments
+import heapq
+import json
+import logging
+import struct
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class DemoRecorder:
+    def __init__(self):
+        # (lobby_code, num_player): segment being filled
+        self.encoders: dict[tuple[str, int], DemoEncoder] = {}
+        self.rounds: dict[str, int] = {}
+
+    @staticmethod
+    def _key(lobby_code: str, num_player: int) -> str:
+        return f"demo:{lobby_code}:{num_player}"
+
+    @staticmethod
+    def _players_key(lobby_code: str) -> str:
+        return f"demo:{lobby_code}:players"
+
+    async def record(self, lobby_code: str, data: dict, num_player: int) -> None:
+        now = int(time.time() * 1000)
+        key = (lobby_code, num_player)
+
+        encoder = self.encoders.get(key)
+        if encoder is None:
+            encoder = DemoEncoder(num_player, now)
+            self.encoders[key] = encoder
+
+        encoder.add(data, now)
+        if encoder.count >= config.DEMO_SEGMENT_FRAMES:
+            await self._flush(key)
+
+    async def new_round(self, lobby_code: str, round_index: int) -> None:
+        # segments never straddle rounds so reports can pick rounds by segment
+        await self.flush(lobby_code)
+        self.rounds[lobby_code] = round_index
+
+    async def _flush(self, key: tuple[str, int]) -> None:
+        encoder = self.encoders.pop(key, None)
+        if not encoder or encoder.count == 0:
+            return
+
+        lobby_code, num_player = key
+        # ring buffer: entries older than the window are trimmed on every add
+        min_id = int(time.time() * 1000) - config.DEMO_WINDOW_SECONDS * 1000
+        async with r_bin.pipeline(transaction=False) as pipe:
+            pipe.xadd(
+                self._key(lobby_code, num_player),
+                {"r": self.rounds.get(lobby_code, 0), "d": encoder.to_bytes()},
+                minid=min_id,
+                approximate=True,
+            )
+            pipe.sadd(self._players_key(lobby_code), num_player)
+            await pipe.execute()
+
+    async def flush(self, lobby_code: str) -> None:
+        for key in [k for k in self.encoders if k[0] == lobby_code]:
+            await self._flush(key)
+
+    async def segments(
+        self, lobby_code: str, num_player: int, rounds: list[int] | None = None
+    ) -> list[bytes]:
+        await self._flush((lobby_code, num_player))
+        entries = await r_bin.xrange(self._key(lobby_code, num_player))
+        return [
+            fields[b"d"]
+            for _, fields in entries
+            if rounds is None or int(fields[b"r"]) in rounds
+        ]
+
+    async def expire(self, lobby_code: str, seconds: int, pipe) -> None:
+        # queued on the caller's pipeline so the game cleanup stays one round trip
+        await self.flush(lobby_code)
+        self.rounds.pop(lobby_code, None)
+
+        players = await r_bin.smembers(self._players_key(lobby_code))
+        for num_player in players:
+            pipe.expire(self._key(lobby_code, int(num_player)), seconds)
+        pipe.expire(self._players_key(lobby_code), seconds)
+
+
+class DemoPlayback:
+    @staticmethod
+    def index(demo) -> list[dict]:
+        # headers only: a segment runs until the next segment of the same player
+        entries = []
+        for i, segment in enumerate(demo_segments(demo)):
+            count, num_player, start = read_header(segment)
+            entries.append(
+                {"segment": i, "num_player": num_player, "start": start, "frames": count, "end": None}
+            )
+
+        last_by_player: dict[int, dict] = {}
+        for entry in sorted(entries, key=lambda e: e["start"]):
+            previous = last_by_player.get(entry["num_player"])
+            if previous:
+                previous["end"] = entry["start"]
+            last_by_player[entry["num_player"]] = entry
+        return entries
+
+    @staticmethod
+    def summary(demo) -> dict:
+        if isinstance(demo, list):
+            return {"codec": "json", "frames": len(demo), "segments": []}
+
+        entries = DemoPlayback.index(demo)
+        segments = demo_segments(demo)
+        for entry in entries:
+            if entry["end"] is None:
+                entry["end"] = decode_segment(segments[entry["segment"]])[-1]["t"]
+
+        start = min((e["start"] for e in entries), default=0)
+        end = max((e["end"] for e in entries), default=0)
+        return {
+            "codec": demo.get("codec"),
+            "start": start,
+            "duration": end - start,
+            "frames": sum(e["frames"] for e in entries),
+            "segments": [
+                {**e, "start": e["start"] - start, "end": e["end"] - start} for e in entries
+            ],
+        }
+
+    @staticmethod
+    def _window(demo, start: int, window: int | None, num_player: int | None):
+        entries = DemoPlayback.index(demo)
+        origin = min((e["start"] for e in entries), default=0)
+        begin = origin + start
+        end = begin + window if window else None
+
+        selected = [
+            e
+            for e in sorted(entries, key=lambda e: e["start"])
+            if (num_player is None or e["num_player"] == num_player)
+            and (end is None or e["start"] < end)
+            and (e["end"] is None or e["end"] > begin)
+        ]
+        return origin, begin, end, selected
+
+    @staticmethod
+    def ndjson(demo, start: int = 0, window: int | None = None, num_player: int | None = None):
+        if isinstance(demo, list):
+            for frame in demo:
+                if num_player is None or frame.get("num_player") == num_player:
+                    yield json.dumps(frame) + "\n"
+            return
+
+        origin, begin, end, selected = DemoPlayback._window(demo, start, window, num_player)
+        segments = demo_segments(demo)
+
+        def player_frames(player: int):
+            for entry in selected:
+                if entry["num_player"] == player:
+                    yield from decode_segment(segments[entry["segment"]])
+
+        # players are decoded lazily, one segment at a time, and merged by time
+        players = {entry["num_player"] for entry in selected}
+        for frame in heapq.merge(*(player_frames(p) for p in players), key=lambda f: f["t"]):
+            if frame["t"] < begin:
+                continue
+            if end is not None and frame["t"] >= end:
+                continue
+            frame["offset"] = frame["t"] - origin
+            yield json.dumps(frame) + "\n"
+
+    @staticmethod
+    def binary(demo, start: int = 0, window: int | None = None, num_player: int | None = None):
+        # whole segments overlapping the window, each prefixed with its length
+        if isinstance(demo, list):
+            return
+        _, _, _, selected = DemoPlayback._window(demo, start, window, num_player)
+        segments = demo_segments(demo)
+        for entry in selected:
+            segment = segments[entry["segment"]]
+            yield struct.pack("<I", len(segment)) + segment
+
+
+demo_recorder = DemoRecorder()
@@ -0,0 +1,93 @@
+from fastapi import WebSocket
+from config import config
+from core.metrics import ws_live_sockets, ws_reaped_sockets
+from utils.serializer import dumps_text, send_message
+from typing import Callable
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Tracked:
+    __slots__ = ("kind", "last_seen", "evict", "record")
+
+    def __init__(self, kind: str, evict: Callable[[], None], record=None):
+        self.kind = kind
+        self.last_seen = time.time()
+        self.evict = evict
+        # optional object with its own last_seen, e.g. a registry Connection
+        self.record = record
+
+
+class Heartbeat:
+    def __init__(self, interval: float, timeout: float, send_timeout: float = 5):
+        self.interval = interval
+        self.timeout = timeout
+        self.send_timeout = send_timeout
+        self.sockets: dict[WebSocket, Tracked] = {}
+
+    def track(self, ws: WebSocket, kind: str, evict: Callable[[], None], record=None) -> None:
+        self.sockets[ws] = Tracked(kind, evict, record)
+
+    def seen(self, ws: WebSocket) -> None:
+        # any message from the client counts as a pong
+        tracked = self.sockets.get(ws)
+        if tracked is None:
+            return
+        tracked.last_seen = time.time()
+        if tracked.record is not None:
+            tracked.record.last_seen = tracked.last_seen
+
+    def forget(self, ws: WebSocket) -> None:
+        self.sockets.pop(ws, None)
+
+    async def reap(self, ws: WebSocket, reason: str) -> None:
+        tracked = self.sockets.pop(ws, None)
+        if tracked is None:
+            return
+        ws_reaped_sockets.labels(tracked.kind).inc()
+        logger.info(f"Reaping {tracked.kind} socket: {reason}")
+        try:
+            tracked.evict()
+        except Exception as e:
+            logger.error(f"Failed to evict {tracked.kind} socket: {e}")
+        try:
+            await asyncio.wait_for(ws.close(code=1001, reason="heartbeat timeout"), self.send_timeout)
+        except Exception:
+            pass
+
+    async def _ping(self, ws: WebSocket, message: str) -> None:
+        try:
+            await asyncio.wait_for(send_message(ws, message), self.send_timeout)
+        except Exception as e:
+            await self.reap(ws, f"ping failed: {e!r}")
+
+    async def tick(self) -> None:
+        now = time.time()
+        stale = [ws for ws, tracked in self.sockets.items() if now - tracked.last_seen > self.timeout]
+        for ws in stale:
+            await self.reap(ws, f"no pong for {self.timeout}s")
+
+        message = dumps_text({"type": "ping", "t": int(now * 1000)})
+        await asyncio.gather(*(self._ping(ws, message) for ws in list(self.sockets)))
+
+        live: dict[str, int] = {}
+        for tracked in self.sockets.values():
+            live[tracked.kind] = live.get(tracked.kind, 0) + 1
+        for kind in ("game", "spectator", "matchmaking"):
+            ws_live_sockets.labels(kind).set(live.get(kind, 0))
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Heartbeat tick failed: {e}")
+
+
+heartbeat = Heartbeat(config.WS_PING_INTERVAL, config.WS_PING_TIMEOUT)
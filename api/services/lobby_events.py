@@ -0,0 +1,49 @@
+from collections import deque
+from config import config
+from utils.serializer import encode_message
+import time
+
+
+class LobbyEvents:
+    def __init__(self, size: int):
+        self.size = size
+        self.seq: dict[str, int] = {}
+        # lobby_code: last `size` (seq, encoded message)
+        self.buffers: dict[str, deque[tuple[int, str]]] = {}
+
+    def stamp(self, lobby_code: str, message: dict) -> str:
+        # seqs start from the clock, so after a restart they are above anything a client saw before
+        seq = self.seq.get(lobby_code) or int(time.time() * 1000)
+        seq += 1
+        self.seq[lobby_code] = seq
+
+        text = encode_message({**message, "seq": seq})
+        buffer = self.buffers.get(lobby_code)
+        if buffer is None:
+            buffer = self.buffers[lobby_code] = deque(maxlen=self.size)
+        buffer.append((seq, text))
+        return text
+
+    def current(self, lobby_code: str) -> int:
+        return self.seq.get(lobby_code, 0)
+
+    def since(self, lobby_code: str, last_seq: int, upto: int | None = None) -> list[str] | None:
+        # None: the client missed more than the buffer holds and needs a snapshot
+        current = self.seq.get(lobby_code)
+        if current is None or last_seq > current:
+            return None
+        upto = current if upto is None else upto
+        if last_seq >= upto:
+            return []
+
+        buffer = self.buffers[lobby_code]
+        if buffer[0][0] > last_seq + 1:
+            return None
+        return [text for seq, text in buffer if last_seq < seq <= upto]
+
+    def drop(self, lobby_code: str) -> None:
+        self.seq.pop(lobby_code, None)
+        self.buffers.pop(lobby_code, None)
+
+
+lobby_events = LobbyEvents(config.WS_REPLAY_BUFFER)
@@ -1,7 +1,6 @@
 
 from config import config
 from fastapi import HTTPException, APIRouter, Body, Depends
-from services.authorization import AuthService
 from utils.LocationService import LocationService
 import logging
 from models.lobby import Lobby
@@ -9,7 +8,7 @@ from sqlalchemy import select
 from repositories.location_repository import LocationRepository
 from sqlalchemy.ext.asyncio import AsyncSession
 from repositories.user_repository import UserRepository
-from repositories.lobby_repository import LobbyRepository
+from repositories.lobby_store import lobby_store
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +19,7 @@ class LobbyService:
 
     @staticmethod
     async def create_lobby(db: AsyncSession, user_id: int, mode: str | None = None, war_id: int | None = None):
-        lobby = await LobbyRepository.create(db=db,host_id=user_id,mode=mode,war_id=war_id)
+        lobby = await lobby_store.create(db, user_id, mode=mode, war_id=war_id)
         logging.info(f"User {user_id} created lobby {lobby.invite_code}")
         return lobby
     
@@ -28,7 +27,7 @@ class LobbyService:
         
     @staticmethod
     async def lobby_join(db: AsyncSession, InviteCode: str, user_id: int):
-        await LobbyRepository.add_user(db,InviteCode,user_id)
+        await lobby_store.add_user(db, InviteCode, user_id)
         
         logging.info(f"User {user_id} joined lobby {InviteCode}")
         return {"message": "Successfully joined lobby"}
@@ -37,7 +36,7 @@ class LobbyService:
     @staticmethod
     async def lobby_leave(db: AsyncSession, InviteCode: str, user_id: int):
 
-        await LobbyRepository.remove_user(db,user_id,InviteCode)
+        await lobby_store.remove_user(db, user_id, InviteCode)
 
         logging.info(f"User {user_id} left lobby {InviteCode}")
         return {"message": "Successfully left lobby"}
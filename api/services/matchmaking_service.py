@@ -6,7 +6,7 @@ from repositories.location_repository import LocationRepository
 from sqlalchemy.ext.asyncio import AsyncSession
 from repositories.user_repository import UserRepository
 from models.user import User
-from repositories.lobby_repository import LobbyRepository
+from repositories.lobby_store import lobby_store
 from repositories.location_repository import LocationRepository
 import time
 
@@ -55,8 +55,8 @@ class MatchmakingService:
                             from database.database import asyncsession
 
                             async with asyncsession() as db:
-                                lobby = await LobbyRepository.create(
-                                    db=db, host_id=login_1, user_2=login_2
+                                lobby = await lobby_store.create(
+                                    db, login_1, user_2=login_2
                                 )
 
                                 invite_code = lobby.invite_code
@@ -74,6 +74,9 @@ class MatchmakingService:
                             logger.error(f"Error: {str(e)}")
                         break
 
+    def drop_socket(self, ws):
+        self.queue = [(l, w, m, t) for l, w, m, t in self.queue if w is not ws]
+
     async def leave_queue(self, login, ws, mmr):
         self.queue = [(l, w, m, t) for l, w, m, t in self.queue if l != login]
         logger.info(
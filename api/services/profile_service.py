@@ -8,8 +8,9 @@ import logging
 from repositories.location_repository import LocationRepository
 from sqlalchemy.ext.asyncio import AsyncSession
 from repositories.user_repository import UserRepository
-from repositories.lobby_repository import LobbyRepository
+from repositories.lobby_store import lobby_store
 from repositories.location_repository import LocationRepository
+from repositories.match_repository import MatchRepository
 import aiofiles
 
 logger = logging.getLogger(__name__)
@@ -71,7 +72,7 @@ class Profile:
             "clan_role": user.clan_role,
             "clan_tag": clan_tag,
         }
-        lobbies = await LobbyRepository.get_by_user_id(db, [user_id])
+        lobbies = await lobby_store.get_by_user_id(db, user_id)
         message["lobbies"] = [{"code": lobby.invite_code, "host_id": lobby.host_id} for lobby in lobbies]
         return message
     @staticmethod
@@ -80,3 +81,54 @@ class Profile:
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         return user.avatar
+
+    @staticmethod
+    async def get_matches(db: AsyncSession, user_id: int, limit: int, page: int):
+        offset = (page - 1) * limit
+        matches = await MatchRepository.get_by_user(db, user_id, offset, limit)
+        total_matches = await MatchRepository.count_by_user(db, user_id)
+        return {
+            "data_match": [
+                {
+                    "id": m.id,
+                    "opponent_id": m.opponent_id,
+                    "mode": m.mode,
+                    "won": m.won,
+                    "mmr_delta": m.mmr_delta,
+                    "rounds_played": m.rounds_played,
+                    "total_points": m.total_points,
+                    "total_distance": m.total_distance,
+                    "ended_at": m.ended_at.isoformat(),
+                }
+                for m in matches
+            ],
+            "total_matches": total_matches,
+            "page": page,
+            "limit": limit,
+        }
+
+    @staticmethod
+    async def get_match(db: AsyncSession, user_id: int, match_id: int):
+        match = await MatchRepository.get_by_id(db, match_id)
+        if not match or match.user_id != user_id:
+            raise HTTPException(status_code=404, detail="Match not found")
+
+        rounds = await MatchRepository.get_rounds(db, match_id)
+        return {
+            "id": match.id,
+            "opponent_id": match.opponent_id,
+            "won": match.won,
+            "mmr_delta": match.mmr_delta,
+            "ended_at": match.ended_at.isoformat(),
+            "rounds": [
+                {
+                    "round": rd.round,
+                    "distance": rd.distance,
+                    "points": rd.points,
+                    "lat": rd.lat,
+                    "lon": rd.lon,
+                    "country": rd.country,
+                }
+                for rd in rounds
+            ],
+        }
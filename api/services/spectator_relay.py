@@ -0,0 +1,178 @@
+from cache.redis import r
+from config import config
+from fastapi import WebSocket
+from services.heartbeat import heartbeat
+from utils.serializer import COMPACT_TYPES, encode_message, loads, pack_compact, send_message
+from collections import deque
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "spectate:"
+PRESENCE_TTL = 90
+
+
+class SpectatorHub:
+    def __init__(self, role: str, delay: float, presence_interval: float = 30, max_entries: int = 10000):
+        if role not in ("all", "game", "spectator"):
+            raise ValueError(f"Unknown worker role: {role}")
+        self.role = role
+        self.delay = delay
+        self.presence_interval = presence_interval
+        self.max_entries = max_entries
+        self.spectators: dict[str, list[WebSocket]] = {}
+        # spectators that negotiated the msgpack subprotocol
+        self.compact: set[WebSocket] = set()
+        # (due, lobby_code, text, message), oldest first
+        self.buffer: deque[tuple[float, str, str, dict | None]] = deque()
+        self.wakeup = asyncio.Event()
+        # game role only: lobby_code: (checked_at, a relay has viewers)
+        self.remote_viewers: dict[str, tuple[float, bool]] = {}
+
+    @property
+    def serves_spectators(self) -> bool:
+        return self.role != "game"
+
+    async def add(self, lobby_code: str, ws: WebSocket, compact: bool = False) -> None:
+        self.spectators.setdefault(lobby_code, []).append(ws)
+        if compact:
+            self.compact.add(ws)
+        if self.role == "spectator":
+            await self._announce([lobby_code])
+
+    def remove(self, lobby_code: str, ws: WebSocket) -> None:
+        spectators = self.spectators.get(lobby_code)
+        if spectators and ws in spectators:
+            spectators.remove(ws)
+            if not spectators:
+                del self.spectators[lobby_code]
+        self.compact.discard(ws)
+
+    async def has_viewers(self, lobby_code: str) -> bool:
+        if self.role != "game":
+            return lobby_code in self.spectators
+
+        # relays announce the lobbies they serve, asked at most once a second per lobby
+        now = time.monotonic()
+        checked = self.remote_viewers.get(lobby_code)
+        if checked and now - checked[0] < 1:
+            return checked[1]
+        try:
+            viewers = bool(await r.exists(f"spectators:{lobby_code}"))
+        except Exception as e:
+            logger.error(f"Spectator presence check failed for {lobby_code}: {e}")
+            viewers = True
+        if len(self.remote_viewers) >= self.max_entries:
+            self.remote_viewers = {k: v for k, v in self.remote_viewers.items() if now - v[0] < 1}
+        self.remote_viewers[lobby_code] = (now, viewers)
+        return viewers
+
+    def forget(self, lobby_code: str) -> None:
+        # the lobby ended, answers for it won't be asked again
+        self.remote_viewers.pop(lobby_code, None)
+
+    async def publish(self, lobby_code: str, message: dict | str) -> None:
+        # encoded once here, relays forward the same text to every viewer
+        if not await self.has_viewers(lobby_code):
+            return
+        text = message if isinstance(message, str) else encode_message(message)
+
+        if self.role == "game":
+            try:
+                await r.publish(f"{CHANNEL_PREFIX}{lobby_code}", text)
+            except Exception as e:
+                logger.error(f"Failed to publish spectator frame for {lobby_code}: {e}")
+            return
+        await self._enqueue(lobby_code, text, message if isinstance(message, dict) else None)
+
+    async def _enqueue(self, lobby_code: str, text: str, message: dict | None) -> None:
+        if not self.delay:
+            await self.deliver(lobby_code, text, message)
+            return
+        self.buffer.append((time.monotonic() + self.delay, lobby_code, text, message))
+        self.wakeup.set()
+
+    async def deliver(self, lobby_code: str, text: str, message: dict | None = None) -> None:
+        compact = None
+        dead = []
+        for ws in list(self.spectators.get(lobby_code, [])):
+            try:
+                if ws in self.compact:
+                    if compact is None:
+                        message = message or loads(text)
+                        compact = pack_compact(message) if message.get("type") in COMPACT_TYPES else b""
+                    if compact:
+                        await ws.send_bytes(compact)
+                        continue
+                await send_message(ws, text)
+            except Exception:
+                dead.append(ws)
+
+        # a socket that can't take a frame won't take the next one either
+        for ws in dead:
+            self.remove(lobby_code, ws)
+            await heartbeat.reap(ws, "spectator send failed")
+
+    async def pump(self) -> None:
+        # releases buffered frames once they are config.SPECTATOR_DELAY old
+        while True:
+            if not self.buffer:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+            due, lobby_code, text, message = self.buffer[0]
+            wait = due - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            self.buffer.popleft()
+            try:
+                await self.deliver(lobby_code, text, message)
+            except Exception as e:
+                logger.error(f"Failed to deliver delayed frame for {lobby_code}: {e}")
+
+    async def _announce(self, lobby_codes: list[str]) -> None:
+        try:
+            async with r.pipeline(transaction=False) as pipe:
+                for lobby_code in lobby_codes:
+                    pipe.setex(f"spectators:{lobby_code}", PRESENCE_TTL, 1)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to announce spectators: {e}")
+
+    async def presence(self) -> None:
+        while True:
+            await asyncio.sleep(self.presence_interval)
+            if self.spectators:
+                await self._announce(list(self.spectators))
+
+    async def listen(self) -> None:
+        while True:
+            try:
+                pubsub = r.pubsub()
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    lobby_code = message["channel"][len(CHANNEL_PREFIX):]
+                    if lobby_code in self.spectators:
+                        await self._enqueue(lobby_code, message["data"], None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Spectator relay listener error: {e}")
+                await asyncio.sleep(1)
+
+    async def run(self) -> None:
+        tasks = []
+        if self.delay:
+            tasks.append(self.pump())
+        if self.role == "spectator":
+            tasks += [self.listen(), self.presence()]
+        if tasks:
+            await asyncio.gather(*tasks)
+
+
+spectator_hub = SpectatorHub(config.WORKER_ROLE, config.SPECTATOR_DELAY)
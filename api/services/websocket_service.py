@@ -1,6 +1,6 @@
 from fastapi import WebSocket, APIRouter, Depends, HTTPException, Body
 from utils.LocationService import LocationService
-import json
+from utils.serializer import dumps, dumps_text, loads, send_message
 from sqlalchemy import select
 from models.user import User
 from starlette.websockets import WebSocketDisconnect
@@ -12,12 +12,20 @@ from config import config
 from repositories.location_repository import LocationRepository
 from sqlalchemy.ext.asyncio import AsyncSession
 from repositories.user_repository import UserRepository
-from repositories.lobby_repository import LobbyRepository
+from repositories.lobby_store import lobby_store
 from repositories.location_repository import LocationRepository
 from core.metrics import active_websockets
 from services.clan_service import ClanWarService
 from schemas.report_schema import Report_request
 from repositories.report_repository import ReportRepository
+from repositories.match_repository import MatchRepository
+from services.demo_service import demo_recorder
+from services.lobby_events import lobby_events
+from services.connection_registry import ConnectionRegistry
+from services.spectator_relay import spectator_hub
+from services.anticheat_service import anticheat
+from utils.demo_codec import pack_demo
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
@@ -27,13 +35,10 @@ locat = LocationService()
 
 class Websocket_service:
     def __init__(self):
-        self.connections: dict[str, list[tuple[int, WebSocket]]] = (
-            {}
-        )  # invitecode: [(login, ws)]
+        self.connections = ConnectionRegistry()
         # self.games: dict[str, dict] = {}
         self.timers = {}  # invitecode: timer
         # self.disconnects: dict[str,dict[int, float]] = {}  # invitecode: [(login, timer)]
-        self.spectators: dict[str, list[WebSocket]] = {}
         self.tab_timers: dict[str, asyncio.Task] = {}
 
     @staticmethod
@@ -41,7 +46,7 @@ class Websocket_service:
         data = await r.get(f"game:{InviteCode}")
         if not data:
             return None
-        return json.loads(data)
+        return loads(data)
 
     async def kick_timer(
         self, db: AsyncSession, user_id: int, invitecode: str, ws: WebSocket
@@ -56,30 +61,35 @@ class Websocket_service:
         await self.player_left(db, user_id, invitecode, ws)
 
         if invitecode in self.connections:
-            for _, ws in self.connections[invitecode]:
+            message = lobby_events.stamp(invitecode, {"type": "player_left", "player": user_id})
+            for ws in self.connections.sockets(invitecode):
                 try:
-                    await ws.send_json({"type": "player_left", "player": user_id})
+                    await send_message(ws, message)
                 except Exception as e:
                     logger.error(f"Failed to send player_left to connection: {e}")
 
     async def get_active_lobbies(self, user_id: int):
         active_lobby = []
 
-        for invitecode, players in self.connections.items():
-            if any(user_id == player_login for player_login, _ in players):
-                game = await self._get_game(invitecode)
+        invitecodes = sorted(self.connections.lobbies_of(user_id))
+        if not invitecodes:
+            return active_lobby
 
-                lobby_info = {
-                    "InviteCode": invitecode,
-                    "ingame": True if game else False,
-                }
+        games = await r.mget([f"game:{invitecode}" for invitecode in invitecodes])
+        for invitecode, data in zip(invitecodes, games):
+            game = loads(data) if data else None
+
+            lobby_info = {
+                "InviteCode": invitecode,
+                "ingame": True if game else False,
+            }
 
-                if game:
-                    lobby_info["current_location_index"] = game[
-                        "current_location_index"
-                    ]
-                    lobby_info["hp"] = game["hp"]
-                active_lobby.append(lobby_info)
+            if game:
+                lobby_info["current_location_index"] = game[
+                    "current_location_index"
+                ]
+                lobby_info["hp"] = game["hp"]
+            active_lobby.append(lobby_info)
         return active_lobby
 
     async def user_GetInfo(self, db: AsyncSession, user_id: int):
@@ -99,10 +109,96 @@ class Websocket_service:
             "clan_tag": clan_tag,
         }
 
+    async def players_GetInfo(self, db: AsyncSession, user_ids: list[int]) -> list[dict]:
+        # same shape as user_GetInfo, one query for the whole lobby
+        rows = await UserRepository.get_with_clan_tags(db, user_ids)
+        info = {
+            user.id: {
+                "user_id": user.id,
+                "name": user.name,
+                "avatar": user.avatar,
+                "mmr": user.mmr,
+                "rank": user.rank,
+                "clan_tag": clan_tag,
+            }
+            for user, clan_tag in rows
+        }
+        return [info[user_id] for user_id in user_ids if user_id in info]
+
+    # --- spectator snapshot ---
+    # kept as pre-encoded fields so a joining spectator costs one HMGET and one send
+
+    @staticmethod
+    async def _snapshot_field(InviteCode: str, field: str, value) -> None:
+        text = dumps_text(value)
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.hset(f"spectator_snapshot:{InviteCode}", field, text)
+            pipe.expire(f"spectator_snapshot:{InviteCode}", 3600)
+            if config.SPECTATOR_DELAY:
+                # delayed spectators join at the state as it was SPECTATOR_DELAY ago
+                now = time.time()
+                pipe.zadd(f"spectator_history:{InviteCode}", {f"{field}:{now}:{text}": now})
+                pipe.expire(f"spectator_history:{InviteCode}", 3600)
+            await pipe.execute()
+
+    async def _snapshot_round(self, InviteCode: str, game: dict) -> None:
+        current_location = game["locations"][game["current_location_index"]]
+        round_state = {
+            "lat": current_location["lat"],
+            "lon": current_location["lon"],
+            "hp": game.get("hp", {}),
+        }
+        await self._snapshot_field(InviteCode, "round", round_state)
+
+    async def _snapshot_players(self, InviteCode: str, players: list[dict]) -> None:
+        await self._snapshot_field(InviteCode, "players", players)
+
+    @staticmethod
+    async def spectator_snapshot(InviteCode: str, delay: float = 0) -> str | None:
+        if delay:
+            # oldest first, so the last write before the cutoff wins
+            fields = {}
+            for entry in await r.zrangebyscore(f"spectator_history:{InviteCode}", "-inf", time.time() - delay):
+                field, _, text = entry.split(":", 2)
+                fields[field] = text
+            round_state, players = fields.get("round"), fields.get("players")
+        else:
+            round_state, players = await r.hmget(f"spectator_snapshot:{InviteCode}", ["round", "players"])
+        if round_state is None and players is None:
+            return None
+        return (
+            f'{{"type":"spectator_snapshot","round":{round_state or "null"},'
+            f'"players":{players or "[]"}}}'
+        )
+
+    async def _replay(
+        self, InviteCode: str, websocket: WebSocket, last_seq: int | None, upto: int
+    ) -> bool:
+        # resend what a returning client missed, False when it needs a full snapshot instead.
+        # the socket is registered before `upto` is read, so later events reach it live
+        if not isinstance(last_seq, int):
+            return False
+        missed = lobby_events.since(InviteCode, last_seq, upto)
+        if missed is None:
+            return False
+
+        for message in missed:
+            await send_message(websocket, message)
+        await send_message(
+            websocket,
+            {"type": "reconnect_resumed", "seq": upto, "replayed": len(missed)},
+        )
+        return True
+
     async def player_joined(
-        self, db: AsyncSession, user_id: int, InviteCode: str, websocket: WebSocket
+        self,
+        db: AsyncSession,
+        user_id: int,
+        InviteCode: str,
+        websocket: WebSocket,
+        last_seq: int | None = None,
     ):
-        lobby = await LobbyRepository.get_by_code(db, InviteCode)
+        lobby = await lobby_store.get_meta(db, InviteCode)
 
         if not lobby:
             logger.error(f"InviteCode {InviteCode} not found")
@@ -113,21 +209,25 @@ class Websocket_service:
                 await websocket.close(code=1008, reason="Lobby is full")
                 return
 
-            await LobbyRepository.add_user(db, InviteCode, user_id)
-            lobby = await LobbyRepository.get_by_code(db, InviteCode)
-
-        if InviteCode not in self.connections:
-            self.connections[InviteCode] = []
-
-        self.connections[InviteCode] = [
-            (uid, ws) for uid, ws in self.connections[InviteCode] if uid != user_id
-        ]
+            await lobby_store.add_user(db, InviteCode, user_id)
+            lobby = await lobby_store.get_meta(db, InviteCode)
+            if not lobby:
+                # deleted between the join and the reread
+                logger.error(f"InviteCode {InviteCode} disappeared while {user_id} joined")
+                await websocket.close(code=1008, reason="Lobby not found")
+                return
 
-        self.connections[InviteCode].append((user_id, websocket))
+        self.connections.add(InviteCode, user_id, websocket)
         active_websockets.inc()
 
-        assert lobby
-        players_info = [await self.user_GetInfo(db, uid) for uid in lobby.users]
+        try:
+            resumed = await self._replay(InviteCode, websocket, last_seq, lobby_events.current(InviteCode))
+        except Exception as e:
+            logger.error(f"Failed to replay events to {user_id} in {InviteCode}: {e}")
+            resumed = False
+
+        players_info = await self.players_GetInfo(db, lobby.users)
+        await self._snapshot_players(InviteCode, players_info)
 
         message = {
             "type": "player_joined",
@@ -135,13 +235,14 @@ class Websocket_service:
             "host": lobby.host_id,
             "players": players_info,
         }
-        for _, ws in self.connections[InviteCode]:
+        message = lobby_events.stamp(InviteCode, message)
+        for ws in self.connections.sockets(InviteCode):
             try:
-                await ws.send_json(message)
+                await send_message(ws, message)
             except Exception as e:
                 logger.error(f"Failed to send player_joined to connection: {e}")
 
-        game = await self._get_game(InviteCode)
+        game = await self._get_game(InviteCode) if not resumed else None
         if game:
             current_index = game["current_location_index"]
             current_index_str = str(current_index)
@@ -149,6 +250,7 @@ class Websocket_service:
 
             rejoin_msg = {
                 "type": "reconnect_succes",
+                "seq": lobby_events.current(InviteCode),
                 "host": lobby.host_id,
                 "players": players_info,
                 "game_state": {
@@ -170,7 +272,7 @@ class Websocket_service:
                 },
             }
             try:
-                await websocket.send_json(rejoin_msg)
+                await send_message(websocket, rejoin_msg)
             except Exception as e:
                 logger.error(f"Failed to send game state on rejoin: {e}")
 
@@ -179,50 +281,52 @@ class Websocket_service:
     async def player_left(
         self, db: AsyncSession, user_id: int, InviteCode: str, websocket: WebSocket
     ):
-        lobby = await LobbyRepository.get_by_code(db, InviteCode)
+        lobby = await lobby_store.get_meta(db, InviteCode)
         if not lobby and InviteCode not in self.connections:
             return
 
         if InviteCode not in self.connections:
             return
 
-        self.connections[InviteCode] = [
-            (l, ws) for l, ws in self.connections[InviteCode] if ws != websocket
-        ]
+        self.connections.remove(InviteCode, websocket)
 
         if not lobby:
             return
 
         if user_id in lobby.users:
-            await LobbyRepository.remove_user(db, user_id, InviteCode)
-
-        if len(self.connections[InviteCode]) == 0:
-
-            await r.delete(f"game:{InviteCode}")
-            lobby = await LobbyRepository.get_by_code(db, InviteCode)
-            if lobby:
-                await LobbyRepository.delete(db, InviteCode)
+            await lobby_store.remove_user(db, user_id, InviteCode)
+
+        if self.connections.count(InviteCode) == 0:
+
+            async with r.pipeline(transaction=False) as pipe:
+                pipe.delete(f"game:{InviteCode}", f"spectator_snapshot:{InviteCode}", f"spectator_history:{InviteCode}")
+                await demo_recorder.expire(InviteCode, 3600, pipe)
+                await pipe.execute()
+            lobby_events.drop(InviteCode)
+            spectator_hub.forget(InviteCode)
+            self.connections.drop_lobby(InviteCode)
+            await lobby_store.delete(db, InviteCode)
             return
         active_websockets.dec()
 
         game = await self._get_game(InviteCode)
-        if game and len(self.connections[InviteCode]) == 1:
+        if game and self.connections.count(InviteCode) == 1:
             logger.info(
                 f"Player {user_id} left {InviteCode} during active game ending game"
             )
             await self.GameEnded(db, InviteCode)
             return
 
-        players = []
-        for user_id, _ in self.connections[InviteCode]:
-            info = await self.user_GetInfo(db, user_id)
-            players.append(info)
+        players = await self.players_GetInfo(db, self.connections.user_ids(InviteCode))
+        await self._snapshot_players(InviteCode, players)
 
-        message = {"type": "player_left", "player": user_id, "players": players}
+        message = lobby_events.stamp(
+            InviteCode, {"type": "player_left", "player": user_id, "players": players}
+        )
         if InviteCode in self.connections:
-            for _, ws in self.connections[InviteCode]:
+            for ws in self.connections.sockets(InviteCode):
                 try:
-                    await ws.send_json(message)
+                    await send_message(ws, message)
                 except Exception as e:
                     logger.error(f"Failed to send player_left to connection: {e}")
         logger.info(f"{user_id} left {InviteCode}")
@@ -237,14 +341,17 @@ class Websocket_service:
         if not user:
             return
 
-        for _, ws in self.connections[InviteCode]:
+        message_js = lobby_events.stamp(
+            InviteCode,
+            {
+                "type": "broadcast",
+                "player": user.name,
+                "message": message,
+            },
+        )
+        for ws in self.connections.sockets(InviteCode):
             try:
-                message_js = {
-                    "type": "broadcast",
-                    "player": user.name,
-                    "message": message,
-                }
-                await ws.send_json(message_js)
+                await send_message(ws, message_js)
             except Exception as e:
                 logger.warning(f"Failed to send broadcast to user: {e}")
         logger.info(f"{user.name} sent message {message} to {InviteCode}")
@@ -260,7 +367,7 @@ class Websocket_service:
     ):
         # -- FOR WARS --
 
-        lobby = await LobbyRepository.get_by_code(db, InviteCode)
+        lobby = await lobby_store.get_by_code(db, InviteCode)
         if not lobby:
             raise HTTPException(status_code=404, detail="InviteCode not found")
 
@@ -274,14 +381,16 @@ class Websocket_service:
                 "guesses": {},
                 "total_score": 0,
             }
-            await r.setex(f"game:{InviteCode}", 3600, json.dumps(game))
+            await r.setex(f"game:{InviteCode}", 3600, dumps(game))
 
-            message = {"type": "game_started", "mode": "clan_war", "timer": 120}
+            message = lobby_events.stamp(
+                InviteCode, {"type": "game_started", "mode": "clan_war", "timer": 120}
+            )
 
-            for _, ws in self.connections[InviteCode]:
+            for ws in self.connections.sockets(InviteCode):
 
                 try:
-                    await ws.send_json(message)
+                    await send_message(ws, message)
 
                 except Exception as e:
                     logger.error(f"Failed to send game_started to connection: {e}")
@@ -294,27 +403,23 @@ class Websocket_service:
             "locations": lobby.locations,
             "guesses": {},
             "hp": {player_id: 6000 for player_id in lobby.users},
+            "started_at": int(time.time() * 1000),
         }
-        await r.setex(f"game:{InviteCode}", 3600, json.dumps(game))
+        await r.setex(f"game:{InviteCode}", 3600, dumps(game))
 
         message = {
             "type": "game_started",
             "hp": {player_id: 6000 for player_id in lobby.users},
             "timer": 240,
         }
-        for _, ws in self.connections[InviteCode]:
+        message = lobby_events.stamp(InviteCode, message)
+        for ws in self.connections.sockets(InviteCode):
             try:
-                await ws.send_json(message)
+                await send_message(ws, message)
             except Exception as e:
                 logger.error(f"Failed to send game_started to connection: {e}")
 
-        for ws in self.spectators.get(InviteCode, []):
-            try:
-                await ws.send_json(message)
-            except Exception as e:
-                logger.error(
-                    f"Failed to send game_started to spectators connection: {e}"
-                )
+        await spectator_hub.publish(InviteCode, message)
 
         logger.info(f"Game started for {InviteCode}")
 
@@ -334,7 +439,7 @@ class Websocket_service:
         locations_list = game["locations"]
         current_location = locations_list[currentRound]
 
-        lobby = await LobbyRepository.get_by_code(db, InviteCode)
+        lobby = await lobby_store.get_meta(db, InviteCode)
         if not lobby:
             return
 
@@ -346,24 +451,21 @@ class Websocket_service:
             "timer": lobby.timer,
             "RoundStartTime": int(time.time() * 1000),
         }
+        message = lobby_events.stamp(InviteCode, message)
 
         game["RoundsStartTime"] = int(time.time() * 1000)
-        await r.setex(f"game:{InviteCode}", 3600, json.dumps(game))
+        await r.setex(f"game:{InviteCode}", 3600, dumps(game))
+        await self._snapshot_round(InviteCode, game)
+        await demo_recorder.new_round(InviteCode, currentRound)
 
         if InviteCode in self.connections:
-            for _, ws in self.connections[InviteCode]:
+            for ws in self.connections.sockets(InviteCode):
                 try:
-                    await ws.send_json(message)
+                    await send_message(ws, message)
                 except Exception as e:
                     logger.error(f"Failed to send round_started to connection: {e}")
 
-            for ws in self.spectators.get(InviteCode, []):
-                try:
-                    await ws.send_json(message)
-                except Exception as e:
-                    logger.error(
-                        f"Failed to send round_started to spectators connection: {e}"
-                    )
+            await spectator_hub.publish(InviteCode, message)
 
         if InviteCode in self.timers:
             self.timers[InviteCode].cancel()
@@ -399,20 +501,21 @@ class Websocket_service:
             game["current_location_index"] += 1
 
             if game["current_location_index"] >= len(locations_list):
-                await r.setex(f"game:{InviteCode}", 3600, json.dumps(game))
+                await r.setex(f"game:{InviteCode}", 3600, dumps(game))
                 await self.clan_war_ended(db, InviteCode)
                 return
-            await r.setex(f"game:{InviteCode}", 3600, json.dumps(game))
+            await r.setex(f"game:{InviteCode}", 3600, dumps(game))
 
             message = {
                 "type": "round_ended",
                 "total_score": game.get("total_score", 0),
                 "round": current_index,
             }
+            message = lobby_events.stamp(InviteCode, message)
             if InviteCode in self.connections:
-                for _, ws in self.connections[InviteCode]:
+                for ws in self.connections.sockets(InviteCode):
                     try:
-                        await ws.send_json(message)
+                        await send_message(ws, message)
                     except Exception as e:
                         logger.error(f"Failed to send round_ended to connection: {e}")
             await asyncio.sleep(5)
@@ -435,15 +538,17 @@ class Websocket_service:
                     await self.GameEnded(db, InviteCode)
                     return
 
+            await self._snapshot_round(InviteCode, game)
             message = {
                 "type": "round_timedout",
                 "hp": game["hp"],
                 "num_guesses": num_guesses,
             }
+            message = lobby_events.stamp(InviteCode, message)
             if InviteCode in self.connections:
-                for _, ws in self.connections[InviteCode]:
+                for ws in self.connections.sockets(InviteCode):
                     try:
-                        await ws.send_json(message)
+                        await send_message(ws, message)
                     except Exception as e:
                         logger.error(
                             f"Failed to send round_timedout to connection: {e}"
@@ -454,7 +559,7 @@ class Websocket_service:
 
             game["ended_rounds"].append(current_index)
             game["current_location_index"] += 1
-            await r.setex(f"game:{InviteCode}", 3600, json.dumps(game))
+            await r.setex(f"game:{InviteCode}", 3600, dumps(game))
 
             await asyncio.sleep(5)
             await self.RoundStarted(db, InviteCode)
@@ -479,7 +584,7 @@ class Websocket_service:
         loser_id = loser_guess["player"]
 
         if loser_id not in game["hp"]:
-            lobby = await LobbyRepository.get_by_code(db, InviteCode)
+            lobby = await lobby_store.get_meta(db, InviteCode)
             if lobby:
                 game["hp"] = {player_id: 6000 for player_id in lobby.users}
             else:
@@ -492,6 +597,7 @@ class Websocket_service:
             await self.GameEnded(db, InviteCode)
             return
 
+        await self._snapshot_round(InviteCode, game)
         message = {
             "type": "round_ended",
             "winner": winner_guess["player"],
@@ -501,24 +607,19 @@ class Websocket_service:
             "lat": current_location["lat"],
             "lon": current_location["lon"],
         }
+        message = lobby_events.stamp(InviteCode, message)
 
         if InviteCode in self.connections:
-            for _, ws in self.connections[InviteCode]:
+            for ws in self.connections.sockets(InviteCode):
                 try:
-                    await ws.send_json(message)
+                    await send_message(ws, message)
                 except Exception as e:
                     logger.error(f"Failed to send round_ended to connection: {e}")
 
-            for ws in self.spectators.get(InviteCode, []):
-                try:
-                    await ws.send_json(message)
-                except Exception as e:
-                    logger.error(
-                        f"Failed to send round_ended to spectators connection: {e}"
-                    )
+            await spectator_hub.publish(InviteCode, message)
 
         game["current_location_index"] += 1
-        await r.setex(f"game:{InviteCode}", 3600, json.dumps(game))
+        await r.setex(f"game:{InviteCode}", 3600, dumps(game))
         await asyncio.sleep(5)
         await self.RoundStarted(db, InviteCode)
 
@@ -558,11 +659,12 @@ class Websocket_service:
                 total_distances[player] += guess["distance"]
 
         # --- вetermine winner ---
-        winner_id = max(game["hp"], key=lambda x: game["hp"][x])
+        # hp keys come back from redis json as strings
+        winner_id = int(max(game["hp"], key=lambda x: game["hp"][x]))
 
         # --- players info ---
         players = []
-        for user_id, _ in self.connections[InviteCode]:
+        for user_id in self.connections.user_ids(InviteCode):
             info = await self.user_GetInfo(db, user_id)
             players.append(info)
 
@@ -573,29 +675,28 @@ class Websocket_service:
             "total_distances": total_distances,
             "players": players,
         }
+        message = lobby_events.stamp(InviteCode, message)
         if InviteCode in self.connections:
-            for _, ws in self.connections[InviteCode]:
+            for ws in self.connections.sockets(InviteCode):
                 try:
-                    await ws.send_json(message)
+                    await send_message(ws, message)
                 except Exception as e:
                     logger.error(f"Failed to send game_ended to connection: {e}")
-            for ws in self.spectators.get(InviteCode, []):
-                try:
-                    await ws.send_json(message)
-                except Exception as e:
-                    logger.error(
-                        f"Failed to send game_ended to spectators connection: {e}"
-                    )
+            await spectator_hub.publish(InviteCode, message)
 
         # --- xp rewards ---
-        player_ids = [login for login, _ in self.connections[InviteCode]]
+        player_ids = self.connections.user_ids(InviteCode)
+        participants = [int(player_id) for player_id in game["hp"]]
 
-        result = await db.execute(select(User).where(User.id.in_(player_ids)))
+        result = await db.execute(
+            select(User).where(User.id.in_(set(player_ids) | set(participants)))
+        )
         users = {user.id: user for user in result.scalars().all()}
 
         old_ranks = {
             user_id: users[user_id].rank for user_id in player_ids if user_id in users
         }
+        old_mmr = {user_id: user.mmr for user_id, user in users.items()}
 
         if winner_id and len(player_ids) == 2:
             loser_id = [pid for pid in player_ids if pid != winner_id][0]
@@ -615,6 +716,20 @@ class Websocket_service:
 
                 loser.mmr = max(loser.mmr, 0)
 
+        # --- match history ---
+        for user_id in participants:
+            user = users.get(user_id)
+            if not user:
+                continue
+            user.games_played += 1
+            if user_id == winner_id:
+                user.games_won += 1
+            else:
+                user.games_lost += 1
+
+        await self.save_match_history(
+            db, InviteCode, game, participants, winner_id, users, old_mmr
+        )
         await db.commit()
 
         # --- rank up check ---
@@ -639,10 +754,10 @@ class Websocket_service:
                 )
 
         if rank_ups and InviteCode in self.connections:
-            message_rank = {"type": "rank_up", "rank_ups": rank_ups}
-            for _, ws in self.connections[InviteCode]:
+            message_rank = lobby_events.stamp(InviteCode, {"type": "rank_up", "rank_ups": rank_ups})
+            for ws in self.connections.sockets(InviteCode):
                 try:
-                    await ws.send_json(message_rank)
+                    await send_message(ws, message_rank)
                 except Exception as e:
                     logger.error(f"Failed to send rank_up to connection: {e}")
 
@@ -676,14 +791,88 @@ class Websocket_service:
                 user.country_stats = stats
                 await db.commit()
 
+        # --- anticheat ---
+        try:
+            await anticheat.analyze_match(InviteCode, game)
+        except Exception as e:
+            logger.error(f"Anticheat analysis failed for {InviteCode}: {e}")
+
         # --- cleanup ---
         await asyncio.sleep(0.5)
-        await r.delete(f"game:{InviteCode}")
-        await LobbyRepository.delete(db, InviteCode)
-        await r.expire(f"spectate:{InviteCode}", 3600)
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.delete(f"game:{InviteCode}")
+            await demo_recorder.expire(InviteCode, 3600, pipe)
+            await pipe.execute()
+        lobby_events.drop(InviteCode)
+        spectator_hub.forget(InviteCode)
+        await lobby_store.delete(db, InviteCode)
 
         logger.info(f"Game ended for {InviteCode}")
 
+    async def save_match_history(
+        self,
+        db: AsyncSession,
+        InviteCode: str,
+        game: dict,
+        participants: list[int],
+        winner_id: int,
+        users: dict,
+        old_mmr: dict,
+    ):
+        started_at = game.get("started_at")
+        ended_at = datetime.now()
+
+        matches = []
+        for user_id in participants:
+            rounds = []
+            for round_num, guesses in game["guesses"].items():
+                for guess in guesses:
+                    if guess["player"] != user_id:
+                        continue
+                    points = guess.get("points")
+                    if points is None:
+                        points = await locat.calculate_points(guess["distance"])
+                    rounds.append(
+                        {
+                            "round": int(round_num),
+                            "distance": guess["distance"],
+                            "points": points,
+                            "lat": guess.get("lat"),
+                            "lon": guess.get("lon"),
+                            "country": guess.get("country"),
+                        }
+                    )
+
+            user = users.get(user_id)
+            matches.append(
+                {
+                    "invite_code": InviteCode,
+                    "user_id": user_id,
+                    "opponent_id": next(
+                        (pid for pid in participants if pid != user_id), None
+                    ),
+                    "mode": game.get("mode"),
+                    "won": user_id == winner_id,
+                    "mmr_delta": (user.mmr - old_mmr[user_id]) if user else 0,
+                    "rounds_played": len(rounds),
+                    "total_points": sum(rd["points"] for rd in rounds),
+                    "total_distance": sum(rd["distance"] for rd in rounds),
+                    "started_at": (
+                        datetime.fromtimestamp(started_at / 1000) if started_at else None
+                    ),
+                    "ended_at": ended_at,
+                    "rounds": rounds,
+                }
+            )
+
+        # savepoint: the mmr/games updates are flushed before it, so a failed insert
+        # only loses the history rows and the caller still commits the stats
+        try:
+            async with db.begin_nested():
+                await MatchRepository.create_many(db, matches)
+        except Exception as e:
+            logger.error(f"Failed to save match history for {InviteCode}: {e}")
+
     async def submitGuess(
         self, db: AsyncSession, user_id: int, lobbycode: str, lat: float, lon: float
     ):
@@ -715,6 +904,7 @@ class Websocket_service:
         lon_cur = current_location["lon"]
 
         distance = locat.haversine_m(lat, lon, lat_cur, lon_cur)
+        now = int(time.time() * 1000)
 
         game["guesses"][current_index_str].append(
             {
@@ -723,15 +913,16 @@ class Websocket_service:
                 "lat": lat,
                 "lon": lon,
                 "country": current_location["country"],
+                "time": now - game.get("RoundsStartTime", now),
             }
         )
-        await r.setex(f"game:{lobbycode}", 3600, json.dumps(game))
+        await r.setex(f"game:{lobbycode}", 3600, dumps(game))
 
-        message = {"type": "player_guessed", "player": user_id}
+        message = lobby_events.stamp(lobbycode, {"type": "player_guessed", "player": user_id})
         if lobbycode in self.connections:
-            for _, ws in self.connections[lobbycode]:
+            for ws in self.connections.sockets(lobbycode):
                 try:
-                    await ws.send_json(message)
+                    await send_message(ws, message)
                 except Exception as e:
                     logger.error(f"Failed to send player_guessed to connection: {e}")
 
@@ -754,24 +945,48 @@ class Websocket_service:
         await self.RoundEnded(db, lobbycode)
 
     async def reconect(
-        self, db: AsyncSession, user_id: int, inviteCode: str, ws: WebSocket
+        self,
+        db: AsyncSession,
+        user_id: int,
+        inviteCode: str,
+        ws: WebSocket,
+        last_seq: int | None = None,
     ):
         if inviteCode not in self.connections:
             raise HTTPException(status_code=404, detail="InviteCode not found")
 
         await r.delete(f"disconnect:{inviteCode}:{user_id}")
 
-        self.connections[inviteCode] = [
-            (l, old_ws) for l, old_ws in self.connections[inviteCode] if l != user_id
-        ]
-        self.connections[inviteCode].append((user_id, ws))
-
-        lobby = await LobbyRepository.get_by_code(db, inviteCode)
+        lobby = await lobby_store.get_meta(db, inviteCode)
         if not lobby:
             raise HTTPException(status_code=404, detail="InviteCode not found")
 
+        self.connections.add(inviteCode, user_id, ws)
+        try:
+            resumed = await self._replay(inviteCode, ws, last_seq, lobby_events.current(inviteCode))
+        except Exception as e:
+            logger.error(f"Failed to replay events to {user_id} in {inviteCode}: {e}")
+            resumed = False
+
+        if not resumed:
+            await self._send_snapshot(db, user_id, inviteCode, ws, lobby)
+
+        message = lobby_events.stamp(inviteCode, {"type": "player_reconnected", "player": user_id})
+        for login_p, ws_p in self.connections.items(inviteCode):
+            if login_p != user_id:
+                try:
+                    await send_message(ws_p, message)
+                except Exception as e:
+                    logger.error(f"Failed to send player_reconnected to {login_p}: {e}")
+
+        logger.info(f"Player {user_id} reconnected to {inviteCode} ({'resumed' if resumed else 'snapshot'})")
+
+    async def _send_snapshot(
+        self, db: AsyncSession, user_id: int, inviteCode: str, ws: WebSocket, lobby
+    ):
         message = {
             "type": "reconnect_succes",
+            "seq": lobby_events.current(inviteCode),
             "host": lobby.host_id,
         }
 
@@ -803,22 +1018,11 @@ class Websocket_service:
                 ]
 
         message["players"] = []
-        for user_id, _ in self.connections[inviteCode]:
-            info = await self.user_GetInfo(db, user_id)
+        for uid in self.connections.user_ids(inviteCode):
+            info = await self.user_GetInfo(db, uid)
             message["players"].append(info)
 
-        await ws.send_json(message)
-
-        for login_p, ws_p in self.connections[inviteCode]:
-            if login_p != user_id:
-                try:
-                    await ws_p.send_json(
-                        {"type": "player_reconnected", "player": user_id}
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to send player_reconnected to {login_p}: {e}")
-
-        logger.info(f"Player {user_id} reconnected to {inviteCode}")
+        await send_message(ws, message)
 
     async def clan_war_ended(self, db: AsyncSession, lobbycode: str):
         game = await self._get_game(lobbycode)
@@ -829,13 +1033,18 @@ class Websocket_service:
         total_score = game.get("total_score", 0)
 
         await ClanWarService.submit_score(db, war_id, user_id, total_score)
-        await r.delete(f"game:{lobbycode}")
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.delete(f"game:{lobbycode}")
+            await demo_recorder.expire(lobbycode, 3600, pipe)
+            await pipe.execute()
+        lobby_events.drop(lobbycode)
+        spectator_hub.forget(lobbycode)
 
     # --- spectate ---
 
     async def camera_update(self, lobby_code: str, data: dict, num_player: int) -> None:
-        await r.rpush(f"spectate:{lobby_code}", json.dumps(data))  # type: ignore
-        if lobby_code not in self.spectators:
+        await demo_recorder.record(lobby_code, data, num_player)
+        if not await spectator_hub.has_viewers(lobby_code):
             return
         message = {
             "type": "spectate",
@@ -848,26 +1057,18 @@ class Websocket_service:
             message["lat"] = data.get("lat")
         if data.get("lng") is not None:
             message["lng"] = data.get("lng")
-        for ws in self.spectators[lobby_code]:
-            try:
-                await ws.send_json(message)
-            except Exception:
-                pass
+        await spectator_hub.publish(lobby_code, message)
 
-    async def guess_preview(self, data: dict, lobby_code: str):
-        if lobby_code not in self.spectators:
+    async def guess_preview(self, data: dict, lobby_code: str, num_player: int):
+        if not await spectator_hub.has_viewers(lobby_code):
             return
         message = {
             "type": "guess_preview",
             "lat": data.get("lat"),
             "lng": data.get("lng"),
-            "num_player": data.get("num_player"),
+            "num_player": num_player,
         }
-        for ws in self.spectators[lobby_code]:
-            try:
-                await ws.send_json(message)
-            except Exception:
-                pass
+        await spectator_hub.publish(lobby_code, message)
 
     async def tab_visibility(
         self,
@@ -890,14 +1091,17 @@ class Websocket_service:
             async def _kick_after_delay():
                 try:
                     for remaining in range(10, 0, -1):
-                        msg = {
-                            "type": "tab_away_countdown",
-                            "player": user_id,
-                            "remaining": remaining,
-                        }
-                        for _, ws in self.connections.get(lobby_code, []):
+                        msg = lobby_events.stamp(
+                            lobby_code,
+                            {
+                                "type": "tab_away_countdown",
+                                "player": user_id,
+                                "remaining": remaining,
+                            },
+                        )
+                        for ws in self.connections.sockets(lobby_code):
                             try:
-                                await ws.send_json(msg)
+                                await send_message(ws, msg)
                             except Exception:
                                 pass
 
@@ -905,7 +1109,7 @@ class Websocket_service:
 
                     self.tab_timers.pop(key, None)
                     try:
-                        await websocket.send_json({"type": "kicked", "reason": "tab_away"})
+                        await send_message(websocket, {"type": "kicked", "reason": "tab_away"})
                     except Exception:
                         pass
                     await self.player_left(db, user_id, lobby_code, websocket)
@@ -923,25 +1127,30 @@ class Websocket_service:
             if task and not task.done():
                 task.cancel()
 
-                msg = {
-                    "type": "tab_away_cancelled",
-                    "player": user_id,
-                }
-                for _, ws in self.connections.get(lobby_code, []):
+                msg = lobby_events.stamp(
+                    lobby_code,
+                    {
+                        "type": "tab_away_cancelled",
+                        "player": user_id,
+                    },
+                )
+                for ws in self.connections.sockets(lobby_code):
                     try:
-                        await ws.send_json(msg)
+                        await send_message(ws, msg)
                     except Exception:
                         pass
 
     async def report(self, db: AsyncSession, report: dict):
-        frames = await r.lrange(f"spectate:{report['lobby_code']}", 0, -1)  # type: ignore
-        if not frames:
+        segments = await demo_recorder.segments(
+            report["lobby_code"],
+            int(report["suspect_id"]),
+            [int(i) for i in report["rounds"]] if report.get("rounds") else None,
+        )
+        if not segments:
             logger.warning(
                 f"No demo found for lobby {report['lobby_code']} saving report without demo"
             )
-            demo = []
-        else:
-            demo = [json.loads(f) for f in frames]
+        demo = pack_demo(segments)
 
         logger.info(f"Report received: {report}")
         return await ReportRepository.create(
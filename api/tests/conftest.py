@@ -22,6 +22,9 @@ from utils.dependencies import Dependies
 from database.database import get_db
 from models.clans import Clans
 from config import config
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from pathlib import Path
 
 if not config.DATABASE_URL:
     raise ValueError("DATABASE_URL is not set")
@@ -127,6 +130,21 @@ def mock_google_oauth(monkeypatch):
     monkeypatch.setattr(GoogleOAuthProvider, "get_user_data", mock_get_user_data)
     yield
 
+@pytest_asyncio.fixture
+async def oauth_stub(monkeypatch):
+    from tests.oauth_stub import stub
+    from providers.http_client import oauth_http
+
+    stub.state.failures = {}
+    stub.state.calls = {"token": 0, "userinfo": 0}
+    monkeypatch.setattr(config, "GOOGLE_TOKEN_URL", "http://oauth-stub/token")
+    monkeypatch.setattr(config, "GOOGLE_USERINFO_URL", "http://oauth-stub/userinfo")
+    monkeypatch.setattr(config, "OAUTH_BACKOFF", 0)
+    oauth_http.use_transport(ASGITransport(app=stub))
+    yield stub
+    await oauth_http.close()
+    oauth_http.use_transport(None)
+
 @pytest_asyncio.fixture
 async def mock_telegram_oauth(monkeypatch):
     async def mock_success_login(self,code: str,user_id: int):
@@ -140,12 +158,21 @@ async def mock_telegram_oauth(monkeypatch):
 
 @pytest_asyncio.fixture
 async def redis_client(monkeypatch):
-    from fakeredis import FakeAsyncRedis
-    fake = FakeAsyncRedis(decode_responses=True)
+    from fakeredis import FakeAsyncRedis, FakeServer
+    server = FakeServer()
+    fake = FakeAsyncRedis(server=server, decode_responses=True)
+    fake_bin = FakeAsyncRedis(server=server)
     monkeypatch.setattr("routers.profile_router.r", fake)
     monkeypatch.setattr("utils.rate_limiter.r", fake)
     monkeypatch.setattr("services.websocket_service.r", fake)
     monkeypatch.setattr("routers.websocket_router.r", fake)
+    monkeypatch.setattr("services.demo_service.r_bin", fake_bin)
+    monkeypatch.setattr("services.anticheat_service.r", fake)
+    monkeypatch.setattr("cache.auth_cache.r", fake)
+    monkeypatch.setattr("cache.ban_registry.r", fake)
+    monkeypatch.setattr("services.spectator_relay.r", fake)
+    monkeypatch.setattr("cache.lobby_cache.r", fake)
+    monkeypatch.setattr("repositories.lobby_store.r", fake)
     yield fake
 
 @pytest_asyncio.fixture
@@ -261,4 +288,29 @@ async def clan_invite(db_session, clan, regular_user):
     )
     db_session.add(invite)
     await db_session.commit()
-    yield invite
\ No newline at end of file
+    yield invite
+
+
+def alembic_upgrade(connection, revision: str = "head") -> None:
+    alembic_config = AlembicConfig()
+    alembic_config.set_main_option("script_location", str(Path(__file__).resolve().parent.parent / "alembic"))
+    alembic_config.attributes["connection"] = connection
+    command.upgrade(alembic_config, revision)
+
+
+@pytest_asyncio.fixture
+async def pg_conn():
+    # everything happens in one transaction that is rolled back, the test db is left untouched
+    url = config.DATABASE_URL.replace("@db:", "@localhost:").replace(":5432/", ":5433/")
+    engine = create_async_engine(url, connect_args={"ssl": False}, poolclass=NullPool)
+    try:
+        conn = await engine.connect()
+    except Exception as e:
+        await engine.dispose()
+        pytest.skip(f"no local postgres: {e}")
+
+    transaction = await conn.begin()
+    yield conn
+    await transaction.rollback()
+    await conn.close()
+    await engine.dispose()
@@ -0,0 +1,35 @@
+from fastapi import FastAPI, Form, Header, Response
+
+# stands in for accounts.google.com in tests and benchmarks/oauth_login.py
+stub = FastAPI()
+stub.state.failures = {}
+stub.state.calls = {"token": 0, "userinfo": 0}
+
+
+def fail(name: str, response: Response) -> bool:
+    remaining = stub.state.failures.get(name, 0)
+    if remaining:
+        stub.state.failures[name] = remaining - 1
+        response.status_code = 503
+        return True
+    return False
+
+
+@stub.post("/token")
+async def token(response: Response, code: str = Form(...)):
+    stub.state.calls["token"] += 1
+    if fail("token", response):
+        return {"error": "temporarily_unavailable"}
+    if code == "bad_code":
+        response.status_code = 400
+        return {"error": "invalid_grant"}
+    return {"access_token": f"access_{code}", "token_type": "Bearer", "expires_in": 3599}
+
+
+@stub.get("/userinfo")
+async def userinfo(response: Response, authorization: str = Header(...)):
+    stub.state.calls["userinfo"] += 1
+    if fail("userinfo", response):
+        return {"error": "temporarily_unavailable"}
+    code = authorization.removeprefix("Bearer access_")
+    return {"id": f"stub_{code}", "email": f"{code}@example.com", "name": f"Stub {code}"}
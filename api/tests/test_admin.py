@@ -41,4 +41,81 @@ async def test_ban_user_with_reason(client, regular_user_admin, regular_user, re
 async def test_update_user_role_to_admin(client, regular_user_admin, regular_user):
     client.cookies.set("access_token", regular_user_admin["token"])
     response = await client.patch(f"/admin/users/{regular_user['user'].id}/role", json={"role": "admin"})
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+@pytest.mark.asyncio
+async def test_ban_registry_propagates_between_workers(redis_client):
+    from datetime import datetime, timedelta
+    from cache.ban_registry import BanRegistry
+
+    admin_worker, other_worker = BanRegistry(), BanRegistry()
+    await admin_worker.add(42, "cheating", datetime.now() + timedelta(days=1))
+
+    assert other_worker.get(42) is None
+    await other_worker.sync()
+    assert other_worker.get(42)[0] == "cheating"
+
+    await admin_worker.remove(42)
+    await other_worker.sync()
+    assert other_worker.get(42) is None
+
+    await admin_worker.add(43, "expired", datetime.now() - timedelta(minutes=1))
+    assert admin_worker.get(43) is None
+
+
+def ban_rows(*bans):
+    from unittest.mock import AsyncMock, MagicMock
+
+    db = AsyncMock()
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = list(bans)
+    db.execute.return_value = result
+    return db
+
+
+@pytest.mark.asyncio
+async def test_ban_registry_seeds_only_an_empty_redis(redis_client):
+    from types import SimpleNamespace
+    from cache.ban_registry import BanRegistry
+
+    worker = BanRegistry()
+    db = ban_rows(SimpleNamespace(user_id=7, reason="old", banned_until=None))
+    assert await worker.load(db)
+    await worker.sync()
+    assert worker.get(7)[0] == "old"
+
+    # an unban after the seed must survive the next worker booting with the same snapshot
+    await worker.remove(7)
+    assert not await BanRegistry().load(db)
+    await worker.sync()
+    assert worker.get(7) is None
+
+
+@pytest.mark.asyncio
+async def test_ban_registry_seed_yields_to_live_writes(redis_client):
+    from types import SimpleNamespace
+    from cache.ban_registry import BanRegistry
+
+    seeder, admin_worker = BanRegistry(), BanRegistry()
+    db = ban_rows(SimpleNamespace(user_id=8, reason="stale", banned_until=None))
+    snapshot = db.execute.return_value
+
+    async def ban_during_select(*args, **kwargs):
+        await admin_worker.add(9, "live", None)
+        return snapshot
+
+    db.execute.side_effect = ban_during_select
+    assert not await seeder.load(db)
+    await seeder.sync()
+    assert seeder.get(9)[0] == "live"
+    assert seeder.get(8) is None
+
+
+@pytest.mark.asyncio
+async def test_only_one_ban_sweeper(redis_client):
+    from cache.ban_registry import BanRegistry
+
+    first, second = BanRegistry(), BanRegistry()
+    assert await first.is_sweeper()
+    assert not await second.is_sweeper()
+    assert await first.is_sweeper()
+
@@ -0,0 +1,70 @@
+import json
+import pytest
+from services.anticheat_service import AntiCheat
+from utils.demo_codec import DemoEncoder
+
+
+def honest_round(i):
+    return {"player": 1, "distance": 300_000 + i * 10_000, "time": 45_000 + i * 1000}
+
+
+def cheater_round(i):
+    return {"player": 2, "distance": 40 + i, "time": 4_000}
+
+
+def test_anticheat_ranks_fast_perfect_guesser_higher():
+    guesses = {1: [honest_round(i) for i in range(5)], 2: [cheater_round(i) for i in range(5)]}
+    frames = {
+        1: [{"heading": (i * 7) % 360} for i in range(500)],
+        2: [{"heading": 90.0} for _ in range(20)],
+    }
+    players, matrix = AntiCheat.features(guesses, frames)
+    scores = AntiCheat.score(matrix)
+
+    assert players == [1, 2]
+    assert scores[1] > scores[0]
+    assert matrix[1, 1] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_anticheat_queue(redis_client):
+    from services.demo_service import demo_recorder
+
+    for i in range(20):
+        await demo_recorder.record("acode", {"heading": 90, "pitch": 0, "zoom": 1}, 2)
+
+    game = {
+        "hp": {"1": 6000, "2": 6000},
+        "guesses": {"0": [honest_round(0), cheater_round(0)], "1": [honest_round(1), cheater_round(1)]},
+    }
+    await AntiCheat.analyze_match("acode", game)
+
+    suspects, total = await AntiCheat.get_queue(0, 10)
+    assert total == 2
+    assert suspects[0]["user_id"] == 2
+    assert suspects[0]["lobby_code"] == "acode"
+
+    assert await AntiCheat.dismiss(2)
+    _, total = await AntiCheat.get_queue(0, 10)
+    assert total == 1
+
+
+@pytest.mark.asyncio
+async def test_anticheat_ignores_forged_opponent_frames(redis_client):
+    from services.websocket_service import ws_service
+
+    # player 2 claims to be player 1 and floods a static camera into their demo
+    for _ in range(20):
+        await ws_service.camera_update("fcode", {"heading": 90, "pitch": 0, "zoom": 1, "num_player": 1}, 2)
+
+    game = {
+        "hp": {"1": 6000, "2": 6000},
+        "guesses": {"0": [honest_round(0), cheater_round(0)], "1": [honest_round(1), cheater_round(1)]},
+    }
+    scores = await AntiCheat.analyze_match("fcode", game)
+
+    suspects, _ = await AntiCheat.get_queue(0, 10)
+    assert suspects[0]["user_id"] == 2
+    assert scores[2] > scores[1]
+    features = json.loads(await redis_client.hget("anticheat:match:1:fcode", "features"))
+    assert features["camera_frames_per_round"] == 0
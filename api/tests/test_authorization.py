@@ -30,3 +30,28 @@ async def test_refresh_token_success(client, regular_user):
     response = await client.post("/auth/refresh")
     assert response.status_code == 200
     assert "access_token" in response.json()
+
+@pytest.mark.asyncio
+async def test_auth_cache_skips_db_until_invalidated(client, regular_user, redis_client, monkeypatch):
+    from cache.auth_cache import auth_cache
+    from repositories.user_repository import UserRepository
+
+    client.cookies.set("access_token", regular_user["token"])
+    response = await client.get("/profile/me")
+    assert response.status_code == 200
+
+    calls = []
+    get_by_id = UserRepository.get_by_id
+
+    async def counting_get_by_id(db, user_id):
+        calls.append(user_id)
+        return await get_by_id(db, user_id)
+
+    monkeypatch.setattr(UserRepository, "get_by_id", counting_get_by_id)
+    await client.get("/profile/avatar")
+    assert calls == [regular_user["user"].id]  # only the handler's own lookup
+
+    await auth_cache.invalidate(regular_user["user"].id)
+    calls.clear()
+    await client.get("/profile/avatar")
+    assert len(calls) == 2
@@ -0,0 +1,69 @@
+import pytest
+import redis.asyncio as redis
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeConnection
+from cache.redis import InstrumentedRedis
+from core.metrics import redis_command_duration
+
+
+def observed(command: str) -> float:
+    return sum(b.get() for b in redis_command_duration.labels(command)._buckets)
+
+
+@pytest.fixture
+def instrumented():
+    pool = redis.ConnectionPool(
+        connection_class=FakeConnection, server=FakeServer(), decode_responses=True
+    )
+    return InstrumentedRedis(connection_pool=pool)
+
+
+@pytest.mark.asyncio
+async def test_commands_are_timed(instrumented):
+    before = observed("SET")
+    await instrumented.set("key", "value")
+
+    assert await instrumented.get("key") == "value"
+    assert observed("SET") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_pipeline_is_one_observation(instrumented):
+    before_multi = observed("MULTI")
+    before_incr = observed("INCR")
+
+    async with instrumented.pipeline(transaction=True) as pipe:
+        pipe.incr("counter")
+        pipe.expire("counter", 60, nx=True)
+        pipe.incr("counter")
+        count, _, count_again = await pipe.execute()
+
+    assert (count, count_again) == (1, 2)
+    assert 0 < await instrumented.ttl("counter") <= 60
+    assert observed("MULTI") == before_multi + 1
+    assert observed("INCR") == before_incr
+
+
+@pytest.mark.asyncio
+async def test_lobby_cache_write_through(redis_client):
+    from types import SimpleNamespace
+    from cache.lobby_cache import LobbyCache
+
+    lobby = SimpleNamespace(invite_code="code", host_id=1, timer=240, users=[1], mode=None, war_id=None, id=3)
+    cache, peer = LobbyCache(ttl=30), LobbyCache(ttl=30)
+
+    assert await cache.get("code") is None
+    await cache.fill(lobby)
+    assert (await peer.get("code")).users == [1]
+
+    lobby.users = [1, 2]
+    await cache.set(lobby)
+    # the peer still holds its local copy until the invalidation reaches it
+    assert (await peer.get("code")).users == [1]
+    peer.entries.pop("code")
+    assert (await peer.get("code")).to_dict() == {
+        "invite_code": "code", "host_id": 1, "timer": 240, "users": [1, 2], "mode": None, "war_id": None, "id": 3
+    }
+
+    await cache.invalidate("code")
+    assert await cache.get("code") is None
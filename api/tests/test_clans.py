@@ -93,3 +93,15 @@ async def test_kick_member_as_admin(client, high_xp_user, clan, db_session):
     client.cookies.set("access_token", high_xp_user["token"])
     response = await client.delete(f"/clans/kick/{victim.id}")
     assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_clan_routes_with_cached_principal(client, regular_user, clan):
+    # the second request is authenticated from the principal cache, which has no clan fields
+    client.cookies.set("access_token", regular_user["token"])
+    for _ in range(2):
+        response = await client.post("/clans/invite")
+        assert response.status_code == 200
+    response = await client.get("/clans")
+    assert response.status_code == 200
+    assert response.json()["id"] == clan.id
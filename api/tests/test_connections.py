@@ -0,0 +1,51 @@
+import pytest
+from unittest.mock import AsyncMock
+from services.connection_registry import ConnectionRegistry
+from utils.serializer import dumps
+
+
+def test_registry_indexes():
+    registry = ConnectionRegistry()
+    ws_1, ws_2, ws_3 = object(), object(), object()
+
+    registry.add("a", 1, ws_1)
+    registry.add("a", 2, ws_2)
+    registry.add("b", 1, ws_3)
+
+    assert "a" in registry and "c" not in registry
+    assert registry.user_ids("a") == [1, 2]
+    assert registry.lobbies_of(1) == {"a", "b"}
+    assert registry.get("a", 2).role == "player"
+
+    # a stale socket can't remove the user's newer connection
+    new_ws = object()
+    registry.add("a", 1, new_ws)
+    assert registry.remove("a", ws_1) is None
+    assert registry.sockets("a") == [new_ws, ws_2]
+
+    assert registry.remove("a", new_ws).user_id == 1
+    assert registry.lobbies_of(1) == {"b"}
+    assert registry.count("a") == 1
+
+    registry.drop_lobby("a")
+    assert "a" not in registry
+    assert registry.lobbies_of(2) == set()
+
+
+@pytest.mark.asyncio
+async def test_active_lobbies(redis_client, monkeypatch):
+    from services.websocket_service import ws_service
+
+    registry = ConnectionRegistry()
+    registry.add("ingame", 1, AsyncMock())
+    registry.add("waiting", 1, AsyncMock())
+    registry.add("other", 2, AsyncMock())
+    monkeypatch.setattr(ws_service, "connections", registry)
+    await redis_client.set("game:ingame", dumps({"current_location_index": 2, "hp": {"1": 4000}}))
+
+    lobbies = await ws_service.get_active_lobbies(1)
+
+    assert lobbies == [
+        {"InviteCode": "ingame", "ingame": True, "current_location_index": 2, "hp": {"1": 4000}},
+        {"InviteCode": "waiting", "ingame": False},
+    ]
@@ -0,0 +1,147 @@
+import json
+import pytest
+from unittest.mock import AsyncMock
+from utils.demo_codec import DemoEncoder, decode_segment, pack_demo, unpack_demo
+
+
+def make_frames(n):
+    frames = []
+    for i in range(n):
+        frame = {"heading": (350 + i * 0.7) % 360, "pitch": -5 + i * 0.05, "zoom": 1.0, "num_player": 7}
+        if i % 3 == 0:
+            frame["lat"] = 48.856613 + i * 0.00001
+            frame["lng"] = 2.352222
+        frames.append(frame)
+    return frames
+
+
+def test_demo_segment_roundtrip():
+    frames = make_frames(200)
+    encoder = DemoEncoder(7, 1_000)
+    for i, frame in enumerate(frames):
+        encoder.add(frame, 1_000 + i * 50)
+
+    decoded = decode_segment(encoder.to_bytes())
+    assert len(decoded) == len(frames)
+    for original, frame in zip(frames, decoded):
+        assert frame["num_player"] == 7
+        assert abs((frame["heading"] - original["heading"] + 180) % 360 - 180) < 0.01
+        assert abs(frame["pitch"] - original["pitch"]) < 0.01
+        assert ("lat" in frame) == ("lat" in original)
+        if "lat" in original:
+            assert abs(frame["lat"] - original["lat"]) < 1e-6
+    assert decoded[-1]["t"] == 1_000 + 199 * 50
+
+
+def test_demo_segment_long_gaps():
+    encoder = DemoEncoder(7, 0)
+    times = [0, 100, 70_100, 70_200, 70_200 + 3_600_000]
+    for ts, frame in zip(times, make_frames(len(times))):
+        encoder.add(frame, ts)
+    assert [f["t"] for f in decode_segment(encoder.to_bytes())] == times
+
+
+def test_demo_segment_is_compact():
+    frames = make_frames(200)
+    encoder = DemoEncoder(7, 0)
+    for i, frame in enumerate(frames):
+        encoder.add(frame, i * 50)
+
+    raw = sum(len(json.dumps({"type": "spectate", **f})) for f in frames)
+    assert raw / len(encoder.to_bytes()) >= 10
+
+
+def test_unpack_demo_legacy_and_packed():
+    legacy = [{"heading": 1, "pitch": 2, "zoom": 1, "num_player": 3}]
+    assert unpack_demo(legacy) == legacy
+
+    encoder = DemoEncoder(3, 0)
+    encoder.add(legacy[0], 0)
+    assert unpack_demo(pack_demo([encoder.to_bytes()]))[0]["heading"] == 1
+
+
+@pytest.mark.asyncio
+async def test_demo_recorder_segments(redis_client):
+    from services.demo_service import DemoRecorder
+
+    recorder = DemoRecorder()
+    await recorder.new_round("code", 0)
+    for frame in make_frames(5):
+        await recorder.record("code", frame, 7)
+        await recorder.record("code", frame, 8)
+    await recorder.new_round("code", 1)
+    for frame in make_frames(3):
+        await recorder.record("code", frame, 7)
+
+    segments = await recorder.segments("code", 7)
+    assert [len(decode_segment(s)) for s in segments] == [5, 3]
+
+    segments = await recorder.segments("code", 7, rounds=[1])
+    assert [decode_segment(s)[0]["num_player"] for s in segments] == [7]
+    assert len(decode_segment(segments[0])) == 3
+
+    async with redis_client.pipeline(transaction=False) as pipe:
+        await recorder.expire("code", 60, pipe)
+        assert await redis_client.ttl("demo:code:8") == -1
+        await pipe.execute()
+    assert await redis_client.ttl("demo:code:8") > 0
+    assert await redis_client.ttl("demo:code:players") > 0
+
+
+@pytest.mark.asyncio
+async def test_spectate_frames_keep_sender_id(redis_client, monkeypatch):
+    from services.websocket_service import ws_service
+    from services.demo_service import demo_recorder
+    from services.spectator_relay import spectator_hub
+
+    viewer = AsyncMock()
+    monkeypatch.setitem(spectator_hub.spectators, "fcode", [viewer])
+
+    await ws_service.camera_update("fcode", {"heading": 90, "pitch": 0, "zoom": 1, "num_player": 7}, 8)
+
+    assert await demo_recorder.segments("fcode", 7) == []
+    assert decode_segment((await demo_recorder.segments("fcode", 8))[0])[0]["num_player"] == 8
+    assert json.loads(viewer.send_text.call_args.args[0])["num_player"] == 8
+
+
+@pytest.mark.asyncio
+async def test_clan_war_end_expires_demo(redis_client, monkeypatch):
+    from services.websocket_service import ws_service
+    from services import websocket_service
+
+    monkeypatch.setattr(websocket_service.ClanWarService, "submit_score", AsyncMock())
+    await redis_client.set("game:wcode", json.dumps({"war_id": 1, "user_id": 7, "total_score": 100}))
+    await ws_service.camera_update("wcode", {"heading": 90, "pitch": 0, "zoom": 1}, 7)
+
+    await ws_service.clan_war_ended(None, "wcode")
+
+    assert await redis_client.exists("game:wcode") == 0
+    assert await redis_client.ttl("demo:wcode:7") > 0
+    assert ("wcode", 7) not in websocket_service.demo_recorder.encoders
+
+
+def test_demo_playback_window(monkeypatch):
+    from services.demo_service import DemoPlayback
+
+    segments = []
+    for player in (1, 2):
+        for part in range(2):
+            encoder = DemoEncoder(player, part * 1000)
+            for i in range(10):
+                encoder.add({"heading": i, "pitch": 0, "zoom": 1}, part * 1000 + i * 100)
+            segments.append(encoder.to_bytes())
+    demo = pack_demo(segments)
+
+    frames = [json.loads(line) for line in DemoPlayback.ndjson(demo, start=500, window=1000, num_player=2)]
+    assert [f["offset"] for f in frames] == list(range(500, 1500, 100))
+    assert all(f["num_player"] == 2 for f in frames)
+
+    # the report view only reads headers plus the last segment of each player
+    from services import demo_service
+    decoded = []
+    real_decode = demo_service.decode_segment
+    monkeypatch.setattr(demo_service, "decode_segment", lambda data: decoded.append(data) or real_decode(data))
+    summary = DemoPlayback.summary(demo)
+    assert summary["frames"] == 40
+    assert summary["duration"] == 1900
+    assert len(decoded) == 2
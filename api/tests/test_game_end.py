@@ -0,0 +1,70 @@
+import pytest
+from unittest.mock import AsyncMock
+from sqlalchemy import select
+from models.user import User
+from models.matches import Match, MatchRound
+from utils.serializer import dumps_text
+
+
+async def start_game(redis_client, db_session, code: str):
+    from services.websocket_service import ws_service
+
+    winner = User(username="winner", google_id="winner_gid", name="winner")
+    loser = User(username="loser", google_id="loser_gid", name="loser")
+    db_session.add_all([winner, loser])
+    await db_session.commit()
+
+    game = {
+        "locations": [{"lat": 1, "lon": 2, "url": "x"}],
+        "current_location_index": 0,
+        "hp": {str(winner.id): 6000, str(loser.id): 4000},
+        "guesses": {
+            "0": [
+                {"player": winner.id, "distance": 10, "points": 4990, "lat": 1, "lon": 2, "country": "FR"},
+                {"player": loser.id, "distance": 3000, "points": 1200, "lat": 5, "lon": 6, "country": "DE"},
+            ]
+        },
+        "started_at": 1_700_000_000_000,
+    }
+    await redis_client.set(f"game:{code}", dumps_text(game))
+    for user in (winner, loser):
+        ws_service.connections.add(code, user.id, AsyncMock())
+    return winner, loser
+
+
+@pytest.mark.asyncio
+async def test_game_end_writes_stats_and_history(redis_client, db_session):
+    from services.websocket_service import ws_service
+
+    winner, loser = await start_game(redis_client, db_session, "endcode")
+
+    await ws_service.GameEnded(db_session, "endcode")
+
+    await db_session.refresh(winner)
+    await db_session.refresh(loser)
+    assert (winner.games_played, winner.games_won, loser.games_lost) == (1, 1, 1)
+    assert winner.mmr > 1500 > loser.mmr
+
+    matches = (await db_session.execute(select(Match).order_by(Match.user_id))).scalars().all()
+    assert [(m.user_id, m.won) for m in matches] == [(winner.id, True), (loser.id, False)]
+    assert matches[0].mmr_delta == winner.mmr - 1500
+    rounds = (await db_session.execute(select(MatchRound))).scalars().all()
+    assert len(rounds) == 2
+    ws_service.connections.drop_lobby("endcode")
+
+
+@pytest.mark.asyncio
+async def test_failed_history_keeps_game_stats(redis_client, db_session, monkeypatch):
+    from services.websocket_service import ws_service
+    from repositories.match_repository import MatchRepository
+
+    monkeypatch.setattr(MatchRepository, "create_many", AsyncMock(side_effect=RuntimeError("insert failed")))
+    winner, loser = await start_game(redis_client, db_session, "failcode")
+
+    await ws_service.GameEnded(db_session, "failcode")
+
+    await db_session.refresh(winner)
+    await db_session.refresh(loser)
+    assert (winner.games_played, winner.games_won, loser.games_lost) == (1, 1, 1)
+    assert (await db_session.execute(select(Match))).scalars().all() == []
+    ws_service.connections.drop_lobby("failcode")
@@ -0,0 +1,59 @@
+import pytest
+import time
+from unittest.mock import AsyncMock
+from services.heartbeat import Heartbeat
+from services.connection_registry import ConnectionRegistry
+from utils.serializer import loads
+
+
+@pytest.mark.asyncio
+async def test_ping_and_pong():
+    heartbeat = Heartbeat(interval=1, timeout=30)
+    registry = ConnectionRegistry()
+    ws = AsyncMock()
+    connection = registry.add("code", 1, ws)
+    heartbeat.track(ws, "game", lambda: registry.remove("code", ws), record=connection)
+
+    await heartbeat.tick()
+    assert loads(ws.send_text.call_args.args[0])["type"] == "ping"
+
+    heartbeat.sockets[ws].last_seen -= 20
+    heartbeat.seen(ws)
+    assert time.time() - connection.last_seen < 1
+    assert registry.count("code") == 1
+
+
+@pytest.mark.asyncio
+async def test_reaps_silent_and_broken_sockets():
+    heartbeat = Heartbeat(interval=1, timeout=30)
+    spectators = []
+    silent, broken, alive = AsyncMock(), AsyncMock(), AsyncMock()
+    broken.send_text.side_effect = RuntimeError("socket closed")
+    for ws in (silent, broken, alive):
+        spectators.append(ws)
+        heartbeat.track(ws, "spectator", lambda ws=ws: spectators.remove(ws))
+    heartbeat.sockets[silent].last_seen -= 60
+
+    await heartbeat.tick()
+
+    assert spectators == [alive]
+    assert set(heartbeat.sockets) == {alive}
+    silent.close.assert_awaited()
+    broken.close.assert_awaited()
+
+
+@pytest.mark.asyncio
+async def test_failed_spectator_frame_evicts(monkeypatch):
+    from services.websocket_service import ws_service
+    from services.spectator_relay import spectator_hub
+
+    dead, alive = AsyncMock(), AsyncMock()
+    dead.send_text.side_effect = RuntimeError("socket closed")
+    monkeypatch.setitem(spectator_hub.spectators, "code", [dead, alive])
+
+    await ws_service.guess_preview({"lat": 1, "lng": 2}, "code", 3)
+    await ws_service.guess_preview({"lat": 1, "lng": 2}, "code", 3)
+
+    assert spectator_hub.spectators["code"] == [alive]
+    assert dead.send_text.await_count == 1
+    assert alive.send_text.await_count == 2
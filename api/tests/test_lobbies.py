@@ -27,7 +27,7 @@ async def test_join_lobby_valid_code(client, db_session, lobby, redis_client):
 
 
 @pytest.mark.asyncio
-async def test_leave_lobby_as_member(client, regular_user, lobby):
+async def test_leave_lobby_as_member(client, regular_user, lobby, redis_client):
     client.cookies.set("access_token", regular_user["token"])
     response = await client.delete(f"/lobbies/{lobby.invite_code}/members")
     assert response.status_code == 200
@@ -0,0 +1,93 @@
+import pytest
+from unittest.mock import AsyncMock
+from services.lobby_events import LobbyEvents
+from utils.serializer import loads
+
+
+def test_stamp_and_replay():
+    events = LobbyEvents(size=3)
+    first = loads(events.stamp("code", {"type": "player_guessed", "player": 1}))
+    second = loads(events.stamp("code", {"type": "round_ended"}))
+
+    assert second["seq"] == first["seq"] + 1
+    assert events.current("code") == second["seq"]
+    assert [loads(m)["type"] for m in events.since("code", first["seq"])] == ["round_ended"]
+    assert events.since("code", second["seq"]) == []
+
+
+def test_replay_exhausted():
+    events = LobbyEvents(size=2)
+    first = loads(events.stamp("code", {"type": "a"}))["seq"]
+    for message_type in ("b", "c", "d"):
+        events.stamp("code", {"type": message_type})
+
+    # "b" already fell out of the buffer
+    assert events.since("code", first) is None
+    assert [loads(m)["type"] for m in events.since("code", first + 1)] == ["c", "d"]
+    # unknown lobby, or a seq from before a restart
+    assert events.since("other", first) is None
+    assert events.since("code", events.current("code") + 10) is None
+
+    events.drop("code")
+    assert events.current("code") == 0
+
+
+@pytest.mark.asyncio
+async def test_service_replays_missed_events(monkeypatch):
+    from services.websocket_service import ws_service
+    from services import websocket_service
+
+    events = LobbyEvents(size=10)
+    monkeypatch.setattr(websocket_service, "lobby_events", events)
+    seen = loads(events.stamp("code", {"type": "player_guessed", "player": 2}))["seq"]
+    events.stamp("code", {"type": "round_ended", "hp": {"1": 5000}})
+
+    upto = events.current("code")
+
+    ws = AsyncMock()
+    # an event published mid-replay goes to the already registered socket live, not twice
+    ws.send_text.side_effect = lambda _: events.stamp("code", {"type": "player_left", "player": 2})
+    assert await ws_service._replay("code", ws, seen, upto)
+    sent = [loads(c.args[0]) for c in ws.send_text.call_args_list]
+    assert [m["type"] for m in sent] == ["round_ended", "reconnect_resumed"]
+    assert sent[1]["replayed"] == 1
+    assert sent[1]["seq"] == upto
+
+    assert not await ws_service._replay("code", AsyncMock(), None, upto)
+    assert not await ws_service._replay("code", AsyncMock(), seen - 5, upto)
+
+
+@pytest.mark.asyncio
+async def test_failed_replay_falls_back_to_snapshot(redis_client, monkeypatch):
+    from services.websocket_service import ws_service
+    from services import websocket_service
+
+    lobby = AsyncMock(users=[1, 2])
+    monkeypatch.setattr(websocket_service.lobby_store, "get_meta", AsyncMock(return_value=lobby))
+    monkeypatch.setattr(ws_service, "_replay", AsyncMock(side_effect=RuntimeError("socket closed")))
+    snapshot = AsyncMock()
+    monkeypatch.setattr(ws_service, "_send_snapshot", snapshot)
+    other, ws = AsyncMock(), AsyncMock()
+    ws_service.connections.add("rcode", 2, other)
+
+    await ws_service.reconect(None, 1, "rcode", ws, 3)
+
+    snapshot.assert_awaited_once_with(None, 1, "rcode", ws, lobby)
+    assert loads(other.send_text.call_args.args[0])["type"] == "player_reconnected"
+    ws_service.connections.drop_lobby("rcode")
+
+
+@pytest.mark.asyncio
+async def test_join_closes_when_lobby_vanishes(monkeypatch):
+    from services.websocket_service import ws_service
+    from services import websocket_service
+
+    store = websocket_service.lobby_store
+    monkeypatch.setattr(store, "get_meta", AsyncMock(side_effect=[AsyncMock(users=[2]), None]))
+    monkeypatch.setattr(store, "add_user", AsyncMock())
+    ws = AsyncMock()
+
+    await ws_service.player_joined(None, 1, "gone", ws)
+
+    ws.close.assert_awaited_once_with(code=1008, reason="Lobby not found")
+    assert "gone" not in ws_service.connections
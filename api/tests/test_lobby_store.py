@@ -0,0 +1,92 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from repositories.lobby_store import RedisLobbyStore, RoutedLobbyStore, PostgresLobbyStore
+from repositories.location_repository import LocationRepository
+
+
+@pytest.fixture
+def locations(monkeypatch):
+    rows = [SimpleNamespace(lat=i, lon=i, region="r", country="c") for i in range(13)]
+    monkeypatch.setattr(LocationRepository, "get_random_location", AsyncMock(return_value=rows))
+
+
+@pytest.mark.asyncio
+async def test_lobby_lifecycle(redis_client, locations):
+    store = RedisLobbyStore()
+    lobby = await store.create(None, 1)
+    code = lobby.invite_code
+
+    stored = await store.get_by_code(None, code)
+    assert (stored.host_id, stored.timer, stored.users) == (1, 240, [1])
+    assert len(stored.locations) == 13
+
+    assert (await store.add_user(None, code, 2)).users == [1, 2]
+    assert (await store.add_user(None, code, 2)).users == [1, 2]
+    assert await store.add_user(None, code, 3) == {"message": "Lobby is full"}
+    assert await store.add_user(None, "missing", 3) is None
+
+    assert [l.invite_code for l in await store.get_by_user_id(None, 2)] == [code]
+    assert (await store.remove_user(None, 1, code)).users == [2]
+    assert await store.remove_user(None, 1, code) is None
+    assert await store.get_by_user_id(None, 1) == []
+
+    assert await store.count_all(None) == 1
+    await store.delete(None, code)
+    assert await store.get_meta(None, code) is None
+    assert await store.get_by_user_id(None, 2) == []
+    assert await store.count_all(None) == 0
+
+
+@pytest.mark.asyncio
+async def test_only_clan_war_lobbies_hit_postgres(redis_client, locations):
+    durable = AsyncMock(spec=PostgresLobbyStore)
+    store = RoutedLobbyStore(RedisLobbyStore(), durable)
+
+    lobby = await store.create(None, 1, user_2=2)
+    await store.add_user(None, lobby.invite_code, 2)
+    await store.remove_user(None, 2, lobby.invite_code)
+    durable.create.assert_not_called()
+    durable.add_user.assert_not_called()
+    durable.remove_user.assert_not_called()
+
+    await store.create(None, 1, mode="clan_wars", war_id=5)
+    durable.create.assert_awaited_once_with(None, 1, mode="clan_wars", war_id=5, user_2=None)
+
+
+@pytest.mark.asyncio
+async def test_lobbies_of_user_use_gin_containment():
+    from unittest.mock import MagicMock
+    from sqlalchemy.dialects import postgresql
+    from models.lobby import Lobby
+    from repositories.lobby_repository import LobbyRepository
+
+    db = AsyncMock()
+    db.execute.return_value = MagicMock()
+    await LobbyRepository.get_by_user_id(db, 5)
+    query = db.execute.await_args.args[0]
+    compiled = query.compile(dialect=postgresql.dialect())
+    assert "lobby.users @> " in str(compiled)
+    assert list(compiled.params.values()) == [[5]]
+    index = next(index for index in Lobby.__table__.indexes if index.name == "ix_lobby_users")
+    assert index.dialect_options["postgresql"]["using"] == "gin"
+
+
+@pytest.mark.asyncio
+async def test_admin_lobby_list_includes_redis_lobbies(redis_client, locations, monkeypatch):
+    from services.admin_service import Admin_Panel
+
+    durable = AsyncMock(spec=PostgresLobbyStore)
+    durable.get_paginated.return_value = [SimpleNamespace(id=7, invite_code="war", host_id=3)]
+    durable.count_all.return_value = 1
+    store = RoutedLobbyStore(RedisLobbyStore(), durable)
+    monkeypatch.setattr("services.admin_service.lobby_store", store)
+    lobby = await store.create(None, 1)
+
+    result = await Admin_Panel.Get_lobbies(None, limit=10, page=1)
+    assert result["total_lobbies"] == 2
+    assert result["data_lobby"] == [
+        {"id": None, "invite_code": lobby.invite_code, "host_id": 1},
+        {"id": 7, "invite_code": "war", "host_id": 3},
+    ]
+    durable.get_paginated.assert_awaited_once_with(None, 0, 9)
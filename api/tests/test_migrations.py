@@ -0,0 +1,45 @@
+import pytest
+from pathlib import Path
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+from database.base import Base
+from tests.conftest import alembic_upgrade
+import models  # noqa: F401
+from models.reports import Reports  # noqa: F401
+
+MATCH_TABLES = {"matches", "match_rounds"}
+HEAD = ScriptDirectory(str(Path(__file__).resolve().parent.parent / "alembic")).get_current_head()
+
+
+def table_names(connection) -> set[str]:
+    return set(inspect(connection).get_table_names())
+
+
+async def version(conn) -> str:
+    return (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_fresh_database_reaches_head(pg_conn):
+    await pg_conn.run_sync(alembic_upgrade)
+    assert set(Base.metadata.tables) <= await pg_conn.run_sync(table_names)
+    assert await version(pg_conn) == HEAD
+
+
+@pytest.mark.asyncio
+async def test_create_all_database_before_match_history(pg_conn):
+    # what the old create_all startup built before match history existed
+    baseline = [table for name, table in Base.metadata.tables.items() if name not in MATCH_TABLES]
+    await pg_conn.run_sync(lambda sync: Base.metadata.create_all(sync, tables=baseline))
+
+    await pg_conn.run_sync(alembic_upgrade)
+    assert MATCH_TABLES <= await pg_conn.run_sync(table_names)
+    assert await version(pg_conn) == HEAD
+
+
+@pytest.mark.asyncio
+async def test_create_all_database_with_match_history(pg_conn):
+    await pg_conn.run_sync(Base.metadata.create_all)
+
+    await pg_conn.run_sync(alembic_upgrade)
+    assert await version(pg_conn) == HEAD
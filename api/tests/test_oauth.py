@@ -0,0 +1,51 @@
+import pytest
+from fastapi import HTTPException
+from providers.google import GoogleOAuthProvider
+from providers.http_client import oauth_http
+from config import config
+
+
+@pytest.mark.asyncio
+async def test_google_provider_against_stub(oauth_stub):
+    provider = GoogleOAuthProvider()
+    access_token = await provider.exchange_code("abc")
+    user_data = await provider.get_user_data(access_token)
+
+    assert access_token == "access_abc"
+    assert user_data == {"google_id": "stub_abc", "email": "abc@example.com", "name": "Stub abc"}
+
+
+@pytest.mark.asyncio
+async def test_google_provider_reuses_client(oauth_stub):
+    provider = GoogleOAuthProvider()
+    await provider.exchange_code("one")
+    client = oauth_http.client
+    await provider.exchange_code("two")
+
+    assert oauth_http.client is client
+
+
+@pytest.mark.asyncio
+async def test_userinfo_retried_on_503(oauth_stub):
+    oauth_stub.state.failures["userinfo"] = 2
+    user_data = await GoogleOAuthProvider().get_user_data("access_abc")
+
+    assert user_data["google_id"] == "stub_abc"
+    assert oauth_stub.state.calls["userinfo"] == 3
+
+
+@pytest.mark.asyncio
+async def test_token_exchange_not_retried_on_503(oauth_stub):
+    oauth_stub.state.failures["token"] = 1
+    with pytest.raises(HTTPException):
+        await GoogleOAuthProvider().exchange_code("abc")
+
+    assert oauth_stub.state.calls["token"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_code(oauth_stub):
+    with pytest.raises(HTTPException) as e:
+        await GoogleOAuthProvider().exchange_code("bad_code")
+
+    assert e.value.status_code == 400
@@ -41,3 +41,11 @@ async def test_get_leaderboard(client, redis_client):
     response = await client.get("/profile/leaderboard")
     assert response.status_code == 200
     assert isinstance(response.json(), list)
+
+@pytest.mark.asyncio
+async def test_get_match_history_empty(client, regular_user):
+    client.cookies.set("access_token", regular_user["token"])
+    response = await client.get("/profile/matches?limit=10&page=1")
+    assert response.status_code == 200
+    assert response.json()["data_match"] == []
+    assert response.json()["total_matches"] == 0
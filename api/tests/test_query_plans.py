@@ -0,0 +1,36 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from tests.conftest import alembic_upgrade
+
+# the hot queries from the repositories and the index each one must use
+PLANS = [
+    ("SELECT * FROM \"user\" WHERE telegram = '42'", "ix_user_telegram"),
+    ("SELECT * FROM \"user\" ORDER BY mmr DESC LIMIT 10", "ix_user_mmr"),
+    ("SELECT * FROM lobby WHERE users @> ARRAY[1]", "ix_lobby_users"),
+    ("SELECT * FROM lobby WHERE id = 1", "lobby_pkey"),
+    ("SELECT * FROM clan_invites WHERE code = 'abc'", "clan_invites_code_key"),
+    ("SELECT * FROM clan_wars WHERE clan_1_id = 1", "ix_clan_wars_clan_1_id"),
+    ("SELECT * FROM clan_wars WHERE clan_2_id = 1", "ix_clan_wars_clan_2_id"),
+    ("SELECT * FROM reports WHERE suspect_id = 1", "ix_reports_suspect_id"),
+    ("SELECT * FROM ban WHERE user_id = 1", "ix_ban_user_id"),
+    ("SELECT * FROM ban WHERE banned_until < now()", "ix_ban_active_until"),
+    ("SELECT * FROM matches WHERE user_id = 1 ORDER BY ended_at DESC", "ix_matches_user_id_ended_at"),
+    ("SELECT * FROM match_rounds WHERE match_id = 1", "ix_match_rounds_match_id"),
+]
+
+
+@pytest_asyncio.fixture
+async def pg(pg_conn):
+    # the schema production gets, from the migrations rather than the models
+    await pg_conn.run_sync(alembic_upgrade)
+    # empty tables are cheapest to scan, so force the planner to show which index it would use
+    await pg_conn.execute(text("SET LOCAL enable_seqscan = off"))
+    yield pg_conn
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query,index", PLANS)
+async def test_query_uses_index(pg, query, index):
+    plan = "\n".join(row[0] for row in await pg.execute(text(f"EXPLAIN {query}")))
+    assert index in plan, plan
@@ -0,0 +1,116 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from utils.rate_limiter import RateLimiter, Policy, MessageThrottle, rate_limit, ws_message_policies
+
+
+class Token:
+    def __init__(self, id: int):
+        self.id = id
+
+
+@pytest.mark.asyncio
+async def test_sliding_window(redis_client):
+    limiter = RateLimiter()
+    policy = Policy(3, 60)
+
+    results = [await limiter.hit("rl:test:sliding", policy) for _ in range(4)]
+
+    assert results[:3] == [0, 0, 0]
+    assert 0 < results[3] <= 60
+    assert await redis_client.zcard("rl:test:sliding") == 3
+    assert await redis_client.pttl("rl:test:sliding") > 0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket(redis_client):
+    limiter = RateLimiter()
+    policy = Policy(1, 10, algorithm="bucket", burst=2)
+
+    results = [await limiter.hit("rl:test:bucket", policy) for _ in range(3)]
+
+    assert results[:2] == [0, 0]
+    assert 0 < results[2] <= 10
+    assert await redis_client.pttl("rl:test:bucket") > 0
+
+
+@pytest.mark.asyncio
+async def test_limit_shared_between_workers(redis_client):
+    worker_1, worker_2 = RateLimiter(), RateLimiter()
+    policy = Policy(2, 60)
+
+    assert await worker_1.hit("rl:test:shared", policy) == 0
+    assert await worker_2.hit("rl:test:shared", policy) == 0
+    assert await worker_1.hit("rl:test:shared", policy) > 0
+
+
+@pytest.mark.asyncio
+async def test_rejected_key_skips_redis(redis_client):
+    limiter = RateLimiter()
+    policy = Policy(1, 60)
+    await limiter.hit("rl:test:blocked", policy)
+    await limiter.hit("rl:test:blocked", policy)
+    await redis_client.delete("rl:test:blocked")
+
+    assert await limiter.hit("rl:test:blocked", policy) > 0
+
+
+def test_local_limiter():
+    limiter = RateLimiter()
+    policy = Policy(10, 1, algorithm="bucket", burst=5)
+
+    results = [limiter.allow_local("ws:1", policy) for _ in range(6)]
+
+    assert results[:5] == [0] * 5
+    assert results[5] > 0
+    limiter.forget("ws:1")
+    assert limiter.allow_local("ws:1", policy) == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_per_user(redis_client):
+    @rate_limit(max_requests=1, seconds=60)
+    async def route(token=None):
+        return "ok"
+
+    assert await route(token=Token(1)) == "ok"
+    assert await route(token=Token(2)) == "ok"
+    with pytest.raises(HTTPException) as e:
+        await route(token=Token(1))
+
+    assert e.value.status_code == 429
+    assert int(e.value.headers["Retry-After"]) >= 1
+
+
+@pytest.mark.asyncio
+async def test_throttle_drops_over_budget():
+    throttle = MessageThrottle("ws:test:drop")
+    sent = []
+
+    async def send(data):
+        sent.append(data)
+
+    results = [throttle.allow("broadcast", {"type": "broadcast"}, send) for _ in range(7)]
+    throttle.close()
+
+    assert results == [True] * 5 + [False] * 2
+    assert not throttle.pending
+
+
+@pytest.mark.asyncio
+async def test_throttle_coalesces_camera(monkeypatch):
+    monkeypatch.setitem(ws_message_policies, "spectate", Policy(20, 1, algorithm="bucket", burst=2))
+    throttle = MessageThrottle("ws:test:camera")
+    sent = []
+
+    async def send(data):
+        sent.append(data)
+
+    results = [throttle.allow("spectate", {"type": "spectate", "heading": i}, send) for i in range(5)]
+    assert results == [True, True, False, False, False]
+
+    await asyncio.sleep(0.1)
+    throttle.close()
+
+    # only the newest held frame is delivered once the bucket refills
+    assert sent == [{"type": "spectate", "heading": 4}]
@@ -0,0 +1,114 @@
+import msgpack
+import pytest
+from unittest.mock import AsyncMock
+from starlette.websockets import WebSocketDisconnect
+from core.metrics import ws_payload_oversized
+from utils.serializer import (
+    MSGPACK_PROTOCOL,
+    JsonSerializer,
+    OrjsonSerializer,
+    dumps,
+    encode_message,
+    loads,
+    negotiate_protocol,
+    pack_compact,
+    receive_message,
+    send_message,
+)
+
+
+@pytest.mark.parametrize("serializer", [JsonSerializer, OrjsonSerializer])
+def test_game_state_roundtrip(serializer):
+    game = {"hp": {1: 6000, 2: 5500}, "guesses": {"0": [{"player": 1, "distance": 12.5}]}}
+
+    data = serializer.loads(serializer.dumps(game))
+
+    # int keys come back as strings with either serializer
+    assert data["hp"] == {"1": 6000, "2": 5500}
+    assert data["guesses"] == game["guesses"]
+
+
+@pytest.mark.asyncio
+async def test_send_message_encodes_once():
+    ws = AsyncMock()
+    await send_message(ws, {"type": "spectate", "heading": 90})
+    await send_message(ws, '{"type":"spectate"}')
+
+    assert [c.args[0] for c in ws.send_text.call_args_list] == [
+        '{"type":"spectate","heading":90}',
+        '{"type":"spectate"}',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_receive_message():
+    ws = AsyncMock()
+    ws.receive.side_effect = [
+        {"type": "websocket.receive", "text": '{"type":"spectate"}'},
+        {"type": "websocket.receive", "bytes": b'{"type":"report"}'},
+        {"type": "websocket.disconnect", "code": 1001},
+    ]
+
+    assert await receive_message(ws) == {"type": "spectate"}
+    assert await receive_message(ws) == {"type": "report"}
+    with pytest.raises(WebSocketDisconnect):
+        await receive_message(ws)
+
+
+def test_pack_compact():
+    message = {"type": "spectate", "heading": 123.5, "pitch": -3.25, "zoom": 1.5, "num_player": 7, "lat": 48.8566, "lng": 2.3522}
+
+    packed = pack_compact(message)
+    frame = msgpack.unpackb(packed)
+
+    assert frame["t"] == 1
+    assert (frame["h"], frame["p"], frame["n"]) == (123.5, -3.25, 7)
+    assert abs(frame["a"] - 48.8566) < 1e-5
+    assert len(packed) < len(dumps(message)) / 2
+
+
+def test_negotiate_protocol():
+    ws = AsyncMock()
+    ws.scope = {"subprotocols": ["mistguess.deflate", "mistguess.msgpack"]}
+    assert negotiate_protocol(ws, (MSGPACK_PROTOCOL,)) == "mistguess.msgpack"
+    assert negotiate_protocol(ws, ()) is None
+
+    ws.scope = {"subprotocols": []}
+    assert negotiate_protocol(ws, (MSGPACK_PROTOCOL,)) is None
+
+
+@pytest.mark.asyncio
+async def test_large_messages_stay_text():
+    # permessage-deflate compresses on the wire, a second app-level codec only costs cpu
+    ws = AsyncMock()
+    players = [{"id": i, "name": f"player {i}", "avatar": "/avatars/default.png"} for i in range(40)]
+
+    await send_message(ws, {"type": "player_joined", "players": players})
+
+    assert loads(ws.send_text.call_args.args[0]) == {"type": "player_joined", "players": players}
+    ws.send_bytes.assert_not_called()
+
+
+def test_payload_budget():
+    oversized = ws_payload_oversized.labels("round_ended")
+    before = oversized._value.get()
+
+    encode_message({"type": "round_ended", "results": []})
+    assert oversized._value.get() == before
+    encode_message({"type": "round_ended", "results": ["x" * 100] * 100})
+    assert oversized._value.get() == before + 1
+
+
+@pytest.mark.asyncio
+async def test_spectator_frames_per_protocol(monkeypatch):
+    from services.websocket_service import ws_service
+    from services.spectator_relay import spectator_hub
+
+    json_ws, compact_ws = AsyncMock(), AsyncMock()
+    monkeypatch.setitem(spectator_hub.spectators, "code", [json_ws, compact_ws])
+    monkeypatch.setattr(spectator_hub, "compact", {compact_ws})
+
+    await ws_service.guess_preview({"lat": 1.5, "lng": 2.5}, "code", 7)
+
+    assert json_ws.send_text.call_args.args[0] == '{"type":"guess_preview","lat":1.5,"lng":2.5,"num_player":7}'
+    assert msgpack.unpackb(compact_ws.send_bytes.call_args.args[0]) == {"t": 2, "a": 1.5, "o": 2.5, "n": 7}
@@ -0,0 +1,107 @@
+import asyncio
+import pytest
+import msgpack
+from unittest.mock import AsyncMock
+from services.spectator_relay import SpectatorHub
+
+
+@pytest.mark.asyncio
+async def test_game_worker_publishes_to_relay(redis_client):
+    game = SpectatorHub("game", delay=0)
+    relay = SpectatorHub("spectator", delay=0)
+    json_ws, compact_ws = AsyncMock(), AsyncMock()
+
+    # nobody watching yet, nothing is published
+    assert not await game.has_viewers("code")
+
+    await relay.add("code", json_ws)
+    await relay.add("code", compact_ws, compact=True)
+    listener = asyncio.create_task(relay.listen())
+    await asyncio.sleep(0.05)
+
+    game.remote_viewers.clear()
+    await game.publish("code", {"type": "guess_preview", "lat": 1.5, "lng": 2.5, "num_player": 7})
+    await game.publish("code", '{"type":"round_ended","seq":4}')
+    await asyncio.sleep(0.05)
+    listener.cancel()
+
+    assert [c.args[0] for c in json_ws.send_text.call_args_list] == [
+        '{"type":"guess_preview","lat":1.5,"lng":2.5,"num_player":7}',
+        '{"type":"round_ended","seq":4}',
+    ]
+    assert msgpack.unpackb(compact_ws.send_bytes.call_args.args[0]) == {"t": 2, "a": 1.5, "o": 2.5, "n": 7}
+    assert compact_ws.send_text.call_args.args[0] == '{"type":"round_ended","seq":4}'
+
+
+@pytest.mark.asyncio
+async def test_delay_buffer():
+    hub = SpectatorHub("all", delay=0.1)
+    ws = AsyncMock()
+    await hub.add("code", ws)
+    pump = asyncio.create_task(hub.pump())
+
+    await hub.publish("code", {"type": "round_started"})
+    await asyncio.sleep(0.05)
+    ws.send_text.assert_not_called()
+    await asyncio.sleep(0.1)
+    pump.cancel()
+
+    ws.send_text.assert_awaited_once_with('{"type":"round_started"}')
+
+
+@pytest.mark.asyncio
+async def test_spectator_snapshot(redis_client):
+    from services.websocket_service import ws_service
+    from utils.serializer import loads
+
+    assert await ws_service.spectator_snapshot("code") is None
+
+    players = [{"user_id": 1, "name": "a"}, {"user_id": 2, "name": "b"}]
+    await ws_service._snapshot_players("code", players)
+    assert loads(await ws_service.spectator_snapshot("code")) == {
+        "type": "spectator_snapshot", "round": None, "players": players
+    }
+
+    game = {
+        "locations": [{"lat": 1, "lon": 2, "url": "x"}, {"lat": 3, "lon": 4, "url": "y"}],
+        "current_location_index": 1,
+        "hp": {"1": 6000, "2": 5200},
+    }
+    await ws_service._snapshot_round("code", game)
+    snapshot = loads(await ws_service.spectator_snapshot("code"))
+    assert snapshot["round"] == {"lat": 3, "lon": 4, "hp": {"1": 6000, "2": 5200}}
+    assert snapshot["players"] == players
+
+
+@pytest.mark.asyncio
+async def test_delayed_spectator_snapshot(redis_client, monkeypatch):
+    from config import config
+    from services.websocket_service import ws_service
+    from utils.serializer import loads
+
+    monkeypatch.setattr(config, "SPECTATOR_DELAY", 0.05)
+    players = [{"user_id": 1, "name": "a"}]
+    await ws_service._snapshot_players("code", players)
+    await asyncio.sleep(0.1)
+    game = {"locations": [{"lat": 1, "lon": 2, "url": "x"}], "current_location_index": 0, "hp": {}}
+    await ws_service._snapshot_round("code", game)
+
+    # the round started less than SPECTATOR_DELAY ago, a delayed viewer must not see it yet
+    assert loads(await ws_service.spectator_snapshot("code", 0.05)) == {
+        "type": "spectator_snapshot", "round": None, "players": players
+    }
+    assert loads(await ws_service.spectator_snapshot("code"))["round"] == {"lat": 1, "lon": 2, "hp": {}}
+    assert await ws_service.spectator_snapshot("code", 60) is None
+
+
+@pytest.mark.asyncio
+async def test_remote_viewer_answers_are_bounded(redis_client):
+    hub = SpectatorHub("game", 0, max_entries=2)
+    hub.remote_viewers = {"a": (0, True), "b": (0, False)}
+    hub.forget("a")
+    assert list(hub.remote_viewers) == ["b"]
+
+    # stale answers are swept once the dict is full
+    await hub.has_viewers("c")
+    await hub.has_viewers("d")
+    assert list(hub.remote_viewers) == ["c", "d"]
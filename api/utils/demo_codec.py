@@ -0,0 +1,216 @@
+import base64
+import struct
+
+# segment layout: header, then frames of [flags][dt][payload]
+# keyframes carry absolute quantized values, other frames carry deltas
+VERSION = 1
+CODEC = "mgd1"
+HEADER = struct.Struct("<BHIq")  # version, frame count, num_player, base ts (ms)
+
+KEY = 0x01
+POS = 0x02
+POS_SAME = 0x04
+SMALL = 0x08
+LONG_DT = 0x10
+HUGE_DT = 0x20  # gaps over 65 s, e.g. a player idle between rounds
+
+ANGLE_SCALE = 100  # 0.01 deg
+ZOOM_SCALE = 100
+COORD_SCALE = 1_000_000  # ~0.1 m
+
+_KEY_VIEW = struct.Struct("<HhH")
+_KEY_POS = struct.Struct("<ii")
+_DELTA_SMALL = struct.Struct("<bbb")
+_DELTA_WIDE = struct.Struct("<hhh")
+_DELTA_POS = struct.Struct("<hh")
+_DT_SHORT = struct.Struct("<B")
+_DT_LONG = struct.Struct("<H")
+_DT_HUGE = struct.Struct("<I")
+
+
+def _clamp(value: int, low: int, high: int) -> int:
+    return max(low, min(high, value))
+
+
+def _fits(values, low: int, high: int) -> bool:
+    return all(low <= v <= high for v in values)
+
+
+def quantize(frame: dict):
+    heading = round((frame.get("heading") or 0) * ANGLE_SCALE) % (360 * ANGLE_SCALE)
+    pitch = _clamp(round((frame.get("pitch") or 0) * ANGLE_SCALE), -9000, 9000)
+    zoom = _clamp(round((frame.get("zoom") or 0) * ZOOM_SCALE), 0, 0xFFFF)
+
+    pos = None
+    if frame.get("lat") is not None and frame.get("lng") is not None:
+        pos = (round(frame["lat"] * COORD_SCALE), round(frame["lng"] * COORD_SCALE))
+    return heading, pitch, zoom, pos
+
+
+class DemoEncoder:
+    __slots__ = ("num_player", "base_ts", "count", "buf", "last_view", "last_pos", "last_ts")
+
+    def __init__(self, num_player: int, base_ts: int):
+        self.num_player = num_player
+        self.base_ts = base_ts
+        self.count = 0
+        self.buf = bytearray()
+        self.last_view = (0, 0, 0)
+        self.last_pos = None
+        self.last_ts = base_ts
+
+    def add(self, frame: dict, ts: int) -> None:
+        heading, pitch, zoom, pos = quantize(frame)
+        dt = _clamp(ts - self.last_ts, 0, 0xFFFFFFFF)
+
+        flags = 0
+        payload = b""
+
+        if self.count > 0:
+            last_heading, last_pitch, last_zoom = self.last_view
+            # shortest way round so 359 -> 1 is +2, not -358
+            dh = (heading - last_heading + 18000) % 36000 - 18000
+            deltas = (dh, pitch - last_pitch, zoom - last_zoom)
+
+            if _fits(deltas, -128, 127):
+                flags |= SMALL
+                payload = _DELTA_SMALL.pack(*deltas)
+            elif _fits(deltas, -32768, 32767):
+                payload = _DELTA_WIDE.pack(*deltas)
+            else:
+                flags = KEY
+
+            if not flags & KEY and pos is not None:
+                if pos == self.last_pos:
+                    flags |= POS_SAME
+                elif self.last_pos is not None and _fits(
+                    (pos[0] - self.last_pos[0], pos[1] - self.last_pos[1]), -32768, 32767
+                ):
+                    flags |= POS
+                    payload += _DELTA_POS.pack(
+                        pos[0] - self.last_pos[0], pos[1] - self.last_pos[1]
+                    )
+                else:
+                    flags = KEY
+        else:
+            flags = KEY
+
+        if flags & KEY:
+            payload = _KEY_VIEW.pack(heading, pitch, zoom)
+            if pos is not None:
+                flags |= POS
+                payload += _KEY_POS.pack(*pos)
+
+        if dt > 0xFFFF:
+            flags |= HUGE_DT
+            self.buf.append(flags)
+            self.buf += _DT_HUGE.pack(dt)
+        elif dt > 0xFF:
+            flags |= LONG_DT
+            self.buf.append(flags)
+            self.buf += _DT_LONG.pack(dt)
+        else:
+            self.buf.append(flags)
+            self.buf += _DT_SHORT.pack(dt)
+        self.buf += payload
+
+        self.count += 1
+        self.last_view = (heading, pitch, zoom)
+        if pos is not None:
+            self.last_pos = pos
+        self.last_ts += dt
+
+    def to_bytes(self) -> bytes:
+        return HEADER.pack(VERSION, self.count, self.num_player, self.base_ts) + self.buf
+
+
+def read_header(data: bytes) -> tuple[int, int, int]:
+    version, count, num_player, base_ts = HEADER.unpack_from(data, 0)
+    if version != VERSION:
+        raise ValueError(f"Unsupported demo segment version {version}")
+    return count, num_player, base_ts
+
+
+def decode_segment(data: bytes) -> list[dict]:
+    count, num_player, ts = read_header(data)
+
+    offset = HEADER.size
+    heading = pitch = zoom = 0
+    pos = None
+    frames = []
+
+    for _ in range(count):
+        flags = data[offset]
+        offset += 1
+
+        if flags & HUGE_DT:
+            (dt,) = _DT_HUGE.unpack_from(data, offset)
+            offset += _DT_HUGE.size
+        elif flags & LONG_DT:
+            (dt,) = _DT_LONG.unpack_from(data, offset)
+            offset += _DT_LONG.size
+        else:
+            (dt,) = _DT_SHORT.unpack_from(data, offset)
+            offset += _DT_SHORT.size
+        ts += dt
+
+        has_pos = False
+        if flags & KEY:
+            heading, pitch, zoom = _KEY_VIEW.unpack_from(data, offset)
+            offset += _KEY_VIEW.size
+            if flags & POS:
+                pos = _KEY_POS.unpack_from(data, offset)
+                offset += _KEY_POS.size
+                has_pos = True
+        else:
+            delta = _DELTA_SMALL if flags & SMALL else _DELTA_WIDE
+            dh, dp, dz = delta.unpack_from(data, offset)
+            offset += delta.size
+            heading = (heading + dh) % 36000
+            pitch += dp
+            zoom += dz
+            if flags & POS:
+                dlat, dlng = _DELTA_POS.unpack_from(data, offset)
+                offset += _DELTA_POS.size
+                pos = (pos[0] + dlat, pos[1] + dlng)
+                has_pos = True
+            elif flags & POS_SAME:
+                has_pos = True
+
+        frame = {
+            "t": ts,
+            "num_player": num_player,
+            "heading": heading / ANGLE_SCALE,
+            "pitch": pitch / ANGLE_SCALE,
+            "zoom": zoom / ZOOM_SCALE,
+        }
+        if has_pos and pos is not None:
+            frame["lat"] = pos[0] / COORD_SCALE
+            frame["lng"] = pos[1] / COORD_SCALE
+        frames.append(frame)
+
+    return frames
+
+
+def pack_demo(segments: list[bytes]) -> dict:
+    return {
+        "codec": CODEC,
+        "segments": [base64.b64encode(segment).decode() for segment in segments],
+    }
+
+
+def demo_segments(demo) -> list[bytes]:
+    if not isinstance(demo, dict) or demo.get("codec") != CODEC:
+        return []
+    return [base64.b64decode(segment) for segment in demo.get("segments", [])]
+
+
+def unpack_demo(demo) -> list[dict]:
+    # reports created before the binary recorder store the raw json frames
+    if isinstance(demo, list):
+        return demo
+
+    frames = []
+    for segment in demo_segments(demo):
+        frames.extend(decode_segment(segment))
+    return frames
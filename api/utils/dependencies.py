@@ -3,11 +3,12 @@ from fastapi import HTTPException, UploadFile, File, Body, Request, Depends, Hea
 import logging
 
 logger = logging.getLogger(__name__)
-from services.authorization import TokenManager
+from utils.token_manager import TokenManager
 from database.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime
-from repositories import LobbyRepository, UserRepository
+from repositories import UserRepository
+from repositories.lobby_store import lobby_store
+from cache.ban_registry import ban_registry
 
 
 class Dependies:
@@ -15,7 +16,7 @@ class Dependies:
     async def get_invite_code(
         self, InviteCode: str, db: AsyncSession = Depends(get_db)
     ):
-        lobby = await LobbyRepository.get_by_code(db, InviteCode)
+        lobby = await lobby_store.get_meta(db, InviteCode)
         if not lobby:
             raise HTTPException(status_code=404, detail="InviteCode not found")
         return InviteCode
@@ -56,17 +57,15 @@ class Dependies:
             if not user_id:
                 raise HTTPException(401, "invalid token")
 
-            user = await UserRepository.get_by_id(db, user_id)
+            user = await TokenManager.get_principal(db, data_token)
             if not user:
                 logger.error(f"user {user_id} not found in database")
                 raise HTTPException(401, "invalid token")
             
-            if user.ban:
-                if user.ban.banned_until and user.ban.banned_until < datetime.now():
-                    await UserRepository.unban_user(db, user_id)
-                    return user
-
-                raise HTTPException(403, f"user is banned until {user.ban.banned_until} for reason: {user.ban.reason}")
+            ban = ban_registry.get(user_id)
+            if ban:
+                reason, banned_until = ban
+                raise HTTPException(403, f"user is banned until {banned_until} for reason: {reason}")
 
             return user
         except HTTPException:
@@ -75,6 +74,16 @@ class Dependies:
             logger.error(f"Token validation error: {str(e)}")
             raise HTTPException(401, "invalid token")
 
+    async def get_current_user_full(
+        self, request: Request, db: AsyncSession = Depends(get_db)
+    ):
+        # the cached principal only carries identity, routes reading clan/mmr fields need the row
+        principal = await self.get_current_user(request, db)
+        user = await UserRepository.get_by_id(db, principal.id)
+        if not user:
+            raise HTTPException(401, "invalid token")
+        return user
+
     @staticmethod
     async def verify_bot_secret(bot_secret: str = Header(None)):
         expected_secret = config.BOT_SECRET
@@ -1,25 +1,257 @@
 from cache.redis import r
+from config import config
+from core.metrics import ws_messages_dropped, ws_messages_coalesced
 from fastapi import HTTPException, Request
 from starlette.status import HTTP_429_TOO_MANY_REQUESTS
 from functools import wraps
+import asyncio
+import logging
+import math
+import secrets
+import time
+
+logger = logging.getLogger(__name__)
+
+# both scripts use the redis clock so workers with skewed clocks agree,
+# and return {allowed, retry_after_ms}
+SLIDING_WINDOW = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+if redis.call('ZCARD', KEYS[1]) < limit then
+    redis.call('ZADD', KEYS[1], now, now .. ':' .. ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], window)
+    return {1, 0}
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return {0, tonumber(oldest[2]) + window - now}
+"""
+
+TOKEN_BUCKET = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - ts, 0) * rate)
+
+local allowed, retry = 0, 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry = math.ceil((cost - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate))
+return {allowed, retry}
+"""
+
+
+class Policy:
+    __slots__ = ("limit", "period", "algorithm", "burst")
+
+    def __init__(self, limit: int, period: float, algorithm: str = "sliding", burst: int | None = None):
+        if algorithm not in ("sliding", "bucket"):
+            raise ValueError(f"Unknown rate limit algorithm: {algorithm}")
+        self.limit = limit
+        self.period = period
+        self.algorithm = algorithm
+        # bucket only: how many requests may arrive at once
+        self.burst = burst or limit
+
+    @property
+    def rate(self) -> float:
+        return self.limit / self.period
+
+
+class RateLimiter:
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self.sliding = r.register_script(SLIDING_WINDOW)
+        self.bucket = r.register_script(TOKEN_BUCKET)
+        # key: (tokens, last refill), the in-process pre-limiter
+        self.local: dict[str, tuple[float, float]] = {}
+        # key: monotonic time until which redis already said no
+        self.blocked: dict[str, float] = {}
+
+    def _prune(self, now: float) -> None:
+        if len(self.blocked) >= self.max_entries:
+            self.blocked = {k: v for k, v in self.blocked.items() if v > now}
+        if len(self.local) >= self.max_entries:
+            self.local.clear()
+
+    def allow_local(self, key: str, policy: Policy, cost: float = 1) -> float:
+        # token bucket in process memory, returns seconds to wait (0 = allowed)
+        now = time.monotonic()
+        capacity = policy.burst
+        tokens, last = self.local.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - last) * policy.rate)
+
+        if tokens >= cost:
+            self.local[key] = (tokens - cost, now)
+            return 0
+        self.local[key] = (tokens, now)
+        return (cost - tokens) / policy.rate
+
+    def forget(self, key: str) -> None:
+        self.local.pop(key, None)
+        self.blocked.pop(key, None)
+
+    async def hit(self, key: str, policy: Policy) -> float:
+        now = time.monotonic()
+        self._prune(now)
+
+        blocked_until = self.blocked.get(key)
+        if blocked_until:
+            if blocked_until > now:
+                return blocked_until - now
+            del self.blocked[key]
+
+        # this worker alone went over the limit, no need to ask redis
+        retry_after = self.allow_local(key, policy)
+        if retry_after:
+            return retry_after
+
+        try:
+            if policy.algorithm == "sliding":
+                allowed, retry_ms = await self.sliding(
+                    keys=[key],
+                    args=[int(policy.period * 1000), policy.limit, secrets.token_hex(4)],
+                    client=r,
+                )
+            else:
+                allowed, retry_ms = await self.bucket(
+                    keys=[key], args=[policy.rate / 1000, policy.burst, 1], client=r
+                )
+        except Exception as e:
+            # fail open, the local limiter still holds back floods
+            logger.error(f"Rate limiter redis error for {key}: {e}")
+            return 0
+
+        if allowed:
+            return 0
+        retry_after = retry_ms / 1000
+        self.blocked[key] = now + retry_after
+        return retry_after
+
+
+rate_limiter = RateLimiter()
+
+ws_message_policy = Policy(
+    config.WS_MESSAGE_RATE, 1, algorithm="bucket", burst=config.WS_MESSAGE_BURST
+)
+
+ws_message_policies = {
+    "spectate": Policy(config.WS_CAMERA_RATE, 1, algorithm="bucket", burst=max(int(config.WS_CAMERA_RATE), 1)),
+    "guess_preview": Policy(config.WS_PREVIEW_RATE, 1, algorithm="bucket", burst=max(int(config.WS_PREVIEW_RATE), 1)),
+    "broadcast": Policy(config.WS_BROADCAST_RATE, 1, algorithm="bucket", burst=5),
+    "game_start": Policy(config.WS_CONTROL_RATE, 1, algorithm="bucket", burst=2),
+    "game_end": Policy(config.WS_CONTROL_RATE, 1, algorithm="bucket", burst=2),
+    "round_start": Policy(config.WS_CONTROL_RATE, 1, algorithm="bucket", burst=2),
+    "round_end": Policy(config.WS_CONTROL_RATE, 1, algorithm="bucket", burst=2),
+    "submit_guess": Policy(2, 1, algorithm="bucket", burst=3),
+    "report": Policy(3, 60, algorithm="bucket", burst=3),
+}
+
+# only the latest state matters, so an over-budget frame is held back and sent late instead of lost
+COALESCED_TYPES = {"spectate", "guess_preview"}
+
+
+class MessageThrottle:
+    __slots__ = ("key", "pending", "flushes")
+
+    def __init__(self, key: str):
+        self.key = key
+        self.pending: dict[str, dict] = {}
+        self.flushes: dict[str, asyncio.Task] = {}
+
+    def allow(self, message_type: str, data: dict, send) -> bool:
+        if rate_limiter.allow_local(self.key, ws_message_policy):
+            # unknown types share one label so clients can't grow the metric
+            ws_messages_dropped.labels(message_type if message_type in ws_message_policies else "other").inc()
+            return False
+
+        policy = ws_message_policies.get(message_type)
+        if policy is None:
+            return True
+
+        retry_after = rate_limiter.allow_local(f"{self.key}:{message_type}", policy)
+        if not retry_after:
+            # a newer frame got through, the held one would arrive out of order
+            if self.pending.pop(message_type, None) is not None:
+                ws_messages_coalesced.labels(message_type).inc()
+                self.flushes.pop(message_type).cancel()
+            return True
+
+        if message_type not in COALESCED_TYPES:
+            ws_messages_dropped.labels(message_type).inc()
+            return False
+
+        if message_type in self.pending:
+            ws_messages_coalesced.labels(message_type).inc()
+        self.pending[message_type] = data
+        if message_type not in self.flushes:
+            self.flushes[message_type] = asyncio.create_task(
+                self._flush(message_type, retry_after, send)
+            )
+        return False
+
+    async def _flush(self, message_type: str, delay: float, send) -> None:
+        await asyncio.sleep(delay)
+        self.flushes.pop(message_type, None)
+        data = self.pending.pop(message_type, None)
+        if data is None:
+            return
+        rate_limiter.allow_local(f"{self.key}:{message_type}", ws_message_policies[message_type])
+        try:
+            await send(data)
+        except Exception as e:
+            logger.error(f"Failed to deliver held {message_type} for {self.key}: {e}")
+
+    def close(self) -> None:
+        for task in self.flushes.values():
+            task.cancel()
+        self.flushes.clear()
+        self.pending.clear()
+        rate_limiter.forget(self.key)
+        for message_type in ws_message_policies:
+            rate_limiter.forget(f"{self.key}:{message_type}")
+
+
+def rate_limit(max_requests: int, seconds: int, algorithm: str = "sliding", burst: int | None = None, per: str = "user"):
+    # one policy per route; requests are counted per user when a token is present, else per ip
+    policy = Policy(max_requests, seconds, algorithm=algorithm, burst=burst)
 
-def rate_limit(max_requests: int, seconds: int):
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
+            token = kwargs.get("token")
             request = kwargs.get("request") or kwargs.get("req")
-            if not request or not hasattr(request, "client") or not request.client:
-                return await func(*args, **kwargs)
+            if not isinstance(request, Request):
+                request = None
 
-            ip = request.client.host
-            key = f"rl:{func.__name__}:{ip}"
-
-            count = await r.incr(key)
-            if count == 1:
-                await r.expire(key, seconds)
+            if per == "user" and token is not None and getattr(token, "id", None) is not None:
+                key = f"rl:{func.__name__}:u:{token.id}"
+            elif request and request.client:
+                key = f"rl:{func.__name__}:ip:{request.client.host}"
+            else:
+                return await func(*args, **kwargs)
 
-            if count > max_requests:
-                raise HTTPException(status_code=HTTP_429_TOO_MANY_REQUESTS, detail="Too many requests")
+            retry_after = await rate_limiter.hit(key, policy)
+            if retry_after:
+                raise HTTPException(
+                    status_code=HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests",
+                    headers={"Retry-After": str(max(math.ceil(retry_after), 1))},
+                )
 
             return await func(*args, **kwargs)
         return wrapper
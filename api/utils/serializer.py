@@ -0,0 +1,127 @@
+from config import config
+from core.metrics import ws_payload_bytes, ws_payload_oversized
+from starlette.websockets import WebSocket, WebSocketDisconnect
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# spectators may ask for binary camera/guess preview frames, everything else stays json text
+MSGPACK_PROTOCOL = "mistguess.msgpack"
+COMPACT_TYPES = {"spectate": 1, "guess_preview": 2}
+COMPACT_KEYS = {
+    "type": "t",
+    "heading": "h",
+    "pitch": "p",
+    "zoom": "z",
+    "num_player": "n",
+    "lat": "a",
+    "lng": "o",
+}
+
+
+class JsonSerializer:
+    name = "json"
+
+    @staticmethod
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    @staticmethod
+    def loads(data: bytes | str):
+        return json.loads(data)
+
+
+class OrjsonSerializer:
+    name = "orjson"
+
+    @staticmethod
+    def dumps(obj) -> bytes:
+        # game state uses int player ids as keys, json.dumps turned them into strings too
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+    @staticmethod
+    def loads(data: bytes | str):
+        return orjson.loads(data)
+
+
+serializer = OrjsonSerializer() if orjson and config.SERIALIZER == "orjson" else JsonSerializer()
+
+
+def dumps(obj) -> bytes:
+    return serializer.dumps(obj)
+
+
+def dumps_text(obj) -> str:
+    return serializer.dumps(obj).decode()
+
+
+def loads(data: bytes | str):
+    return serializer.loads(data)
+
+
+# bytes; anything not listed gets config.WS_PAYLOAD_BUDGET
+PAYLOAD_BUDGETS = {
+    "reconnect_succes": 32768,
+    "player_joined": 8192,
+    "game_ended": 16384,
+    "round_ended": 8192,
+    "spectate": 256,
+    "guess_preview": 256,
+}
+
+def encode_message(message: dict) -> str:
+    text = dumps_text(message)
+    message_type = message.get("type", "unknown")
+    ws_payload_bytes.labels(message_type).observe(len(text))
+
+    budget = PAYLOAD_BUDGETS.get(message_type, config.WS_PAYLOAD_BUDGET)
+    if len(text) > budget:
+        ws_payload_oversized.labels(message_type).inc()
+        logger.warning(f"Websocket message {message_type} is {len(text)} bytes, budget {budget}")
+    return text
+
+
+async def send_message(ws: WebSocket, message: dict | str) -> None:
+    # broadcasts encode once with encode_message and pass the string to every socket,
+    # compression is left to the server's permessage-deflate
+    text = message if isinstance(message, str) else encode_message(message)
+    await ws.send_text(text)
+
+
+async def receive_message(ws: WebSocket):
+    message = await ws.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+    return loads(message.get("text") or message.get("bytes"))
+
+
+def negotiate_protocol(ws: WebSocket, supported: tuple[str, ...]) -> str | None:
+    # first protocol the client offered that we speak, None keeps plain json
+    for protocol in ws.scope.get("subprotocols", []):
+        if protocol == MSGPACK_PROTOCOL and not msgpack:
+            continue
+        if protocol in supported:
+            return protocol
+    return None
+
+
+def pack_compact(message: dict) -> bytes:
+    # float32 is ~0.5m at street view coordinates, plenty for a camera preview
+    return msgpack.packb(
+        {
+            COMPACT_KEYS[key]: COMPACT_TYPES[value] if key == "type" else value
+            for key, value in message.items()
+        },
+        use_single_float=True,
+    )
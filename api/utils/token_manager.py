@@ -3,6 +3,7 @@ from jose import jwt
 from fastapi import HTTPException
 from config import config
 from repositories.user_repository import UserRepository
+from cache.auth_cache import auth_cache, Principal
 from database.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
@@ -14,7 +15,8 @@ class TokenManager:
     @staticmethod
     def create_access_token(data: dict) -> str:
         to_encode = data.copy()
-        to_encode.update({"exp": datetime.utcnow() + timedelta(hours=1), "type": "access"})
+        now = datetime.utcnow()
+        to_encode.update({"exp": now + timedelta(hours=1), "iat": now, "type": "access"})
         return jwt.encode(to_encode, config.SECRET_KEY, algorithm=config.ALGORITHM)
     
     @staticmethod
@@ -27,6 +29,23 @@ class TokenManager:
     def decode_token(token: str):
         return jwt.decode(token, config.SECRET_KEY, algorithms=[config.ALGORITHM])
 
+    @staticmethod
+    async def get_principal(db: AsyncSession, data_token: dict) -> Principal | None:
+        user_id = data_token["id"]
+        issued = data_token.get("iat") or data_token.get("exp")
+
+        principal = auth_cache.get(user_id, issued)
+        if principal:
+            return principal
+
+        user = await UserRepository.get_by_id(db, user_id)
+        if not user:
+            return None
+
+        principal = Principal.from_user(user)
+        auth_cache.set(user_id, issued, principal)
+        return principal
+
     @staticmethod
     async def verifyToken(db: AsyncSession, token: str):
         try:
@@ -37,7 +56,7 @@ class TokenManager:
                 logger.error("Invalid token: no username")
                 raise HTTPException(401, "invalid token")
 
-            user = await UserRepository.get_by_id(db, id)
+            user = await TokenManager.get_principal(db, data_token)
 
             if not user:
                 raise HTTPException(401, "user not found")
@@ -50,10 +50,10 @@ async def stats(message: Message | None = None, callback_query: CallbackQuery |
     async with aiohttp.ClientSession() as session:
         
         header = {
-            "bot_secret": Config.BOT_SECRET,
+            "bot-secret": Config.BOT_SECRET,
         }
         
-        response = await session.get(f"http://api:8000/{user_id}/leaderboard", headers=header)
+        response = await session.get(f"http://api:8000/telegram/{user_id}/stats", headers=header)
         
         if response.status == 404:
             text = "❌ Account not linked. Use /start and click 'Link Account'"
@@ -77,13 +77,15 @@ async def stats(message: Message | None = None, callback_query: CallbackQuery |
         
         data = await response.json()
         winrate = (data["games_won"] / data["games_played"] * 100) if data["games_played"] > 0 else 0
+        form = "".join("W" if m["won"] else "L" for m in data.get("recent_matches", [])) or "-"
         
         text = (
             f"📊 <b>Stats: {data['name']}</b>\n\n"
             f"├ Username: {data['username']}\n"
             f"├ Rank: {data['rank']}\n"
-            f"├ XP: {data['xp']}\n"
+            f"├ MMR: {data['mmr']}\n"
             f"├ Games: {data['games_played']} ({data['games_won']}W / {data['games_lost']}L)\n"
+            f"├ Last games: {form}\n"
             f"└ Win Rate: {winrate:.1f}%"
         )
 
@@ -329,6 +329,11 @@ export const LobbyProvider: React.FC<LobbyProviderProps> = ({ children }) => {
         });
         break;
 
+      case 'reconnect_resumed':
+        // missed events were replayed in order, the current state is already up to date
+        setIsReconnecting(false);
+        break;
+
       case 'reconnect_succes':
         setIsReconnecting(false);
         console.log('Reconnect successful, restoring game state:', event);
@@ -140,6 +140,10 @@ export const MatchmakingProvider: React.FC<MatchmakingProviderProps> = ({ childr
       ws.onmessage = (event) => {
         try {
           const data = JSON.parse(event.data);
+          if (data.type === 'ping') {
+            ws.send(JSON.stringify({ type: 'pong' }));
+            return;
+          }
           handleWSEvent(data);
         } catch (error) {
           console.error('Error parsing WS message:', error);
@@ -238,8 +238,8 @@ export const AdminPage: React.FC = () => {
     setDemo(d => ({ ...d, open: true, loading: true, reportId, frames: [], frameIdx: 0, playing: false }));
     try {
       const data = await apiService.getAdminReport(reportId);
-      // Only keep frames from the suspect player
-      const frames = (data.demo || []).filter((f: any) => f.num_player === data.suspect_id);
+      // Only the suspect player's segments are decoded server side
+      const frames = await apiService.getAdminReportDemo(reportId, data.suspect_id);
       setDemo(d => ({ ...d, loading: false, frames, reportData: data }));
     } catch {
       showToast('Failed to load demo');
@@ -489,10 +489,10 @@ export const AdminPage: React.FC = () => {
                       {lobbies
                         .filter(l => !searchLobby || (l.invite_code || '').toLowerCase().includes(searchLobby.toLowerCase()))
                         .map((l: any) => (
-                          <tr key={l.id}>
+                          <tr key={l.invite_code}>
                             <td><span className="adm-code">{l.invite_code}</span></td>
                             <td className="adm-cell-mono">#{l.host_id}</td>
-                            <td className="adm-cell-mono">{l.id}</td>
+                            <td className="adm-cell-mono">{l.id ?? '—'}</td>
                           </tr>
                         ))}
                     </tbody>
@@ -139,12 +139,16 @@ export const GamePage: React.FC = () => {
       return;
     }
 
-    const ws = new WebSocket(`ws://localhost:8000/ws/${code}/spectate?token=${user.token}`);
+    const ws = new WebSocket(`${import.meta.env.VITE_SPECTATE_WS_URL || 'ws://localhost:8000'}/ws/${code}/spectate?token=${user.token}`);
     spectateWsRef.current = ws;
 
     ws.onmessage = (e) => {
       try {
         const data = JSON.parse(e.data);
+        if (data.type === 'ping') {
+          ws.send(JSON.stringify({ type: 'pong' }));
+          return;
+        }
         if (data.num_player === user.user_id) return;
         if (data.type === 'spectate') {
           setOpponentPov({ heading: data.heading, pitch: data.pitch, zoom: data.zoom });
@@ -6,7 +6,8 @@ import { GuessMap } from '../components/game/GuessMap';
 import { FogOverlay } from '../components/effects/FogOverlay';
 import './SpectatorPage.css';
 
-const WS_BASE_URL = 'ws://localhost:8000';
+// spectators may be served by a separate relay worker
+const WS_BASE_URL = import.meta.env.VITE_SPECTATE_WS_URL || 'ws://localhost:8000';
 
 interface Player {
   user_id: number;
@@ -44,8 +45,13 @@ export const SpectatorPage: React.FC = () => {
 
     ws.onopen = () => console.log('Spectator WS connected');
 
-    ws.onmessage = (e) => {
-      const data = JSON.parse(e.data);
+    const handleMessage = (data: any) => {
+      if (data.type === 'spectator_snapshot') {
+        // initial state on join: current round and players in one message
+        if (data.round) handleMessage({ type: 'round_started', ...data.round });
+        if (data.players.length) handleMessage({ type: 'player_joined', players: data.players });
+        return;
+      }
 
       if (data.type === 'spectate') {
         // Only apply POV if this is the player we're watching
@@ -86,6 +92,16 @@ export const SpectatorPage: React.FC = () => {
       }
     };
 
+    ws.onmessage = (e) => {
+      const data = JSON.parse(e.data);
+
+      if (data.type === 'ping') {
+        ws.send(JSON.stringify({ type: 'pong' }));
+        return;
+      }
+      handleMessage(data);
+    };
+
     ws.onclose = () => console.log('Spectator WS closed');
 
     return () => {
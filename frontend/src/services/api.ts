@@ -236,7 +236,15 @@ class APIService {
 
   public async getAdminReport(id: number) {
     const response = await this.client.get(`/admin/reports/${id}`);
-    return response.data as { id: number; suspect_id: number; reporter_id: number; reason: string; demo: any[] };
+    return response.data as { id: number; suspect_id: number; reporter_id: number; reason: string; demo: any };
+  }
+
+  public async getAdminReportDemo(id: number, numPlayer?: number): Promise<any[]> {
+    const response = await this.client.get(`/admin/reports/${id}/demo`, {
+      params: numPlayer != null ? { num_player: numPlayer } : {},
+      responseType: 'text',
+    });
+    return (response.data as string).split('\n').filter(Boolean).map((line) => JSON.parse(line));
   }
 
   public async deleteAdminReport(id: number): Promise<void> {
@@ -13,6 +13,8 @@ class WebSocketService {
   private lobbyCode: string | null = null;
   private token: string | null = null;
   private isReconnecting = false;
+  // last lobby event seq seen, lets an automatic reconnect receive only what it missed
+  private lastSeq: number | null = null;
   private permanentFailureHandlers: Array<(failedCode: string) => void> = [];
 
   public connect(lobbyCode: string, token: string): Promise<void> {
@@ -27,10 +29,15 @@ class WebSocketService {
         this.ws = null;
       }
 
+      const resumeSeq =
+        this.isReconnecting && lobbyCode === this.lobbyCode ? this.lastSeq : null;
+      if (resumeSeq === null) this.lastSeq = null;
+
       this.lobbyCode = lobbyCode;
       this.token = token;
 
-      const wsUrl = `${WS_BASE_URL}/ws/${lobbyCode}?token=${token}`;
+      let wsUrl = `${WS_BASE_URL}/ws/${lobbyCode}?token=${token}`;
+      if (resumeSeq !== null) wsUrl += `&last_seq=${resumeSeq}`;
 
       try {
         this.ws = new WebSocket(wsUrl);
@@ -45,7 +52,7 @@ class WebSocketService {
             this.isReconnecting = false;
             // Send reconnect message after connection is established
             setTimeout(() => {
-              this.send({ type: 'player_reconnect' });
+              this.send({ type: 'player_reconnect', last_seq: this.lastSeq ?? undefined });
             }, 100);
           }
 
@@ -63,6 +70,14 @@ class WebSocketService {
               return;
             }
 
+            if (data.type === 'ping') {
+              this.send({ type: 'pong' });
+              return;
+            }
+
+            // replayed events can arrive after newer live ones, keep the highest
+            if (typeof data.seq === 'number') this.lastSeq = Math.max(this.lastSeq ?? 0, data.seq);
+
             this.eventHandlers.forEach((handler) => handler(data));
           } catch (error) {
             console.error('Failed to parse WebSocket message:', error);
@@ -151,6 +151,7 @@ export interface WSPlayerReconnectedEvent {
 
 export interface WSReconnectSuccessEvent {
   type: 'reconnect_succes';
+  seq?: number;
   host: string;
   game_state?: {
     current_location_index: number;
@@ -168,7 +169,18 @@ export interface WSReconnectSuccessEvent {
   players: PlayerInfo[];
 }
 
-export type WSEvent =
+export interface WSReconnectResumedEvent {
+  type: 'reconnect_resumed';
+  seq: number;
+  replayed: number;
+}
+
+export interface WSPingEvent {
+  type: 'ping';
+  t: number;
+}
+
+export type WSEvent = (
   | WSPlayerJoinedEvent
   | WSPlayerLeftEvent
   | WSGameStartedEvent
@@ -181,7 +193,10 @@ export type WSEvent =
   | WSRankUpEvent
   | WSPlayerDisconnectedEvent
   | WSPlayerReconnectedEvent
-  | WSReconnectSuccessEvent;
+  | WSReconnectSuccessEvent
+  | WSReconnectResumedEvent
+  | WSPingEvent
+) & { seq?: number };
 
 // Client to Server WebSocket Messages
 
@@ -220,8 +235,13 @@ export interface WSBroadcastMessage {
   message: string;
 }
 
+export interface WSPongMessage {
+  type: 'pong';
+}
+
 export interface WSPlayerReconnectMessage {
   type: 'player_reconnect';
+  last_seq?: number;
 }
 
 export type WSClientMessage =
@@ -233,7 +253,8 @@ export type WSClientMessage =
   | WSPlayerJoinedMessage
   | WSPlayerLeftMessage
   | WSBroadcastMessage
-  | WSPlayerReconnectMessage;
+  | WSPlayerReconnectMessage
+  | WSPongMessage;
 
 // Game State Types
 